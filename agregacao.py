@@ -0,0 +1,93 @@
+"""
+Contagem vetorizada das respostas do questionário por curso.
+
+Cursos e respostas são codificados como inteiros densos, e as contagens de todos
+os pares (curso, resposta) saem de um único `np.bincount` sobre o código
+combinado `curso * n_respostas + resposta`, já no formato da matriz
+cursos × respostas. Isso evita a Series com MultiIndex intermediária do
+`groupby().value_counts().unstack()` do pandas, com o mesmo resultado.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def codificar_respostas(respostas):
+    """Códigos inteiros densos das respostas e os rótulos correspondentes, em ordem crescente."""
+    if isinstance(respostas.dtype, pd.CategoricalDtype):
+        respostas = respostas.cat.remove_unused_categories()
+        return respostas.cat.codes.to_numpy(dtype=np.int64), respostas.cat.categories
+    return pd.factorize(respostas, sort=True)
+
+
+def matriz_contagens(codigos_cursos, codigos_respostas, n_cursos, n_respostas):
+    """Matriz n_cursos × n_respostas com a contagem de cada par de códigos."""
+    chave = codigos_cursos.astype(np.int64) * n_respostas + codigos_respostas
+    return np.bincount(chave, minlength=n_cursos * n_respostas).reshape(n_cursos, n_respostas)
+
+
+def tabela_contagens(contagens, indice_cursos, rotulos, variavel):
+    """DataFrame das contagens só com os cursos que têm alguma resposta, ordenado por curso."""
+    com_dados = contagens.sum(axis=1) > 0
+    tabela = pd.DataFrame(
+        contagens[com_dados],
+        index=indice_cursos[com_dados].rename('CO_CURSO'),
+        columns=pd.Index(rotulos, name=variavel),
+    )
+    return tabela.sort_index()
+
+
+def normalizar_linhas(tabela):
+    """Converte contagens em proporções dentro de cada curso."""
+    return tabela.div(tabela.sum(axis=1), axis=0)
+
+
+def distribuicao_percentual(cursos, respostas, cursos_ids, variavel):
+    """
+    Distribuição percentual de `variavel` por curso, restrita a `cursos_ids`. Mesmo
+    resultado de `groupby('CO_CURSO')[variavel].value_counts(normalize=True).unstack(fill_value=0)`.
+    """
+    indice = pd.Index(cursos_ids)
+    codigos_cursos = indice.get_indexer(cursos)
+    validos = (codigos_cursos >= 0) & respostas.notna().to_numpy()
+    codigos_respostas, rotulos = codificar_respostas(respostas[validos])
+    contagens = matriz_contagens(codigos_cursos[validos], codigos_respostas, len(indice), len(rotulos))
+    return normalizar_linhas(tabela_contagens(contagens, indice, rotulos, variavel))
+
+
+class ContagemRespostas:
+    """
+    Matriz cursos × respostas acumulada bloco a bloco (leitura em blocos). Novas
+    respostas ganham uma coluna no momento em que aparecem pela primeira vez.
+    """
+
+    def __init__(self, cursos_ids):
+        self.indice = pd.Index(cursos_ids)
+        self.codigos = {}
+        self.contagens = np.zeros((len(self.indice), 0), dtype=np.int64)
+
+    def adicionar(self, cursos, respostas):
+        codigos_cursos = self.indice.get_indexer(cursos)
+        validos = (codigos_cursos >= 0) & respostas.notna().to_numpy()
+        codigos_locais, rotulos_locais = pd.factorize(respostas[validos])
+
+        for rotulo in rotulos_locais:
+            self.codigos.setdefault(rotulo, len(self.codigos))
+        novas = len(self.codigos) - self.contagens.shape[1]
+        if novas:
+            self.contagens = np.pad(self.contagens, ((0, 0), (0, novas)))
+
+        mapa = np.array([self.codigos[r] for r in rotulos_locais], dtype=np.int64)
+        self.contagens += matriz_contagens(
+            codigos_cursos[validos], mapa[codigos_locais], len(self.indice), len(self.codigos)
+        )
+
+    def tabela(self, variavel, renomear=None):
+        """
+        Contagens como DataFrame (colunas em ordem crescente de rótulo). `renomear`
+        converte os rótulos lidos (ex: texto) para o tipo final.
+        """
+        rotulos = list(self.codigos)
+        if renomear is not None:
+            rotulos = [renomear[r] for r in rotulos]
+        return tabela_contagens(self.contagens, self.indice, rotulos, variavel).sort_index(axis=1)
@@ -0,0 +1,140 @@
+"""
+Ajuste de hiperparâmetros do XGBoost por successive halving.
+
+Configurações são sorteadas do espaço de busca e treinadas com um orçamento
+pequeno de rodadas de boosting; a cada etapa só a melhor fração (1/eta) segue
+para um orçamento eta vezes maior. Todo treino usa early stopping em um fold de
+validação, então configurações ruins param cedo mesmo dentro do orçamento.
+
+As avaliações de uma etapa rodam em paralelo e cada resultado é gravado no
+histórico (JSON Lines) assim que termina. Uma busca interrompida, executada de
+novo com os mesmos parâmetros, retoma de onde parou.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split
+from xgboost import XGBRegressor
+
+from validacao_cruzada import dividir_nucleos
+
+ARQUIVO_HISTORICO = os.path.join('dados', 'cache', 'ajuste_xgboost.jsonl')
+
+# (escala, mínimo, máximo) de cada hiperparâmetro
+ESPACO_BUSCA = {
+    'learning_rate': ('log', 0.01, 0.3),
+    'max_depth': ('int', 3, 10),
+    'subsample': ('linear', 0.5, 1.0),
+    'colsample_bytree': ('linear', 0.5, 1.0),
+    'min_child_weight': ('log', 1.0, 20.0),
+    'reg_lambda': ('log', 0.1, 10.0),
+}
+
+
+def sortear_configuracoes(n, seed=42):
+    """Sorteia `n` configurações do espaço de busca (sempre as mesmas para a mesma seed)."""
+    rng = np.random.default_rng(seed)
+    configuracoes = []
+    for _ in range(n):
+        config = {}
+        for nome, (escala, minimo, maximo) in ESPACO_BUSCA.items():
+            if escala == 'int':
+                config[nome] = int(rng.integers(minimo, maximo + 1))
+            elif escala == 'log':
+                config[nome] = float(np.exp(rng.uniform(np.log(minimo), np.log(maximo))))
+            else:
+                config[nome] = float(rng.uniform(minimo, maximo))
+        configuracoes.append(config)
+    return configuracoes
+
+
+def _id_busca(X, y, **parametros):
+    """Identifica a busca (dados + parâmetros) para só retomar históricos compatíveis."""
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    sha.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    sha.update(json.dumps([parametros, ESPACO_BUSCA], sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+
+def _carregar_historico(caminho, id_busca):
+    feitos = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue  # última linha incompleta de uma busca interrompida
+                if registro['busca'] == id_busca:
+                    feitos[(registro['config'], registro['rodadas'])] = registro
+    return feitos
+
+
+def _avaliar(params, rodadas, X_treino, y_treino, X_val, y_val, paciencia, n_jobs, seed):
+    modelo = XGBRegressor(
+        n_estimators=rodadas, early_stopping_rounds=paciencia, eval_metric='rmse',
+        random_state=seed, n_jobs=n_jobs, **params
+    )
+    modelo.fit(X_treino, y_treino, eval_set=[(X_val, y_val)], verbose=False)
+    return float(modelo.best_score), int(modelo.best_iteration) + 1
+
+
+def successive_halving(X, y, n_configuracoes=27, rodadas_min=30, rodadas_max=810, eta=3,
+                       paciencia=20, seed=42, jobs=None, historico=ARQUIVO_HISTORICO):
+    """
+    Busca os hiperparâmetros do XGBoost em (X, y), validando em 20% dos dados.
+    Devolve os melhores parâmetros (com `n_estimators` = rodadas até o early
+    stopping) e o histórico da busca como DataFrame.
+    """
+    X_treino, X_val, y_treino, y_val = train_test_split(X, y, test_size=0.2, random_state=seed)
+    configuracoes = sortear_configuracoes(n_configuracoes, seed)
+    id_busca = _id_busca(
+        X, y, n=n_configuracoes, rodadas_min=rodadas_min, rodadas_max=rodadas_max,
+        eta=eta, paciencia=paciencia, seed=seed,
+    )
+    feitos = _carregar_historico(historico, id_busca)
+    if feitos:
+        print(f"Retomando busca '{id_busca}': {len(feitos)} avaliações já no histórico.")
+
+    os.makedirs(os.path.dirname(historico), exist_ok=True)
+    vivos = list(range(n_configuracoes))
+    rodadas = rodadas_min
+    while True:
+        pendentes = [i for i in vivos if (i, rodadas) not in feitos]
+        print(f"Etapa com {rodadas} rodadas: {len(vivos)} configurações ({len(pendentes)} a treinar).")
+        simultaneas, n_jobs_modelo = dividir_nucleos(len(pendentes), jobs)
+        resultados = Parallel(n_jobs=simultaneas, return_as='generator')(
+            delayed(_avaliar)(
+                configuracoes[i], rodadas, X_treino, y_treino, X_val, y_val, paciencia, n_jobs_modelo, seed
+            )
+            for i in pendentes
+        )
+        with open(historico, 'a', encoding='utf-8') as f:
+            for i, (rmse, melhor_rodada) in zip(pendentes, resultados):
+                registro = {
+                    'busca': id_busca, 'config': i, 'rodadas': rodadas, 'rmse': rmse,
+                    'melhor_rodada': melhor_rodada, 'params': configuracoes[i],
+                }
+                f.write(json.dumps(registro) + '\n')
+                f.flush()
+                feitos[(i, rodadas)] = registro
+
+        pontuacao = {i: feitos[(i, rodadas)]['rmse'] for i in vivos}
+        vivos = sorted(vivos, key=pontuacao.get)
+        if rodadas >= rodadas_max or len(vivos) == 1:
+            break
+        vivos = vivos[:max(1, len(vivos) // eta)]
+        rodadas = min(rodadas * eta, rodadas_max)
+
+    melhor = feitos[(vivos[0], rodadas)]
+    print(f"Melhor configuração: {melhor['params']} (RMSE validação {melhor['rmse']:.3f}, "
+          f"{melhor['melhor_rodada']} rodadas)")
+
+    tabela = pd.DataFrame(list(feitos.values())).drop(columns='busca').sort_values(['rodadas', 'rmse'])
+    return dict(melhor['params'], n_estimators=melhor['melhor_rodada']), tabela
@@ -0,0 +1,106 @@
+"""
+Artefatos versionados dos modelos treinados.
+
+Cada treino salva `modelos/<nome>/<versao>/modelo.joblib` e um `meta.json` com a
+lista de features (na ordem usada no treino), o hash da tabela de treino, as
+métricas e as versões das bibliotecas. A versão é a data/hora do treino seguida
+do início do hash dos dados, então versões mais novas ordenam por último.
+"""
+
+import datetime
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from cache_microdados import hash_arquivo
+from dados import ARQUIVO_TABELA
+
+DIR_MODELOS = 'modelos'
+TAMANHO_LOTE = 100_000
+
+
+def _versoes_bibliotecas():
+    versoes = {'sklearn': sklearn.__version__, 'numpy': np.__version__, 'pandas': pd.__version__}
+    try:
+        import xgboost
+        versoes['xgboost'] = xgboost.__version__
+    except ImportError:
+        pass
+    return versoes
+
+
+def salvar_modelo(modelo, nome, colunas, arquivo_dados=ARQUIVO_TABELA, metricas=None):
+    """Salva o modelo treinado como nova versão de `nome`. Devolve o diretório da versão."""
+    hash_dados = hash_arquivo(arquivo_dados)
+    # Com microssegundos, duas versões salvas no mesmo segundo não se sobrescrevem
+    versao = f"{datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{hash_dados[:8]}"
+    diretorio = os.path.join(DIR_MODELOS, nome, versao)
+    os.makedirs(diretorio)
+
+    joblib.dump(modelo, os.path.join(diretorio, 'modelo.joblib'))
+    meta = {
+        'nome': nome,
+        'versao': versao,
+        'classe': type(modelo).__name__,
+        'parametros': {k: repr(v) for k, v in modelo.get_params().items()},
+        'colunas': list(colunas),
+        'arquivo_dados': arquivo_dados,
+        'hash_dados': hash_dados,
+        'metricas': metricas or {},
+        'bibliotecas': _versoes_bibliotecas(),
+    }
+    with open(os.path.join(diretorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    print(f"Modelo salvo em '{diretorio}'.")
+    return diretorio
+
+
+def listar_versoes(nome):
+    diretorio = os.path.join(DIR_MODELOS, nome)
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(v for v in os.listdir(diretorio) if os.path.exists(os.path.join(diretorio, v, 'meta.json')))
+
+
+def carregar_modelo(nome, versao=None):
+    """Carrega (modelo, meta) da versão pedida de `nome` ou, sem versão, da mais recente."""
+    versoes = listar_versoes(nome)
+    if not versoes:
+        raise FileNotFoundError(f"Nenhum artefato encontrado para o modelo '{nome}' em '{DIR_MODELOS}/'.")
+    versao = versao or versoes[-1]
+    diretorio = os.path.join(DIR_MODELOS, nome, versao)
+    with open(os.path.join(diretorio, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    return joblib.load(os.path.join(diretorio, 'modelo.joblib')), meta
+
+
+def tabela_features(df, colunas):
+    """
+    Features na ordem do treino (DataFrame). Respostas que não aparecem na tabela
+    nova correspondem a proporção zero.
+    """
+    faltantes = [c for c in colunas if c not in df.columns]
+    if faltantes:
+        print(f"Aviso: {len(faltantes)} features ausentes na tabela foram preenchidas com 0: {faltantes[:5]}...")
+    return df.reindex(columns=colunas, fill_value=0)
+
+
+def matriz_features(df, colunas):
+    """Matriz float32 de `tabela_features`, usada na pontuação."""
+    return tabela_features(df, colunas).to_numpy(dtype=np.float32)
+
+
+def pontuar(modelo, meta, df, tamanho_lote=TAMANHO_LOTE):
+    """Previsões do modelo para cada linha de `df`, calculadas em lotes vetorizados."""
+    X = matriz_features(df, meta['colunas'])
+    if len(X) == 0:
+        return np.empty(0)
+    X = pd.DataFrame(X, columns=meta['colunas'], copy=False)
+    return np.concatenate([
+        modelo.predict(X.iloc[inicio:inicio + tamanho_lote])
+        for inicio in range(0, len(X), tamanho_lote)
+    ])
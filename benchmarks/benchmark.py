@@ -0,0 +1,256 @@
+"""
+Benchmark das etapas do projeto sobre microdados sintéticos (ver `gerar_microdados`).
+
+Cada etapa roda em um processo separado, com os scripts do projeto executados
+em um diretório de trabalho próprio (`dados/`, `tabelas/`, `imagens/`,
+`modelos/`), sem abrir janelas de gráfico. Para cada etapa são medidos o tempo
+de relógio, o tempo de CPU (incluindo os processos filhos) e o pico de memória
+residente. O resultado é salvo em JSON e, se houver uma referência para os
+mesmos tamanhos de dados, comparado com ela; o script sai com código 1 quando
+alguma etapa ficou mais lenta ou usou mais memória que a tolerância.
+
+    python benchmarks/benchmark.py --estudantes 1000000 --cursos 5000
+    python benchmarks/benchmark.py --etapas ingestao ingestao_blocos --repeticoes 3
+    python benchmarks/benchmark.py --salvar-referencia        # grava a referência
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de memória nem tempo de CPU por processo
+    resource = None
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gerar_microdados
+from main import ARQUIVO_SAIDA, arquivos_categoricos, mapa_variaveis
+
+DIR_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+ARQUIVO_REFERENCIA = os.path.join(RAIZ, 'benchmarks', 'referencia.json')
+
+# Agregação de um único arquivo do questionário (cursos pré-selecionados pelo benchmark)
+CODIGO_AGREGAR_ARQUIVO = (
+    "import sys, numpy as np, main; "
+    "main.processar_arquivo(sys.argv[1], sys.argv[2:], np.load('cursos.npy'), usar_cache=False)"
+)
+
+
+def _script(caminho, *argumentos):
+    return [sys.executable, os.path.join(RAIZ, caminho), *argumentos]
+
+
+def etapas_disponiveis():
+    """Nome da etapa -> linha de comando, na ordem de execução (as etapas de modelo usam a tabela da ingestão)."""
+    etapas = {
+        'ingestao': _script('main.py', '--sem-cache'),
+        'ingestao_blocos': _script('main.py', '--sem-cache', '--chunksize', '500000'),
+        # Primeira leitura converte os microdados para o cache Parquet; a seguinte lê do cache
+        'ingestao_cache_frio': _script('main.py'),
+        'ingestao_cache': _script('main.py'),
+    }
+    for arquivo, variaveis in mapa_variaveis(arquivos_categoricos).items():
+        etapas[f"agregacao_{'_'.join(variaveis)}"] = [sys.executable, '-c', CODIGO_AGREGAR_ARQUIVO, arquivo, *variaveis]
+    etapas.update({
+        'xgboost': _script('modelo_xgboost.py'),
+        'random_forest': _script('random_forest.py'),
+        'validacao_cruzada': _script('rf_validacao_cruzada.py'),
+        'anova_tukey': _script('testes/anova_tukey.py', '--saida', os.path.join('tabelas', 'testes_anova_tukey.csv')),
+    })
+    return etapas
+
+
+def preparar(diretorio, n_estudantes, n_cursos, seed):
+    """
+    Gera os microdados sintéticos em `diretorio/dados` (reaproveitados se já
+    gerados com os mesmos parâmetros) e os diretórios de saída dos scripts.
+    """
+    import numpy as np
+    from main import CODIGOS_GRUPOS_INCLUIDOS
+
+    destino = os.path.join(diretorio, 'dados')
+    esperado = {'estudantes': n_estudantes, 'cursos': n_cursos, 'seed': seed}
+    gerados = gerar_microdados.parametros(destino) or {}
+    if {k: gerados.get(k) for k in esperado} != esperado:
+        print(f"Gerando {n_estudantes} estudantes de {n_cursos} cursos em '{destino}'...")
+        cursos = gerar_microdados.gerar(destino, n_estudantes, n_cursos, seed)
+    else:
+        cursos = gerar_microdados.cursos(n_cursos, seed)
+    selecionados = cursos.loc[cursos['CO_GRUPO'].isin(CODIGOS_GRUPOS_INCLUIDOS), 'CO_CURSO'].to_numpy()
+    np.save(os.path.join(diretorio, 'cursos.npy'), selecionados)
+    for subdiretorio in ('tabelas', 'imagens', 'modelos'):
+        os.makedirs(os.path.join(diretorio, subdiretorio), exist_ok=True)
+
+
+# Processo intermediário mínimo que executa o comando e mede o uso de recursos.
+# O comando não pode ser filho direto do benchmark: o pico de memória de um
+# processo inclui o que ele herda antes do exec, e o benchmark já tem o pandas carregado.
+CODIGO_MEDIDOR = """
+import json, os, sys
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.argv[2], sys.argv[2:])
+_, status, uso = os.wait4(pid, 0)
+with open(sys.argv[1], 'w') as f:
+    json.dump({'codigo': os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status),
+               'cpu': uso.ru_utime + uso.ru_stime, 'maxrss': uso.ru_maxrss}, f)
+"""
+
+
+def medir(comando, diretorio, log):
+    """
+    Roda `comando` em `diretorio` e devolve (código de saída, segundos, segundos
+    de CPU, pico de memória em MB). CPU e memória incluem os processos filhos
+    (ex: workers do joblib) e ficam None onde `resource` não existe.
+    """
+    env = dict(os.environ, MPLBACKEND='Agg', ENADE_TABELA=ARQUIVO_SAIDA,
+               PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.environ.get('PYTHONPATH')])))
+    if resource is None:
+        inicio = time.perf_counter()
+        codigo = subprocess.run(comando, cwd=diretorio, env=env, stdout=log, stderr=subprocess.STDOUT).returncode
+        return codigo, time.perf_counter() - inicio, None, None
+
+    with tempfile.NamedTemporaryFile('r', suffix='.json', delete=False) as f:
+        arquivo_uso = f.name
+    try:
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', CODIGO_MEDIDOR, arquivo_uso, *comando],
+                       cwd=diretorio, env=env, stdout=log, stderr=subprocess.STDOUT, check=True)
+        segundos = time.perf_counter() - inicio
+        with open(arquivo_uso, encoding='utf-8') as f:
+            uso = json.load(f)
+    finally:
+        os.remove(arquivo_uso)
+    # ru_maxrss em KB no Linux e em bytes no macOS
+    pico = uso['maxrss'] / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    return uso['codigo'], segundos, uso['cpu'], pico
+
+
+def executar(diretorio, etapas, repeticoes=1):
+    """Mede cada etapa `repeticoes` vezes (menor tempo, maior pico de memória). Devolve etapa -> medidas."""
+    comandos = etapas_disponiveis()
+    os.makedirs(os.path.join(diretorio, 'logs'), exist_ok=True)
+    resultados = {}
+    for nome in etapas:
+        medidas = []
+        with open(os.path.join(diretorio, 'logs', f'{nome}.log'), 'w', encoding='utf-8') as log:
+            for _ in range(repeticoes):
+                if nome == 'ingestao_cache_frio':
+                    shutil.rmtree(os.path.join(diretorio, 'dados', 'cache'), ignore_errors=True)
+                medidas.append(medir(comandos[nome], diretorio, log))
+                if medidas[-1][0] != 0:
+                    break
+        codigo = next((m[0] for m in medidas if m[0] != 0), 0)
+        resultados[nome] = {
+            'codigo_saida': codigo,
+            'segundos': min(m[1] for m in medidas),
+            'cpu_segundos': None if medidas[0][2] is None else min(m[2] for m in medidas),
+            'pico_memoria_mb': None if medidas[0][3] is None else max(m[3] for m in medidas),
+        }
+        situacao = 'ok' if codigo == 0 else f'FALHOU (código {codigo}, ver logs/{nome}.log)'
+        memoria = resultados[nome]['pico_memoria_mb']
+        print(f"  {nome:<28} {resultados[nome]['segundos']:9.2f} s"
+              f"{'' if memoria is None else f'  {memoria:9.1f} MB'}  {situacao}")
+    return resultados
+
+
+def comparar(resultado, referencia, tolerancia=0.10):
+    """
+    Compara tempo e pico de memória de cada etapa com a referência. Devolve as
+    etapas que pioraram mais que `tolerancia` (fração) em alguma das medidas.
+    """
+    if referencia['parametros'] != resultado['parametros']:
+        print(f"Referência com outros parâmetros ({referencia['parametros']}); comparação não feita.")
+        return []
+    pioraram = []
+    print(f"\n{'etapa':<28} {'tempo':>9} {'ref.':>9} {'razão':>7} {'memória':>9} {'ref.':>9} {'razão':>7}")
+    for nome, atual in resultado['etapas'].items():
+        anterior = referencia['etapas'].get(nome)
+        if anterior is None or atual['codigo_saida'] != 0 or anterior['codigo_saida'] != 0:
+            continue
+        linha = f"{nome:<28} {atual['segundos']:9.2f} {anterior['segundos']:9.2f}"
+        razao_tempo = atual['segundos'] / anterior['segundos']
+        linha += f" {razao_tempo:7.2f}"
+        razao_memoria = None
+        if atual['pico_memoria_mb'] is not None and anterior['pico_memoria_mb'] is not None:
+            razao_memoria = atual['pico_memoria_mb'] / anterior['pico_memoria_mb']
+            linha += f" {atual['pico_memoria_mb']:9.1f} {anterior['pico_memoria_mb']:9.1f} {razao_memoria:7.2f}"
+        if razao_tempo > 1 + tolerancia or (razao_memoria or 0) > 1 + tolerancia:
+            pioraram.append(nome)
+            linha += '  <- piorou'
+        print(linha)
+    return pioraram
+
+
+def main(argv=None):
+    etapas = etapas_disponiveis()
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do projeto com microdados sintéticos.")
+    parser.add_argument('--estudantes', type=int, default=100_000, help="Estudantes nos microdados sintéticos.")
+    parser.add_argument('--cursos', type=int, default=2000, help="Cursos nos microdados sintéticos.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente do gerador.")
+    parser.add_argument('--etapas', nargs='+', choices=list(etapas), default=list(etapas),
+                        help="Etapas medidas (padrão: todas). As de modelo e testes precisam de uma ingestão antes.")
+    parser.add_argument('--repeticoes', type=int, default=1, help="Execuções de cada etapa (vale o menor tempo).")
+    parser.add_argument('--diretorio', default=None,
+                        help="Diretório de trabalho; mantém os dados gerados entre execuções (padrão: temporário).")
+    parser.add_argument('--saida', default=None, help="JSON com os resultados (padrão: benchmarks/resultados/<data>.json).")
+    parser.add_argument('--referencia', default=ARQUIVO_REFERENCIA, help="JSON de referência para a comparação.")
+    parser.add_argument('--salvar-referencia', action='store_true', help="Grava o resultado como nova referência.")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="Piora tolerada em relação à referência (fração; padrão: 0.10).")
+    args = parser.parse_args(argv)
+
+    temporario = None
+    if args.diretorio is None:
+        temporario = tempfile.TemporaryDirectory(prefix='enade_benchmark_')
+    diretorio = args.diretorio or temporario.name
+    try:
+        preparar(diretorio, args.estudantes, args.cursos, args.seed)
+        print(f"Executando {len(args.etapas)} etapas em '{diretorio}'...")
+        resultado = {
+            'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'maquina': {
+                'plataforma': platform.platform(), 'python': platform.python_version(),
+                'processador': platform.processor(), 'nucleos': os.cpu_count(),
+            },
+            'parametros': {'estudantes': args.estudantes, 'cursos': args.cursos, 'seed': args.seed},
+            'etapas': executar(diretorio, [nome for nome in etapas if nome in args.etapas], args.repeticoes),
+        }
+    finally:
+        if temporario is not None:
+            temporario.cleanup()
+
+    saida = args.saida or os.path.join(DIR_RESULTADOS, f"{time.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em '{saida}'.")
+
+    if args.salvar_referencia:
+        with open(args.referencia, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Referência salva em '{args.referencia}'.")
+        return 0
+    if not os.path.exists(args.referencia):
+        print("Nenhuma referência para comparar (use --salvar-referencia).")
+        return 0
+    with open(args.referencia, encoding='utf-8') as f:
+        pioraram = comparar(resultado, json.load(f), args.tolerancia)
+    if pioraram:
+        print(f"\nEtapas que pioraram mais de {args.tolerancia:.0%}: {', '.join(pioraram)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
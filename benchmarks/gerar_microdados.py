@@ -0,0 +1,159 @@
+"""
+Gerador de microdados sintéticos no formato dos arquivos `microdados2023_arqN.txt`
+do INEP, para medir o desempenho do projeto sem os dados reais.
+
+São gerados o arquivo 1 (caracterização do curso), o arquivo 3 (notas) e os
+arquivos do questionário lidos por `main.py`, todos com os estudantes na mesma
+ordem (como nos microdados originais). Os tamanhos dos cursos são assimétricos,
+cada curso tem sua própria distribuição de respostas e a nota NT_CE depende do
+curso e de algumas respostas, então os modelos e os testes têm o que encontrar.
+Os arquivos são escritos em blocos, com memória limitada mesmo para 10 milhões
+de estudantes, e são os mesmos para a mesma seed.
+
+    python benchmarks/gerar_microdados.py /tmp/enade_sintetico/dados --estudantes 1000000 --cursos 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import CODIGOS_GRUPOS_INCLUIDOS, OPCOES_LEITURA, arquivos_categoricos
+
+BLOCO_ESTUDANTES = 1_000_000
+# Fração dos cursos que pertence aos grupos de `CODIGOS_GRUPOS_INCLUIDOS`
+FRACAO_INCLUIDOS = 0.3
+OUTROS_GRUPOS = [1, 2, 13, 18, 21, 22, 26, 29, 38, 40, 51, 55, 66, 67, 69, 81, 83, 84, 87, 88]
+
+# Respostas possíveis de cada variável (demais variáveis: A a F)
+ALTERNATIVAS = {
+    'QE_I02': list('ABCDEF'),
+    'QE_I08': list('ABCDEFG'),
+    'QE_I06': list('ABCDEF'),
+    'QE_I07': list('ABCDEFGH'),
+    'QE_I16': [str(uf) for uf in [11, 12, 13, 14, 15, 16, 17, 21, 22, 23, 24, 25, 26, 27, 28, 29,
+                                  31, 32, 33, 35, 41, 42, 43, 50, 51, 52, 53, 99]],
+    'QE_I25': list('ABCDEFGH'),
+}
+# Efeito (pontos de NT_CE por posição da alternativa) das variáveis que influenciam a nota
+EFEITOS_NOTA = {'QE_I08': 1.5, 'QE_I17': -2.0, 'QE_I21': -3.0, 'QE_I23': 1.0}
+# Proporção de respostas em branco ('.' ou vazio) e de notas ausentes
+PROP_AUSENTES = 0.05
+PROP_SEM_NOTA = 0.1
+
+
+def _cursos(n_cursos, rng):
+    """Caracterização de cada curso (uma linha por CO_CURSO) e o peso de cada um no sorteio."""
+    incluidos = rng.random(n_cursos) < FRACAO_INCLUIDOS
+    grupos = np.where(
+        incluidos, rng.choice(CODIGOS_GRUPOS_INCLUIDOS, n_cursos), rng.choice(OUTROS_GRUPOS, n_cursos)
+    )
+    n_ies = max(1, n_cursos // 4)
+    ies = rng.integers(1, n_ies + 1, n_cursos)
+    uf = np.array([11, 12, 13, 14, 15, 16, 17, 21, 22, 23, 24, 25, 26, 27, 28, 29,
+                   31, 32, 33, 35, 41, 42, 43, 50, 51, 52, 53])[rng.integers(0, 27, n_cursos)]
+    cursos = pd.DataFrame({
+        'CO_IES': ies,
+        'CO_CATEGAD': rng.choice([1, 2, 3, 4, 5, 7, 10000, 10001, 10002], n_cursos),
+        'CO_ORGACAD': rng.choice([10019, 10020, 10022, 10026, 10028], n_cursos),
+        'CO_GRUPO': grupos,
+        'CO_CURSO': np.arange(1, n_cursos + 1) * 7 + 1000,
+        'CO_MODALIDADE': (rng.random(n_cursos) < 0.2).astype(int),
+        'CO_MUNIC_CURSO': uf * 100_000 + rng.integers(0, 900, n_cursos),
+        'CO_UF_CURSO': uf,
+        'CO_REGIAO_CURSO': uf // 10,
+    })
+    pesos = rng.lognormal(0.0, 1.0, n_cursos)
+    return cursos, pesos / pesos.sum()
+
+
+def cursos(n_cursos, seed=42):
+    """Caracterização dos cursos gerados por `gerar` com os mesmos `n_cursos` e `seed`."""
+    return _cursos(n_cursos, np.random.default_rng(seed))[0]
+
+
+def _respostas(alternativas, probabilidades, posicao_curso, rng):
+    """Índice da alternativa de cada estudante, sorteada pela distribuição do seu curso."""
+    acumuladas = np.cumsum(probabilidades, axis=1)[posicao_curso]
+    sorteio = rng.random(len(posicao_curso))[:, None]
+    return np.minimum((sorteio > acumuladas).sum(axis=1), len(alternativas) - 1)
+
+
+def gerar(destino, n_estudantes, n_cursos=2000, seed=42, bloco=BLOCO_ESTUDANTES, arquivos=arquivos_categoricos):
+    """
+    Escreve os microdados sintéticos em `destino` e um `sintetico.json` com os
+    parâmetros usados. Devolve a caracterização dos cursos (uma linha por curso).
+    """
+    os.makedirs(destino, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    caracterizacao, pesos = _cursos(n_cursos, rng)
+    efeito_curso = rng.normal(0.0, 8.0, n_cursos)
+
+    variaveis = {}
+    for arquivo, variavel in arquivos.items():
+        alternativas = ALTERNATIVAS.get(variavel, list('ABCDEF'))
+        probabilidades = rng.dirichlet(np.full(len(alternativas), 2.0), n_cursos)
+        variaveis[variavel] = (arquivo, alternativas, probabilidades)
+
+    separador = OPCOES_LEITURA['sep']
+    for inicio in range(0, n_estudantes, bloco):
+        tamanho = min(bloco, n_estudantes - inicio)
+        modo = 'w' if inicio == 0 else 'a'
+        posicao_curso = rng.choice(n_cursos, tamanho, p=pesos)
+        linhas_cursos = caracterizacao.iloc[posicao_curso]
+
+        colunas_arq1 = ['CO_IES', 'CO_CATEGAD', 'CO_ORGACAD', 'CO_GRUPO', 'CO_CURSO',
+                        'CO_MODALIDADE', 'CO_MUNIC_CURSO', 'CO_UF_CURSO', 'CO_REGIAO_CURSO']
+        arq1 = pd.concat([pd.Series(2023, index=linhas_cursos.index, name='NU_ANO'), linhas_cursos[colunas_arq1]], axis=1)
+        arq1.to_csv(os.path.join(destino, 'microdados2023_arq1.txt'), sep=separador, index=False,
+                    header=inicio == 0, mode=modo)
+
+        nota = 45.0 + efeito_curso[posicao_curso] + rng.normal(0.0, 12.0, tamanho)
+        for variavel, (arquivo, alternativas, probabilidades) in variaveis.items():
+            escolhas = _respostas(alternativas, probabilidades, posicao_curso, rng)
+            if variavel in EFEITOS_NOTA:
+                nota += EFEITOS_NOTA[variavel] * escolhas
+            respostas = np.asarray(alternativas, dtype=object)[escolhas]
+            respostas[rng.random(tamanho) < PROP_AUSENTES] = '.'
+            pd.DataFrame({
+                'NU_ANO': 2023, 'CO_CURSO': linhas_cursos['CO_CURSO'].to_numpy(), variavel: respostas,
+            }).to_csv(os.path.join(destino, arquivo), sep=separador, index=False, header=inicio == 0, mode=modo)
+
+        presente = rng.random(tamanho) >= PROP_SEM_NOTA
+        nt_ce = np.where(presente, np.round(np.clip(nota, 0.0, 100.0), 1).astype(object), '.')
+        pd.DataFrame({
+            'NU_ANO': 2023,
+            'CO_CURSO': linhas_cursos['CO_CURSO'].to_numpy(),
+            'TP_PRES': np.where(presente, 555, 222),
+            'NT_CE': nt_ce,
+        }).to_csv(os.path.join(destino, 'microdados2023_arq3.txt'), sep=separador, index=False,
+                  header=inicio == 0, mode=modo)
+
+    with open(os.path.join(destino, 'sintetico.json'), 'w', encoding='utf-8') as f:
+        json.dump({'estudantes': n_estudantes, 'cursos': n_cursos, 'seed': seed, 'arquivos': arquivos}, f, indent=2)
+    return caracterizacao
+
+
+def parametros(destino):
+    """Parâmetros dos microdados sintéticos já gerados em `destino` (None se não houver)."""
+    caminho = os.path.join(destino, 'sintetico.json')
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera microdados sintéticos no formato do ENADE 2023.")
+    parser.add_argument('destino', help="Diretório dos arquivos gerados.")
+    parser.add_argument('--estudantes', type=int, default=100_000, help="Número de estudantes (linhas).")
+    parser.add_argument('--cursos', type=int, default=2000, help="Número de cursos.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente do gerador.")
+    args = parser.parse_args()
+
+    gerar(args.destino, args.estudantes, args.cursos, args.seed)
+    print(f"{args.estudantes} estudantes de {args.cursos} cursos gerados em '{args.destino}'.")
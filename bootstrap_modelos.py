@@ -0,0 +1,178 @@
+"""
+Intervalos de confiança bootstrap para as métricas (R², MSE) e para a
+importância de cada variável dos modelos de árvores salvos em `modelos/`.
+
+Cada reamostra sorteia os cursos com reposição, treina um clone do modelo salvo
+(mesmos hiperparâmetros, opcionalmente com menos árvores) e o avalia nos cursos
+que ficaram fora da reamostra (out-of-bag). As reamostras rodam em paralelo, em
+processos, e cada resultado é gravado em JSON Lines assim que termina: uma
+execução interrompida já tem resultados utilizáveis e, rodada de novo com os
+mesmos parâmetros, continua de onde parou. A reamostra i usa sempre a mesma
+semente, então o resultado não depende da ordem nem do número de processos.
+
+    python bootstrap_modelos.py --modelo random_forest --reamostras 1000 --arvores 100
+    python bootstrap_modelos.py --modelo xgboost --reamostras 1000 --jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error, r2_score
+
+from validacao_cruzada import dividir_nucleos
+
+DIR_HISTORICO = os.path.join('dados', 'cache', 'bootstrap')
+
+
+def _id_bootstrap(X, y, modelo, seed):
+    """Identifica o bootstrap (dados + modelo + seed) para só retomar históricos compatíveis."""
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    sha.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    parametros = {k: repr(v) for k, v in modelo.get_params().items() if k != 'n_jobs'}
+    sha.update(json.dumps([type(modelo).__name__, parametros, seed], sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+
+def _carregar_historico(caminho, id_bootstrap):
+    feitos = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue  # última linha incompleta de uma execução interrompida
+                if registro['bootstrap'] == id_bootstrap:
+                    feitos[registro['reamostra']] = registro
+    return feitos
+
+
+def _reamostra(modelo, X, y, indice, seed):
+    rng = np.random.default_rng([seed, indice])
+    treino = rng.integers(0, len(y), len(y))
+    fora = np.setdiff1d(np.arange(len(y)), treino)
+
+    modelo.fit(X.iloc[treino], y.iloc[treino])
+    y_pred = modelo.predict(X.iloc[fora])
+    importancias = getattr(modelo, 'feature_importances_', None)
+    return {
+        'reamostra': indice,
+        'n_fora': len(fora),
+        'r2': float(r2_score(y.iloc[fora], y_pred)),
+        'mse': float(mean_squared_error(y.iloc[fora], y_pred)),
+        'importancias': None if importancias is None else [float(v) for v in importancias],
+    }
+
+
+def bootstrap(estimador, X, y, n_reamostras=1000, seed=42, jobs=None, arvores=None, historico=None):
+    """
+    Avalia `n_reamostras` reamostras bootstrap de `estimador` em (X, y), usando
+    até `jobs` núcleos. Com `arvores`, cada reamostra treina só essa quantidade
+    de árvores (`n_estimators`). Com `historico`, os resultados são gravados
+    (e retomados) nesse arquivo JSON Lines. Devolve os registros como DataFrame
+    (uma linha por reamostra, com r2, mse e a lista de importâncias).
+    """
+    modelo_base = clone(estimador)
+    if arvores:
+        modelo_base.set_params(n_estimators=arvores)
+
+    id_bootstrap = _id_bootstrap(X, y, modelo_base, seed)
+    feitos = _carregar_historico(historico, id_bootstrap) if historico else {}
+    pendentes = [i for i in range(n_reamostras) if i not in feitos]
+    if feitos:
+        print(f"Retomando bootstrap '{id_bootstrap}': {n_reamostras - len(pendentes)} reamostras já no histórico.")
+
+    simultaneas, n_jobs_modelo = dividir_nucleos(len(pendentes), jobs)
+    if 'n_jobs' in modelo_base.get_params():
+        modelo_base.set_params(n_jobs=n_jobs_modelo)
+
+    resultados = Parallel(n_jobs=simultaneas, return_as='generator_unordered')(
+        delayed(_reamostra)(clone(modelo_base), X, y, i, seed) for i in pendentes
+    )
+    arquivo = None
+    if historico:
+        os.makedirs(os.path.dirname(historico), exist_ok=True)
+        arquivo = open(historico, 'a', encoding='utf-8')
+    try:
+        for n, registro in enumerate(resultados, start=1):
+            registro['bootstrap'] = id_bootstrap
+            feitos[registro['reamostra']] = registro
+            if arquivo:
+                arquivo.write(json.dumps(registro) + '\n')
+                arquivo.flush()
+            if n % 50 == 0 or n == len(pendentes):
+                print(f"  {n}/{len(pendentes)} reamostras concluídas")
+    finally:
+        if arquivo:
+            arquivo.close()
+
+    registros = [feitos[i] for i in range(n_reamostras)]
+    return pd.DataFrame(registros).drop(columns='bootstrap')
+
+
+def intervalos(registros, colunas, nivel=0.95):
+    """
+    Estimativa (média) e intervalo percentil de R², MSE e da importância de cada
+    variável em `colunas`, uma linha por medida.
+    """
+    medidas = {'r2': registros['r2'].to_numpy(), 'mse': registros['mse'].to_numpy()}
+    if registros['importancias'].notna().all():
+        importancias = np.array(registros['importancias'].tolist())
+        medidas.update(zip(colunas, importancias.T))
+
+    caudas = [(1 - nivel) / 2 * 100, (1 + nivel) / 2 * 100]
+    linhas = []
+    for medida, valores in medidas.items():
+        inferior, superior = np.percentile(valores, caudas)
+        linhas.append({
+            'medida': medida, 'estimativa': valores.mean(), 'inferior': inferior,
+            'superior': superior, 'reamostras': len(valores),
+        })
+    return pd.DataFrame(linhas).set_index('medida')
+
+
+if __name__ == '__main__':
+    from artefatos import carregar_modelo, tabela_features
+    from cache_microdados import hash_arquivo
+    from dados import carregar_xy
+
+    parser = argparse.ArgumentParser(description="Intervalos de confiança bootstrap de um modelo salvo.")
+    parser.add_argument('--modelo', required=True, help="Nome do modelo salvo (ex: random_forest, xgboost).")
+    parser.add_argument('--versao', default=None, help="Versão do artefato (padrão: a mais recente).")
+    parser.add_argument('--reamostras', type=int, default=1000, help="Número de reamostras bootstrap.")
+    parser.add_argument('--arvores', type=int, default=None,
+                        help="Árvores por reamostra (padrão: as do modelo salvo). Menos árvores = mais rápido.")
+    parser.add_argument('--nivel', type=float, default=0.95, help="Nível de confiança dos intervalos.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente das reamostras.")
+    parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados no total (padrão: todos).")
+    parser.add_argument('--saida', default=None, help="CSV com os intervalos (padrão: tabelas/bootstrap_<modelo>.csv).")
+    args = parser.parse_args()
+
+    modelo, meta = carregar_modelo(args.modelo, args.versao)
+    if hash_arquivo(meta['arquivo_dados']) != meta['hash_dados']:
+        print(f"Aviso: '{meta['arquivo_dados']}' mudou desde o treino da versão {meta['versao']}.")
+    X, y = carregar_xy(meta['arquivo_dados'])
+    X = tabela_features(X, meta['colunas'])
+
+    print(f"Bootstrap de '{meta['nome']}' versão {meta['versao']}: {args.reamostras} reamostras...")
+    historico = os.path.join(DIR_HISTORICO, f"{meta['nome']}.jsonl")
+    registros = bootstrap(
+        modelo, X, y, args.reamostras, args.seed, args.jobs, args.arvores, historico
+    )
+    tabela = intervalos(registros, meta['colunas'], args.nivel)
+
+    print(f"\nMétricas fora da reamostra (IC {args.nivel:.0%}):")
+    print(tabela.loc[['r2', 'mse']])
+    print("\nTop 20 variáveis mais importantes:")
+    print(tabela.drop(index=['r2', 'mse'], errors='ignore').sort_values('estimativa', ascending=False).head(20))
+
+    saida = args.saida or os.path.join('tabelas', f"bootstrap_{meta['nome']}.csv")
+    tabela.to_csv(saida, encoding='utf-8-sig')
+    print(f"\nIntervalos salvos em '{saida}'.")
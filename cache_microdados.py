@@ -0,0 +1,119 @@
+"""
+Cache colunar (Parquet) dos microdados do ENADE.
+
+Na primeira leitura, cada `microdados2023_arqN.txt` é convertido para Parquet com
+tipos compactos (respostas `QE_*` como categoria, inteiros no menor tipo possível).
+Nas execuções seguintes o Parquet é lido no lugar do texto, apenas com as colunas
+pedidas. O cache é descartado quando o arquivo de origem muda (tamanho, data de
+modificação ou, se só a data mudou, o hash SHA-256 do conteúdo).
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+CACHE_DIR = os.path.join('dados', 'cache')
+
+
+def _pyarrow_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _caminhos_cache(caminho_txt, cache_dir):
+    nome = os.path.splitext(os.path.basename(caminho_txt))[0]
+    return os.path.join(cache_dir, f'{nome}.parquet'), os.path.join(cache_dir, f'{nome}.json')
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def cache_valido(caminho_txt, cache_dir=CACHE_DIR):
+    """Indica se existe um Parquet atualizado para o arquivo de texto informado."""
+    caminho_parquet, caminho_meta = _caminhos_cache(caminho_txt, cache_dir)
+    if not (os.path.exists(caminho_parquet) and os.path.exists(caminho_meta)):
+        return False
+
+    with open(caminho_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    info = os.stat(caminho_txt)
+    if info.st_size != meta['tamanho']:
+        return False
+    if info.st_mtime_ns == meta['mtime_ns']:
+        return True
+
+    # Só a data mudou (ex: arquivo copiado de novo): confere pelo conteúdo
+    if hash_arquivo(caminho_txt) != meta['sha256']:
+        return False
+    meta['mtime_ns'] = info.st_mtime_ns
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return True
+
+
+def compactar_tipos(df):
+    """Respostas `QE_*` em texto viram categoria (ordenada); inteiros são reduzidos."""
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna.startswith('QE_') and not pd.api.types.is_numeric_dtype(serie):
+            categorias = sorted(serie.dropna().unique())
+            df[coluna] = pd.Categorical(serie, categories=categorias)
+        elif pd.api.types.is_integer_dtype(serie):
+            df[coluna] = pd.to_numeric(serie, downcast='integer')
+    return df
+
+
+def carregar(caminho_txt, opcoes_leitura, colunas=None, cache_dir=CACHE_DIR):
+    """
+    Lê um arquivo de microdados pelo cache Parquet, criando-o se necessário.
+    Sem o pyarrow instalado, lê o texto diretamente.
+    """
+    if not _pyarrow_disponivel():
+        return pd.read_csv(caminho_txt, usecols=colunas, **opcoes_leitura)
+
+    caminho_parquet, caminho_meta = _caminhos_cache(caminho_txt, cache_dir)
+    if cache_valido(caminho_txt, cache_dir):
+        return pd.read_parquet(caminho_parquet, columns=colunas)
+
+    print(f"Convertendo '{caminho_txt}' para o cache colunar...")
+    info = os.stat(caminho_txt)
+    df = compactar_tipos(pd.read_csv(caminho_txt, **opcoes_leitura))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(caminho_parquet, index=False)
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump({
+            'origem': os.path.abspath(caminho_txt),
+            'tamanho': info.st_size,
+            'mtime_ns': info.st_mtime_ns,
+            'sha256': hash_arquivo(caminho_txt),
+        }, f, indent=2)
+
+    return df if colunas is None else df[colunas]
+
+
+def ler_em_blocos(caminho_txt, colunas, chunksize, cache_dir=CACHE_DIR):
+    """
+    Itera sobre o cache Parquet em blocos de até `chunksize` linhas, lendo só
+    `colunas`. Retorna None se não houver cache válido (o cache não é criado
+    aqui, pois isso exigiria carregar o arquivo inteiro).
+    """
+    if not _pyarrow_disponivel() or not cache_valido(caminho_txt, cache_dir):
+        return None
+
+    import pyarrow.parquet as pq
+
+    caminho_parquet, _ = _caminhos_cache(caminho_txt, cache_dir)
+    arquivo = pq.ParquetFile(caminho_parquet)
+    return (lote.to_pandas() for lote in arquivo.iter_batches(batch_size=chunksize, columns=colunas))
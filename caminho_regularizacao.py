@@ -0,0 +1,120 @@
+"""
+Caminhos de regularização do Ridge, do Lasso e do ElasticNet, com escolha do
+alpha por validação cruzada.
+
+Em vez de um ajuste por alpha:
+
+- Lasso/ElasticNet: o caminho inteiro sai de uma única descida coordenada
+  (`enet_path`), do maior para o menor alpha, cada ajuste partindo dos
+  coeficientes do anterior (warm start). Os primeiros alphas, quase todos os
+  coeficientes nulos, convergem em poucas iterações.
+- Ridge: com a SVD de X centrado (X = U S Vᵀ), os coeficientes de qualquer alpha
+  são V · diag(s / (s² + alpha)) · Uᵀy, então uma SVD resolve a grade toda.
+
+As previsões de todos os alphas saem de um único produto de matrizes. Na
+validação cruzada os folds rodam em paralelo; cada fold calcula os caminhos
+completos. Os alphas seguem a mesma definição de `Ridge` e `Lasso`/`ElasticNet`
+do scikit-learn, com intercepto.
+"""
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.linear_model import enet_path
+
+from validacao_cruzada import dividir_nucleos, divisoes_kfold
+
+# Grade padrão do Ridge (a do Lasso/ElasticNet depende dos dados, ver `grade_alphas`)
+ALPHAS_RIDGE = np.logspace(5, -3, 100)
+
+
+def _centralizar(X, y):
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    media_X, media_y = X.mean(axis=0), y.mean()
+    return X - media_X, y - media_y, media_X, media_y
+
+
+def grade_alphas(X, y, l1_ratio=1.0, n_alphas=100, eps=1e-3):
+    """
+    Grade geométrica decrescente de alphas do Lasso/ElasticNet: do menor alpha
+    que zera todos os coeficientes até `eps` vezes ele. `l1_ratio` deve estar em (0, 1].
+    """
+    if not 0 < l1_ratio <= 1:
+        raise ValueError(f"l1_ratio deve estar em (0, 1], não {l1_ratio} (sem parte L1, use o Ridge).")
+    Xc, yc, _, _ = _centralizar(X, y)
+    alpha_max = np.abs(Xc.T @ yc).max() / (len(yc) * l1_ratio)
+    return np.geomspace(alpha_max, alpha_max * eps, n_alphas)
+
+
+def caminho_enet(X, y, alphas, l1_ratio=1.0, max_iter=1000, tol=1e-4):
+    """
+    Coeficientes do ElasticNet (Lasso com `l1_ratio=1`) para cada alpha da grade
+    decrescente `alphas`. Devolve (coeficientes features × alphas, interceptos).
+    """
+    Xc, yc, media_X, media_y = _centralizar(X, y)
+    _, coeficientes, _ = enet_path(
+        np.asfortranarray(Xc), yc, l1_ratio=l1_ratio, alphas=alphas, max_iter=max_iter, tol=tol,
+    )
+    return coeficientes, media_y - media_X @ coeficientes
+
+
+def caminho_ridge(X, y, alphas=ALPHAS_RIDGE):
+    """Coeficientes do Ridge para cada alpha, de uma única SVD. Devolve (coeficientes, interceptos)."""
+    Xc, yc, media_X, media_y = _centralizar(X, y)
+    U, s, Vt = np.linalg.svd(Xc, full_matrices=False)
+    fatores = s[:, None] / (s[:, None] ** 2 + np.asarray(alphas)[None, :])
+    coeficientes = Vt.T @ (fatores * (U.T @ yc)[:, None])
+    return coeficientes, media_y - media_X @ coeficientes
+
+
+def caminhos(X, y, grades):
+    """
+    Caminhos de cada modelo de `grades` (nome -> (l1_ratio ou None para o Ridge,
+    alphas)). Devolve nome -> (coeficientes, interceptos).
+    """
+    resultado = {}
+    for nome, (l1_ratio, alphas) in grades.items():
+        if l1_ratio is None:
+            resultado[nome] = caminho_ridge(X, y, alphas)
+        else:
+            resultado[nome] = caminho_enet(X, y, alphas, l1_ratio)
+    return resultado
+
+
+def _avaliar_fold(X, y, treino, teste, grades):
+    """MSE no fold de teste para cada alpha de cada modelo."""
+    X_teste, y_teste = X[teste], y[teste]
+    erros = {}
+    for nome, (coeficientes, interceptos) in caminhos(X[treino], y[treino], grades).items():
+        y_pred = X_teste @ coeficientes + interceptos
+        erros[nome] = ((y_pred - y_teste[:, None]) ** 2).mean(axis=0)
+    return erros
+
+
+def validar_caminhos(X, y, grades, n_splits=5, n_repeats=1, random_state=42, jobs=None):
+    """
+    Curva de validação cruzada de cada modelo de `grades`: MSE médio e seu
+    desvio-padrão entre os folds para cada alpha (colunas `modelo`, `alpha`,
+    `mse`, `dp_mse`). Os folds rodam em paralelo, até `jobs` núcleos.
+    """
+    matriz = np.asarray(X, dtype=np.float64)
+    alvo = np.asarray(y, dtype=np.float64)
+    divisoes = divisoes_kfold(X, n_splits, n_repeats, random_state)
+    simultaneas, _ = dividir_nucleos(len(divisoes), jobs)
+    resultados = Parallel(n_jobs=simultaneas)(
+        delayed(_avaliar_fold)(matriz, alvo, treino, teste, grades) for treino, teste in divisoes
+    )
+
+    curvas = []
+    for nome, (_, alphas) in grades.items():
+        erros = np.array([r[nome] for r in resultados])
+        curvas.append(pd.DataFrame({
+            'modelo': nome, 'alpha': alphas, 'mse': erros.mean(axis=0), 'dp_mse': erros.std(axis=0, ddof=1),
+        }))
+    return pd.concat(curvas, ignore_index=True)
+
+
+def melhores_alphas(curva):
+    """Alpha de menor MSE médio de cada modelo da curva de validação."""
+    return curva.loc[curva.groupby('modelo', sort=False)['mse'].idxmin()].set_index('modelo')['alpha']
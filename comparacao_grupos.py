@@ -0,0 +1,238 @@
+"""
+Comparação do desempenho (MEDIA_NT_CE) entre grupos de cursos definidos pela
+resposta predominante de cada variável do questionário.
+
+Para cada prefixo `QE_Ixx`, a categoria predominante de um curso é a coluna
+`QE_Ixx_*` de maior proporção (o mesmo que `idxmax(axis=1)`), calculada para
+todas as variáveis sobre uma única matriz de proporções. Cada variável passa por
+uma ANOVA de um fator e por um teste de Tukey, executados uma vez só; o
+resultado do Tukey também serve para o gráfico. As variáveis são testadas em
+paralelo e os resultados saem em uma única tabela.
+
+Opcionalmente (`permutacoes` > 0), o F e as diferenças entre pares de grupos
+também são testados por permutação, sem supor normalidade nem variâncias iguais.
+As permutações são feitas em lotes: cada lote é uma matriz de rótulos permutados
+(uma permutação por linha), e as somas por grupo de todas as permutações saem de
+um único `np.bincount`. O tamanho do lote limita a memória, e cada lote tem sua
+própria semente derivada de `seed`, então o resultado não depende de `jobs`.
+"""
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import stats
+from statsmodels.stats.multicomp import pairwise_tukeyhsd
+
+from dados import VARIAVEL_ALVO
+from validacao_cruzada import dividir_nucleos
+
+# Elementos (permutações × cursos) de cada lote de permutações
+MAX_ELEMENTOS_LOTE = 1 << 22
+
+COLUNAS_RESULTADO = [
+    'variavel', 'teste', 'grupo1', 'grupo2', 'estatistica', 'diferenca',
+    'p_valor', 'inferior', 'superior', 'rejeita',
+]
+
+
+def variaveis_questionario(df):
+    """Prefixos `QE_Ixx` presentes na tabela, na ordem das colunas."""
+    return list(dict.fromkeys(c.rsplit('_', 1)[0] for c in df.columns if c.startswith('QE_')))
+
+
+def colunas_variavel(df, prefixo):
+    colunas = [c for c in df.columns if c.startswith(f'{prefixo}_')]
+    if not colunas:
+        raise ValueError(f"Nenhuma coluna '{prefixo}_*' na tabela.")
+    return colunas
+
+
+def categorias_predominantes(df, prefixos):
+    """
+    Categoria predominante (nome da coluna de maior proporção) de cada curso,
+    uma coluna por prefixo. Empates ficam com a primeira coluna, como no `idxmax`.
+    """
+    colunas = {prefixo: colunas_variavel(df, prefixo) for prefixo in prefixos}
+    matriz = df[[c for lista in colunas.values() for c in lista]].to_numpy()
+
+    predominantes = {}
+    inicio = 0
+    for prefixo, lista in colunas.items():
+        fim = inicio + len(lista)
+        predominantes[prefixo] = np.asarray(lista, dtype=object)[matriz[:, inicio:fim].argmax(axis=1)]
+        inicio = fim
+    return pd.DataFrame(predominantes, index=df.index)
+
+
+def testar_variavel(notas, categorias, alpha=0.05, permutacoes=0, seed=42, jobs=1):
+    """
+    ANOVA de um fator e Tukey HSD de `notas` entre as `categorias`. Devolve
+    (F, p-valor, resultado do Tukey, resultado de `teste_permutacao` ou None);
+    com menos de dois grupos, (nan, nan, None, None).
+    """
+    rotulos = np.unique(categorias)
+    if len(rotulos) < 2:
+        return np.nan, np.nan, None, None
+    f_stat, p_val = stats.f_oneway(*[notas[categorias == rotulo] for rotulo in rotulos])
+    tukey = pairwise_tukeyhsd(endog=notas, groups=categorias, alpha=alpha)
+    permutacao = teste_permutacao(notas, categorias, permutacoes, seed, jobs) if permutacoes else None
+    return float(f_stat), float(p_val), tukey, permutacao
+
+
+def _estatisticas(somas, tamanhos, total, sst):
+    """
+    F da ANOVA e estatística t de cada par de grupos (diferença de médias sobre o
+    erro padrão com a variância residual) para cada linha de `somas` (lotes × grupos).
+    """
+    n, k = tamanhos.sum(), len(tamanhos)
+    ssb = (somas ** 2 / tamanhos).sum(axis=1) - total ** 2 / n
+    msw = (sst - ssb) / (n - k)
+    f = (ssb / (k - 1)) / msw
+
+    medias = somas / tamanhos
+    i, j = np.triu_indices(k, 1)
+    diferencas = medias[:, j] - medias[:, i]
+    t = diferencas / np.sqrt(msw[:, None] * (1 / tamanhos[i] + 1 / tamanhos[j]))
+    return f, diferencas, t
+
+
+def _lote_permutacoes(semente, n_permutacoes, codigos, notas, tamanhos, f_obs, t_obs):
+    """Quantas permutações do lote igualam ou superam as estatísticas observadas."""
+    rng = np.random.default_rng(semente)
+    n, k = len(notas), len(tamanhos)
+    indices = rng.permuted(np.tile(np.arange(n), (n_permutacoes, 1)), axis=1)
+    chave = (np.arange(n_permutacoes)[:, None] * k + codigos[indices]).ravel()
+    somas = np.bincount(
+        chave, weights=np.broadcast_to(notas, (n_permutacoes, n)).ravel(), minlength=n_permutacoes * k
+    ).reshape(n_permutacoes, k)
+
+    f, _, t = _estatisticas(somas, tamanhos, notas.sum(), ((notas - notas.mean()) ** 2).sum())
+    # Tolerância relativa para não perder empates por arredondamento
+    limite_f = f_obs * (1 - 1e-12)
+    limite_t = np.abs(t_obs) * (1 - 1e-12)
+    t = np.abs(t)
+    return (
+        int((f >= limite_f).sum()),
+        (t >= limite_t).sum(axis=0),
+        (t.max(axis=1)[:, None] >= limite_t).sum(axis=0),
+    )
+
+
+def teste_permutacao(notas, categorias, permutacoes=10_000, seed=42, jobs=1,
+                     max_elementos=MAX_ELEMENTOS_LOTE):
+    """
+    Teste de permutação do F da ANOVA e das diferenças de média entre pares de
+    grupos (t com a variância residual, como no Tukey). O p-valor de cada par é
+    ajustado para comparações múltiplas pelo máximo de |t| entre os pares em cada
+    permutação (maxT de Westfall-Young). Devolve (F, p-valor do F, DataFrame dos
+    pares com grupo1, grupo2, diferenca, t, p_bruto e p_ajustado).
+    """
+    notas = np.asarray(notas, dtype=np.float64)
+    rotulos, codigos = np.unique(categorias, return_inverse=True)
+    tamanhos = np.bincount(codigos).astype(np.float64)
+    somas = np.bincount(codigos, weights=notas)[None, :]
+    f_obs, dif_obs, t_obs = _estatisticas(somas, tamanhos, notas.sum(), ((notas - notas.mean()) ** 2).sum())
+    f_obs, dif_obs, t_obs = f_obs[0], dif_obs[0], t_obs[0]
+
+    tamanho_lote = max(1, min(permutacoes, max_elementos // len(notas)))
+    lotes = [min(tamanho_lote, permutacoes - inicio) for inicio in range(0, permutacoes, tamanho_lote)]
+    sementes = np.random.SeedSequence(seed).spawn(len(lotes))
+    resultados = Parallel(n_jobs=jobs)(
+        delayed(_lote_permutacoes)(semente, tamanho, codigos, notas, tamanhos, f_obs, t_obs)
+        for semente, tamanho in zip(sementes, lotes)
+    )
+
+    excessos_f = sum(r[0] for r in resultados)
+    excessos_par = np.sum([r[1] for r in resultados], axis=0)
+    excessos_max = np.sum([r[2] for r in resultados], axis=0)
+    i, j = np.triu_indices(len(rotulos), 1)
+    pares = pd.DataFrame({
+        'grupo1': rotulos[i],
+        'grupo2': rotulos[j],
+        'diferenca': dif_obs,
+        't': t_obs,
+        'p_bruto': (1 + excessos_par) / (1 + permutacoes),
+        'p_ajustado': (1 + excessos_max) / (1 + permutacoes),
+    })
+    return float(f_obs), (1 + excessos_f) / (1 + permutacoes), pares
+
+
+def tabela_tukey(variavel, tukey):
+    """Comparações do Tukey em linhas da tabela de resultados."""
+    grupo1, grupo2 = np.triu_indices(len(tukey.groupsunique), 1)
+    return pd.DataFrame({
+        'variavel': variavel,
+        'teste': 'tukey',
+        'grupo1': tukey.groupsunique[grupo1],
+        'grupo2': tukey.groupsunique[grupo2],
+        'diferenca': tukey.meandiffs,
+        'p_valor': tukey.pvalues,
+        'inferior': tukey.confint[:, 0],
+        'superior': tukey.confint[:, 1],
+        'rejeita': tukey.reject,
+    })
+
+
+def tabela_permutacao(variavel, permutacao, alpha):
+    """F e pares do teste de permutação em linhas da tabela de resultados (p-valor dos pares ajustado)."""
+    f_stat, p_val, pares = permutacao
+    anova = pd.DataFrame([{
+        'variavel': variavel, 'teste': 'anova_permutacao', 'estatistica': f_stat,
+        'p_valor': p_val, 'rejeita': bool(p_val < alpha),
+    }])
+    pares = pd.DataFrame({
+        'variavel': variavel,
+        'teste': 'permutacao',
+        'grupo1': pares['grupo1'],
+        'grupo2': pares['grupo2'],
+        'estatistica': pares['t'],
+        'diferenca': pares['diferenca'],
+        'p_valor': pares['p_ajustado'],
+        'rejeita': pares['p_ajustado'] < alpha,
+    })
+    return pd.concat([anova, pares], ignore_index=True)
+
+
+def testar(df, prefixos=None, alvo=VARIAVEL_ALVO, alpha=0.05, jobs=None, permutacoes=0, seed=42):
+    """
+    Testa a diferença de `alvo` entre as categorias predominantes de cada prefixo
+    (padrão: todas as variáveis do questionário), usando até `jobs` núcleos.
+    Com `permutacoes` > 0, inclui também os testes de permutação (linhas
+    'anova_permutacao' e 'permutacao'). Devolve a tabela de resultados (linhas
+    'anova' e 'tukey' de cada variável) e os resultados do Tukey por variável,
+    para gráficos.
+    """
+    prefixos = prefixos or variaveis_questionario(df)
+    categorias = categorias_predominantes(df, prefixos)
+    notas = df[alvo].to_numpy()
+
+    simultaneas, jobs_variavel = dividir_nucleos(len(prefixos), jobs)
+    resultados = Parallel(n_jobs=simultaneas)(
+        delayed(testar_variavel)(notas, categorias[prefixo].to_numpy(), alpha, permutacoes, seed, jobs_variavel)
+        for prefixo in prefixos
+    )
+
+    linhas, tukeys = [], {}
+    for prefixo, (f_stat, p_val, tukey, permutacao) in zip(prefixos, resultados):
+        linhas.append(pd.DataFrame([{
+            'variavel': prefixo, 'teste': 'anova', 'estatistica': f_stat,
+            'p_valor': p_val, 'rejeita': bool(p_val < alpha),
+        }]))
+        if tukey is not None:
+            tukeys[prefixo] = tukey
+            linhas.append(tabela_tukey(prefixo, tukey))
+        if permutacao is not None:
+            linhas.append(tabela_permutacao(prefixo, permutacao, alpha))
+    return pd.concat(linhas, ignore_index=True).reindex(columns=COLUNAS_RESULTADO), tukeys
+
+
+def grafico_tukey(tukey, titulo="Intervalos de Confiança - Teste de Tukey"):
+    """Intervalos simultâneos do Tukey já calculado (sem refazer o teste)."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    tukey.plot_simultaneous(ax=ax)
+    ax.set_title(titulo)
+    ax.set_xlabel("Diferença de Média")
+    ax.grid(True)
+    return fig
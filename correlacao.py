@@ -0,0 +1,161 @@
+"""
+Correlação de todas as features com a nota (MEDIA_NT_CE) de uma vez.
+
+Em vez da matriz de correlação completa (features × features), as colunas são
+padronizadas (média zero, norma um) e as correlações com o alvo saem de um único
+produto matriz-vetor. No Spearman, as colunas são convertidas em postos uma vez
+e o mesmo produto é usado. Os p-valores são os analíticos (t com n - 2 graus de
+liberdade, como em `scipy.stats.pearsonr`/`spearmanr`) e são ajustados para
+comparações múltiplas por Benjamini-Hochberg.
+
+Os intervalos bootstrap são calculados em lotes: cada reamostra vira um vetor
+de pesos (quantas vezes cada curso foi sorteado), e as somas ponderadas de todas
+as reamostras do lote saem de produtos de matrizes. Cada lote tem sua própria
+semente derivada de `seed`, então o resultado não depende de `jobs`. No
+Spearman, as reamostras usam os postos da amostra original.
+
+    python correlacao.py
+    python correlacao.py --metodo spearman --bootstrap 2000 --saida tabelas/correlacao_spearman.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import stats
+
+from dados import VARIAVEL_ALVO
+
+# Elementos (reamostras × cursos) de cada lote do bootstrap
+MAX_ELEMENTOS_LOTE = 1 << 22
+
+
+def _matrizes(X, y, metodo):
+    """Matriz de features e vetor alvo em float64 (postos no Spearman), sem as linhas sem alvo."""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    validas = ~np.isnan(y)
+    X, y = X[validas], y[validas]
+    if np.isnan(X).any():
+        raise ValueError("As features não podem ter valores ausentes.")
+    if metodo == 'spearman':
+        X = stats.rankdata(X, axis=0)
+        y = stats.rankdata(y)
+    elif metodo != 'pearson':
+        raise ValueError(f"Método desconhecido: '{metodo}' (use 'pearson' ou 'spearman').")
+    return X, y
+
+
+def _padronizar(matriz):
+    """Centraliza e divide cada coluna pela sua norma (colunas constantes ficam NaN)."""
+    centrada = matriz - matriz.mean(axis=0)
+    norma = np.sqrt((centrada ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return centrada / np.where(norma > 0, norma, np.nan)
+
+
+def correlacoes(X, y, metodo='pearson'):
+    """Correlação de cada coluna de X com y. Devolve (coeficientes, n de cursos usados)."""
+    X, y = _matrizes(X, y, metodo)
+    r = _padronizar(X).T @ _padronizar(y[:, None])[:, 0]
+    return np.clip(r, -1.0, 1.0), len(y)
+
+
+def p_valores(r, n):
+    """P-valor bilateral de cada correlação (t com n - 2 graus de liberdade)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    return 2 * stats.t.sf(np.abs(t), n - 2)
+
+
+def benjamini_hochberg(p):
+    """P-valores ajustados por Benjamini-Hochberg (FDR); NaN ficam NaN."""
+    p = np.asarray(p, dtype=np.float64)
+    ajustados = np.full(len(p), np.nan)
+    validos = np.flatnonzero(~np.isnan(p))
+    ordem = validos[np.argsort(p[validos])]
+    m = len(ordem)
+    escalados = p[ordem] * m / np.arange(1, m + 1)
+    ajustados[ordem] = np.minimum(np.minimum.accumulate(escalados[::-1])[::-1], 1.0)
+    return ajustados
+
+
+def _lote_bootstrap(semente, n_reamostras, X, y):
+    """Correlações de cada reamostra do lote (reamostras × features), por somas ponderadas."""
+    rng = np.random.default_rng(semente)
+    n = len(y)
+    sorteios = rng.integers(0, n, (n_reamostras, n))
+    chave = (np.arange(n_reamostras)[:, None] * n + sorteios).ravel()
+    pesos = np.bincount(chave, minlength=n_reamostras * n).reshape(n_reamostras, n).astype(np.float64)
+
+    soma_x, soma_x2 = pesos @ X, pesos @ X ** 2
+    soma_y, soma_y2 = pesos @ y, pesos @ y ** 2
+    soma_xy = pesos @ (X * y[:, None])
+    cov = soma_xy - soma_x * soma_y[:, None] / n
+    var_x = soma_x2 - soma_x ** 2 / n
+    var_y = soma_y2 - soma_y ** 2 / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return cov / np.sqrt(var_x * var_y[:, None])
+
+
+def intervalos_bootstrap(X, y, metodo='pearson', reamostras=1000, nivel=0.95, seed=42, jobs=1,
+                         max_elementos=MAX_ELEMENTOS_LOTE):
+    """Intervalo percentil bootstrap da correlação de cada coluna de X com y. Devolve (inferiores, superiores)."""
+    X, y = _matrizes(X, y, metodo)
+    # Centralizar antes das somas reduz o erro de arredondamento das variâncias
+    X, y = X - X.mean(axis=0), y - y.mean()
+    tamanho_lote = max(1, min(reamostras, max_elementos // len(y)))
+    lotes = [min(tamanho_lote, reamostras - inicio) for inicio in range(0, reamostras, tamanho_lote)]
+    sementes = np.random.SeedSequence(seed).spawn(len(lotes))
+    resultados = Parallel(n_jobs=jobs)(
+        delayed(_lote_bootstrap)(semente, tamanho, X, y) for semente, tamanho in zip(sementes, lotes)
+    )
+    r = np.concatenate(resultados)
+    caudas = [(1 - nivel) / 2 * 100, (1 + nivel) / 2 * 100]
+    inferiores, superiores = np.nanpercentile(r, caudas, axis=0)
+    return inferiores, superiores
+
+
+def tabela_correlacoes(df, colunas=None, alvo=VARIAVEL_ALVO, metodo='pearson', bootstrap=0, nivel=0.95,
+                       seed=42, jobs=1):
+    """
+    Correlação de cada coluna (padrão: todas as `QE_*`) com `alvo`, com p-valor,
+    p-valor ajustado por Benjamini-Hochberg e, com `bootstrap` > 0, o intervalo
+    percentil com esse número de reamostras. Uma linha por variável, da maior
+    para a menor correlação; a coluna do coeficiente tem o nome do alvo.
+    """
+    colunas = colunas if colunas is not None else [c for c in df.columns if c.startswith('QE_')]
+    r, n = correlacoes(df[colunas], df[alvo], metodo)
+    p = p_valores(r, n)
+    tabela = pd.DataFrame({alvo: r, 'p_valor': p, 'p_ajustado': benjamini_hochberg(p)}, index=pd.Index(colunas))
+    if bootstrap:
+        tabela['inferior'], tabela['superior'] = intervalos_bootstrap(
+            df[colunas], df[alvo], metodo, bootstrap, nivel, seed, jobs
+        )
+    return tabela.sort_values(by=alvo, ascending=False)
+
+
+if __name__ == '__main__':
+    from dados import ARQUIVO_TABELA, carregar_tabela
+
+    parser = argparse.ArgumentParser(description="Correlação de todas as variáveis QE_* com a nota média do curso.")
+    parser.add_argument('--tabela', default=ARQUIVO_TABELA, help="Tabela agregada (pode ser a de todas as áreas).")
+    parser.add_argument('--metodo', choices=['pearson', 'spearman'], default='pearson')
+    parser.add_argument('--bootstrap', type=int, default=0, help="Reamostras dos intervalos bootstrap (0 = sem intervalos).")
+    parser.add_argument('--nivel', type=float, default=0.95, help="Nível de confiança dos intervalos.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente do bootstrap.")
+    parser.add_argument('--jobs', type=int, default=1, help="Núcleos usados no bootstrap.")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Nível da FDR para contar as correlações significativas.")
+    parser.add_argument('--saida', default='tabelas/tabela_correlacao.csv', help="CSV com as correlações.")
+    args = parser.parse_args()
+
+    df = carregar_tabela(args.tabela)
+    tabela = tabela_correlacoes(
+        df, metodo=args.metodo, bootstrap=args.bootstrap, nivel=args.nivel, seed=args.seed, jobs=args.jobs
+    )
+    tabela.to_csv(args.saida)
+    significativas = (tabela['p_ajustado'] < args.alpha).sum()
+    print(f"Correlações ({args.metodo}) de {len(tabela)} variáveis com {VARIAVEL_ALVO} salvas em '{args.saida}'.")
+    print(f"{significativas} significativas com FDR de {args.alpha:.0%} (Benjamini-Hochberg).")
+    print(tabela.head(15))
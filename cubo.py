@@ -0,0 +1,187 @@
+"""
+Cubo de agregados (rollup) da tabela por curso, por região, UF, categoria
+administrativa, modalidade e grupo do curso.
+
+Cada célula guarda somas, não médias: o número de cursos, a soma e a soma dos
+quadrados das médias dos cursos, o número de estudantes com nota (N_NT_CE), a
+soma das notas e, para cada proporção `QE_*`, a soma ponderada pelo número de
+estudantes com nota do curso. Assim, qualquer média (por curso ou por estudante)
+sai de uma divisão. Tabelas sem N_NT_CE (ex: a de computação) não têm as
+medidas por estudante, e as proporções `QE_*` viram médias simples dos cursos.
+
+O cubo tem todas as combinações das dimensões, inclusive os subtotais: em cada
+nível, as dimensões agregadas valem `TOTAL`. Cada nível é calculado a partir do
+nível mais detalhado, não da tabela por curso.
+
+O cubo fica salvo em `dados/cache/cubo/`, chaveado pelo hash da tabela, e uma
+consulta a um nível ou a uma célula é uma busca em um índice já montado.
+
+    python cubo.py --por CO_REGIAO_CURSO CO_CATEGAD CO_MODALIDADE
+    python cubo.py --por CO_UF_CURSO --colunas QE_I02_A QE_I08_G --saida tabelas/cubo_uf.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_microdados import hash_arquivo
+from dados import ARQUIVO_TABELA, VARIAVEL_ALVO
+
+DIMENSOES = ['CO_REGIAO_CURSO', 'CO_UF_CURSO', 'CO_CATEGAD', 'CO_MODALIDADE', 'CO_GRUPO']
+# Valor das dimensões agregadas (subtotais) em cada nível do cubo
+TOTAL = -1
+DIR_CACHE = os.path.join('dados', 'cache', 'cubo')
+# Incrementada quando as colunas do cubo mudam; cubos de outra versão são refeitos
+VERSAO_FORMATO = 1
+
+
+def medidas(df):
+    """
+    Somas de cada curso que entram no cubo (uma linha por curso). Sem a coluna
+    N_NT_CE, ficam só as medidas por curso, e cada curso pesa 1 nas proporções.
+    """
+    media = df[VARIAVEL_ALVO].astype('float64')
+    somas = pd.DataFrame({
+        'N_CURSOS': np.ones(len(df)),
+        'SOMA_MEDIA_CURSOS': media,
+        'SOMA2_MEDIA_CURSOS': media ** 2,
+    }, index=df.index)
+    peso = somas['N_CURSOS']
+    if 'N_NT_CE' in df.columns:
+        peso = df['N_NT_CE'].astype('float64')
+        somas['N_NT_CE'] = peso
+        somas['SOMA_NT_CE'] = media * peso
+    colunas_qe = [c for c in df.columns if c.startswith('QE_')]
+    return pd.concat([somas, df[colunas_qe].astype('float64').mul(peso, axis=0).add_prefix('SOMA_')], axis=1)
+
+
+def construir(df):
+    """
+    Monta o cubo (formato longo: uma linha por célula) a partir da tabela por
+    curso. A coluna NIVEL lista as dimensões detalhadas da célula, separadas por '+'.
+    """
+    dimensoes = [d for d in DIMENSOES if d in df.columns]
+    detalhado = pd.concat([df[dimensoes], medidas(df)], axis=1).groupby(dimensoes, dropna=False).sum()
+
+    niveis = []
+    for mascara in range(2 ** len(dimensoes)):
+        mantidas = [d for i, d in enumerate(dimensoes) if mascara >> i & 1]
+        if mantidas:
+            nivel = detalhado.groupby(level=mantidas, dropna=False).sum().reset_index()
+        else:
+            nivel = detalhado.sum().to_frame().T
+        totais = {d: TOTAL for d in dimensoes if d not in mantidas}
+        niveis.append(nivel.assign(NIVEL='+'.join(mantidas), **totais))
+
+    cubo = pd.concat(niveis, ignore_index=True)
+    return cubo[['NIVEL'] + dimensoes + list(detalhado.columns)]
+
+
+def _medias(somas, colunas=None):
+    """
+    Médias de um conjunto de células: por curso, por estudante (se o cubo tiver
+    N_NT_CE) e das proporções `colunas`.
+    """
+    n_cursos = somas['N_CURSOS']
+    media_cursos = somas['SOMA_MEDIA_CURSOS'] / n_cursos
+    variancia = (somas['SOMA2_MEDIA_CURSOS'] - n_cursos * media_cursos ** 2) / (n_cursos - 1).where(n_cursos > 1)
+    medias = pd.DataFrame({'N_CURSOS': n_cursos.astype('int64')})
+    peso = n_cursos
+    if 'N_NT_CE' in somas.columns:
+        peso = somas['N_NT_CE'].where(somas['N_NT_CE'] > 0)
+        medias['N_NT_CE'] = somas['N_NT_CE'].astype('int64')
+        medias[VARIAVEL_ALVO] = somas['SOMA_NT_CE'] / peso
+    medias['MEDIA_CURSOS'] = media_cursos
+    medias['DP_CURSOS'] = np.sqrt(variancia.clip(lower=0))
+    for coluna in colunas or []:
+        medias[coluna] = somas[f'SOMA_{coluna}'] / peso
+    return medias
+
+
+class Cubo:
+    """
+    Consultas ao cubo. `VARIAVEL_ALVO` é a média por estudante (cursos pesados
+    pelo número de estudantes com nota); `MEDIA_CURSOS`/`DP_CURSOS`, a média e o
+    desvio padrão das médias dos cursos; as proporções `QE_*` são pesadas como a nota
+    (por curso, se a tabela não tiver N_NT_CE; nesse caso não há `VARIAVEL_ALVO`).
+    """
+
+    def __init__(self, tabela):
+        self.tabela = tabela
+        self.dimensoes = [d for d in DIMENSOES if d in tabela.columns]
+        self.colunas_qe = [c[len('SOMA_'):] for c in tabela.columns if c.startswith('SOMA_QE_')]
+        self._niveis = {}
+        for nivel, celulas in tabela.groupby('NIVEL', sort=False):
+            mantidas = nivel.split('+') if nivel else []
+            celulas = celulas.drop(columns=['NIVEL'] + self.dimensoes)
+            if len(mantidas) == 1:
+                celulas.index = pd.Index(tabela.loc[celulas.index, mantidas[0]])
+            elif mantidas:
+                celulas.index = pd.MultiIndex.from_frame(tabela.loc[celulas.index, mantidas])
+            self._niveis[frozenset(mantidas)] = celulas
+
+    def _nivel(self, por):
+        desconhecidas = [d for d in por if d not in self.dimensoes]
+        if desconhecidas:
+            raise ValueError(f"Dimensões fora do cubo: {', '.join(desconhecidas)} (disponíveis: {', '.join(self.dimensoes)}).")
+        celulas = self._niveis[frozenset(por)]
+        return celulas.reorder_levels(por) if len(por) > 1 else celulas
+
+    def consultar(self, por=(), colunas=None):
+        """Médias de cada combinação das dimensões `por` (sem `por`: o total geral)."""
+        por = list(por)
+        medias = _medias(self._nivel(por), colunas)
+        return medias.sort_index() if por else medias.reset_index(drop=True)
+
+    def celula(self, colunas=None, **filtros):
+        """Médias de uma única célula, ex: `celula(CO_REGIAO_CURSO=3, CO_MODALIDADE=1)`."""
+        por = [d for d in DIMENSOES if d in filtros]
+        celulas = self._nivel(por)
+        chave = tuple(filtros[d] for d in por)
+        somas = celulas.loc[[chave[0] if len(chave) == 1 else chave]] if por else celulas
+        return _medias(somas, colunas).iloc[0]
+
+
+def carregar(tabela=ARQUIVO_TABELA):
+    """Cubo da tabela por curso `tabela`, do cache quando a tabela não mudou."""
+    nome = os.path.splitext(os.path.basename(tabela))[0]
+    caminho = os.path.join(DIR_CACHE, f'{nome}_v{VERSAO_FORMATO}_{hash_arquivo(tabela)[:16]}.parquet')
+    if os.path.exists(caminho):
+        return Cubo(pd.read_parquet(caminho))
+
+    from dados import carregar_tabela
+
+    cubo = construir(carregar_tabela(tabela))
+    os.makedirs(DIR_CACHE, exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    cubo.to_parquet(temporario)
+    os.replace(temporario, caminho)
+    return Cubo(cubo)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Consulta o cubo de agregados da tabela por curso.")
+    parser.add_argument('--por', nargs='*', default=[], metavar='DIMENSAO',
+                        help=f"Dimensões da consulta (padrão: total geral). Disponíveis: {', '.join(DIMENSOES)}")
+    parser.add_argument('--colunas', nargs='*', default=[], metavar='QE',
+                        help="Proporções QE_* incluídas na consulta (médias pesadas pelos estudantes).")
+    parser.add_argument('--tabela', default=ARQUIVO_TABELA, help="Tabela agregada por curso.")
+    parser.add_argument('--saida', default=None, help="CSV com o resultado da consulta.")
+    args = parser.parse_args()
+
+    cubo = carregar(args.tabela)
+    desconhecidas = [c for c in args.colunas if c not in cubo.colunas_qe]
+    if desconhecidas:
+        parser.error(f"colunas fora do cubo: {', '.join(desconhecidas)}")
+    try:
+        resultado = cubo.consultar(args.por, args.colunas)
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    print(f"Cubo com {len(cubo.tabela)} células ({', '.join(cubo.dimensoes)}).\n")
+    print(resultado.to_string())
+    if args.saida:
+        resultado.to_csv(args.saida)
+        print(f"\nConsulta salva em '{args.saida}'.")
@@ -0,0 +1,160 @@
+"""
+Carregamento da tabela agregada por curso (`tabelas/enade_2023_*_agregado.csv`).
+
+A tabela é lida com um esquema explícito, sem inferência de tipos: as proporções
+`QE_*` em float32 e os códigos (curso, IES, UF, região, ...) em inteiros pequenos.
+Isso reduz a memória da tabela a menos da metade.
+
+A tabela é lida uma única vez: em cada processo ela fica em memória e, entre
+processos, fica salva em `dados/cache/tabelas/` (chaveada pelo hash do CSV), junto
+com a matriz de features em `.npy`, que pode ser aberta por memory-map.
+"""
+
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_microdados import hash_arquivo
+from notas import COLUNAS_ESTATISTICAS
+
+# A variável de ambiente ENADE_TABELA permite usar outro recorte (ex: a tabela nacional)
+ARQUIVO_TABELA = os.environ.get('ENADE_TABELA', os.path.join('tabelas', 'enade_2023_computacao_agregado.csv'))
+CACHE_DIR = os.path.join('dados', 'cache', 'tabelas')
+
+VARIAVEL_ALVO = 'MEDIA_NT_CE'
+# Alvo, estatísticas das notas (derivadas do alvo, ver `notas`), identificadores
+# e códigos de caracterização do curso: nunca entram como features
+COLUNAS_NAO_FEATURES = [
+    'MEDIA_NT_CE', *COLUNAS_ESTATISTICAS,
+    'CO_CURSO', 'CO_IES', 'CO_MODALIDADE', 'CO_UF_CURSO', 'CO_MUNIC_CURSO',
+    'CO_CATEGAD', 'CO_REGIAO_CURSO', 'CO_GRUPO', 'NU_ANO',
+]
+
+# Tipos das colunas fixas da tabela; colunas `QE_*` usam TIPO_PROPORCAO
+ESQUEMA_TABELA = {
+    'CO_CURSO': 'int32',
+    'MEDIA_NT_CE': 'float64',
+    'N_NT_CE': 'int32',
+    'PROP_AUSENTES_NT_CE': 'float64',
+    'DP_NT_CE': 'float64',
+    'P10_NT_CE': 'float64',
+    'Q1_NT_CE': 'float64',
+    'MEDIANA_NT_CE': 'float64',
+    'Q3_NT_CE': 'float64',
+    'P90_NT_CE': 'float64',
+    'CO_IES': 'int32',
+    'CO_MODALIDADE': 'int8',
+    'CO_UF_CURSO': 'int8',
+    'CO_MUNIC_CURSO': 'int32',
+    'CO_CATEGAD': 'int16',
+    'CO_REGIAO_CURSO': 'int8',
+    'CO_GRUPO': 'int16',
+    'NU_ANO': 'int16',
+}
+TIPO_PROPORCAO = 'float32'
+
+
+def tipo_coluna(coluna):
+    """Tipo de uma coluna da tabela agregada segundo o esquema (None se não prevista)."""
+    if coluna in ESQUEMA_TABELA:
+        return ESQUEMA_TABELA[coluna]
+    if coluna.startswith('QE_'):
+        return TIPO_PROPORCAO
+    return None
+
+
+def aplicar_esquema(df):
+    """Converte as colunas de um DataFrame já carregado para os tipos do esquema."""
+    for coluna in df.columns:
+        tipo = tipo_coluna(coluna)
+        if tipo is None:
+            continue
+        if tipo.startswith('int') and df[coluna].isna().any():
+            tipo = tipo.capitalize()  # inteiro anulável (ex: Int8)
+        df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def _ler_csv(caminho):
+    colunas = pd.read_csv(caminho, nrows=0, encoding='utf-8-sig').columns
+    # Floats já são lidos no tipo final; os códigos são convertidos depois,
+    # pois podem vir como "51.0" se a tabela foi gerada com ausentes
+    tipos_leitura = {c: tipo_coluna(c) for c in colunas if (tipo_coluna(c) or '').startswith('float')}
+    df = pd.read_csv(caminho, encoding='utf-8-sig', dtype=tipos_leitura)
+    return aplicar_esquema(df)
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return os.path.abspath(caminho), info.st_size, info.st_mtime_ns
+
+
+def _salvar_atomico(caminho, escrever):
+    """Grava via arquivo temporário, para que outro processo nunca leia um cache pela metade."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as f:
+        escrever(f)
+    os.replace(temporario, caminho)
+
+
+@functools.lru_cache(maxsize=None)
+def _prefixo_cache(caminho_abs, tamanho, mtime_ns):
+    nome = os.path.splitext(os.path.basename(caminho_abs))[0]
+    return os.path.join(CACHE_DIR, f'{nome}_{hash_arquivo(caminho_abs)[:16]}')
+
+
+@functools.lru_cache(maxsize=None)
+def _carregar_memo(caminho_abs, tamanho, mtime_ns):
+    caminho_cache = _prefixo_cache(caminho_abs, tamanho, mtime_ns) + '.pkl'
+    if os.path.exists(caminho_cache):
+        return pd.read_pickle(caminho_cache)
+    df = _ler_csv(caminho_abs)
+    _salvar_atomico(caminho_cache, df.to_pickle)
+    return df
+
+
+def carregar_tabela(caminho=ARQUIVO_TABELA):
+    """
+    Lê a tabela agregada aplicando o esquema compacto. Chamadas seguintes (no
+    mesmo processo ou em outros) reaproveitam a leitura; cada chamada recebe
+    sua própria cópia, que pode ser alterada livremente.
+    """
+    return _carregar_memo(*_assinatura(caminho)).copy()
+
+
+@functools.lru_cache(maxsize=None)
+def _xy_memo(caminho_abs, tamanho, mtime_ns, mmap):
+    df = _carregar_memo(caminho_abs, tamanho, mtime_ns)
+    colunas = [c for c in df.columns if c not in COLUNAS_NAO_FEATURES]
+    if not mmap:
+        return df[colunas], df[VARIAVEL_ALVO]
+
+    prefixo = _prefixo_cache(caminho_abs, tamanho, mtime_ns)
+    if not os.path.exists(prefixo + '_X.npy'):
+        matriz = df[colunas].to_numpy(dtype=TIPO_PROPORCAO)
+        alvo = df[VARIAVEL_ALVO].to_numpy(dtype='float64')
+        _salvar_atomico(prefixo + '_colunas.json', lambda f: f.write(json.dumps(colunas).encode('utf-8')))
+        _salvar_atomico(prefixo + '_y.npy', lambda f: np.save(f, alvo))
+        _salvar_atomico(prefixo + '_X.npy', lambda f: np.save(f, matriz))
+
+    with open(prefixo + '_colunas.json', encoding='utf-8') as f:
+        colunas = json.load(f)
+    X = pd.DataFrame(np.load(prefixo + '_X.npy', mmap_mode='r'), columns=colunas, copy=False)
+    y = pd.Series(np.load(prefixo + '_y.npy', mmap_mode='r'), name=VARIAVEL_ALVO, copy=False)
+    return X, y
+
+
+def carregar_xy(caminho=ARQUIVO_TABELA, mmap=False):
+    """
+    Matriz de features X (todas as colunas exceto alvo, identificadores e
+    códigos do curso) e alvo y (MEDIA_NT_CE). Com `mmap`, X e y são abertos
+    somente leitura a partir de `.npy` em disco, sem copiar para a memória.
+    """
+    X, y = _xy_memo(*_assinatura(caminho), mmap)
+    if mmap:
+        return X, y
+    return X.copy(), y.copy()
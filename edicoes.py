@@ -0,0 +1,239 @@
+"""
+Várias edições do ENADE (2019, 2021, 2023, ...), com os agregados por curso de
+cada ano em uma partição própria.
+
+`EDICOES` registra, para cada ano, onde estão os microdados, em que arquivo
+está cada variável do questionário, as opções de leitura e os códigos `QE_Ixx`
+que mudaram de número em relação a 2023. Cada edição é agregada uma vez (com
+`main.construir_parciais`, para todos os cursos do país) e salva em
+`dados/edicoes/ano=<ano>/`, com as colunas já nos códigos de 2023. Uma edição só é
+processada de novo quando os seus arquivos mudam. Ao acrescentar um ano, só a
+partição dele é criada. Edições diferentes são processadas em paralelo.
+
+    python edicoes.py                                  # edições novas ou alteradas
+    python edicoes.py --anos 2019 2023 --jobs 4 --chunksize 1000000
+    python edicoes.py --saida tabelas/enade_edicoes_engenharias_agregado.csv
+"""
+
+import argparse
+import os
+
+import pandas as pd
+from joblib import Parallel, delayed
+
+import main as ingestao
+import parciais
+from validacao_cruzada import dividir_nucleos
+
+DIR_EDICOES = os.path.join('dados', 'edicoes')
+
+# Variáveis do questionário lidas pelo projeto (nos códigos de 2023)
+VARIAVEIS = [variavel for lista in ingestao.mapa_variaveis(ingestao.arquivos_categoricos).values() for variavel in lista]
+
+
+def _mesma_numeracao(ano):
+    """Mapa de arquivos de uma edição dividida em arquivos como a de 2023 (mesmos números de arquivo)."""
+    return {nome.replace('microdados2023_', f'microdados{ano}_'): v for nome, v in ingestao.arquivos_categoricos.items()}
+
+
+# Para cada edição:
+# - diretorio, arquivo_cursos, arquivo_notas: onde ler a caracterização dos cursos e as notas;
+# - arquivos: arquivo -> variável(is) do questionário, nos códigos daquele ano;
+# - leitura: opções do `read_csv` que diferem de `main.OPCOES_LEITURA`;
+# - codigos: código daquele ano -> código de 2023, para as perguntas que mudaram de número.
+# Confira os números dos arquivos e das perguntas no dicionário de dados de cada edição;
+# `verificar` aponta as colunas que não forem encontradas.
+EDICOES = {
+    # Até 2019, os microdados vêm em um único arquivo com todas as colunas
+    2019: {
+        'diretorio': os.path.join('dados', '2019'),
+        'arquivo_cursos': 'microdados_enade_2019.txt',
+        'arquivo_notas': 'microdados_enade_2019.txt',
+        'arquivos': {'microdados_enade_2019.txt': VARIAVEIS},
+        'leitura': {'decimal': ','},
+        'codigos': {},
+    },
+    2021: {
+        'diretorio': os.path.join('dados', '2021'),
+        'arquivo_cursos': 'microdados2021_arq1.txt',
+        'arquivo_notas': 'microdados2021_arq3.txt',
+        'arquivos': _mesma_numeracao(2021),
+        'leitura': {},
+        'codigos': {},
+    },
+    2023: {
+        'diretorio': ingestao.DATA_DIR,
+        'arquivo_cursos': ingestao.ARQUIVO_CURSOS,
+        'arquivo_notas': ingestao.ARQUIVO_NOTAS,
+        'arquivos': ingestao.arquivos_categoricos,
+        'leitura': {},
+        'codigos': {},
+    },
+}
+
+
+def edicao(ano):
+    if ano not in EDICOES:
+        raise ValueError(f"Edição {ano} não registrada em EDICOES (registradas: {', '.join(map(str, EDICOES))}).")
+    return EDICOES[ano]
+
+
+def opcoes_leitura(ano):
+    return {**ingestao.OPCOES_LEITURA, **edicao(ano)['leitura']}
+
+
+def arquivos_fonte(ano):
+    """Caminhos dos arquivos de microdados de uma edição (cada arquivo uma vez)."""
+    registro = edicao(ano)
+    nomes = [registro['arquivo_cursos'], registro['arquivo_notas']] + list(registro['arquivos'])
+    return [os.path.join(registro['diretorio'], nome) for nome in dict.fromkeys(nomes)]
+
+
+def caminho_particao(ano, diretorio=DIR_EDICOES):
+    return os.path.join(diretorio, f'ano={ano}', 'parciais.parquet')
+
+
+def verificar(ano):
+    """Confere, pelo cabeçalho de cada arquivo, que as colunas registradas para a edição existem."""
+    registro = edicao(ano)
+    esperadas = {}
+    for nome, colunas in [
+        (registro['arquivo_cursos'], ['CO_CURSO', 'CO_GRUPO'] + ingestao.COLUNAS_INFO_CURSO),
+        (registro['arquivo_notas'], ['CO_CURSO', 'NT_CE']),
+        *[(nome, ['CO_CURSO'] + variaveis) for nome, variaveis in ingestao.mapa_variaveis(registro['arquivos']).items()],
+    ]:
+        esperadas.setdefault(nome, []).extend(colunas)
+
+    opcoes = opcoes_leitura(ano)
+    problemas = []
+    for nome, colunas in esperadas.items():
+        caminho = os.path.join(registro['diretorio'], nome)
+        cabecalho = pd.read_csv(caminho, sep=opcoes['sep'], encoding=opcoes['encoding'], nrows=0).columns
+        faltando = [c for c in dict.fromkeys(colunas) if c not in cabecalho]
+        if faltando:
+            problemas.append(f"'{caminho}': {', '.join(faltando)}")
+    if problemas:
+        raise ValueError(f"Colunas não encontradas nos microdados de {ano} (confira EDICOES[{ano}]): " + '; '.join(problemas))
+
+
+def _codigos_2023(df, variaveis, codigos):
+    """Renomeia as colunas e variáveis de um ano para os códigos de 2023."""
+    if not codigos:
+        return df, variaveis
+    renomear = {}
+    for variavel, colunas in variaveis.items():
+        nova = codigos.get(variavel, variavel)
+        renomear.update({coluna: nova + coluna[len(variavel):] for coluna in colunas})
+    variaveis = {codigos.get(v, v): [renomear[c] for c in colunas] for v, colunas in variaveis.items()}
+    return df.rename(columns=renomear), variaveis
+
+
+def ingerir(ano, chunksize=None, jobs=1, usar_cache=True, diretorio=DIR_EDICOES):
+    """Agrega os microdados de uma edição e grava a sua partição. Devolve o caminho da partição."""
+    registro = edicao(ano)
+    verificar(ano)
+    anterior = ingestao.configuracao_leitura()
+    ingestao.configurar_leitura(
+        registro['diretorio'], registro['arquivo_cursos'], registro['arquivo_notas'], opcoes_leitura(ano)
+    )
+    try:
+        print(f"--- Edição {ano} ---")
+        df_parciais, variaveis = ingestao.construir_parciais(chunksize, jobs, usar_cache, registro['arquivos'])
+    finally:
+        ingestao.configurar_leitura(*anterior)
+    df_parciais, variaveis = _codigos_2023(df_parciais, variaveis, registro['codigos'])
+
+    caminho = caminho_particao(ano, diretorio)
+    fontes = parciais.assinatura_fontes(arquivos_fonte(ano))
+    parciais.salvar(df_parciais, variaveis, ingestao.COLUNAS_INFO_CURSO, fontes, caminho)
+    return caminho
+
+
+def disponiveis():
+    """Anos registrados cujos microdados estão todos presentes."""
+    return [ano for ano in EDICOES if all(os.path.exists(c) for c in arquivos_fonte(ano))]
+
+
+def pendentes(anos=None, diretorio=DIR_EDICOES):
+    """Anos (entre `anos`, padrão: os disponíveis) cuja partição não existe ou é de outros microdados."""
+    anos = disponiveis() if anos is None else anos
+    return [
+        ano for ano in anos
+        if not parciais.atualizados(parciais.assinatura_fontes(arquivos_fonte(ano)), caminho_particao(ano, diretorio))
+    ]
+
+
+def ingerir_edicoes(anos=None, chunksize=None, jobs=None, usar_cache=True, forcar=False, diretorio=DIR_EDICOES):
+    """
+    Processa as edições `anos` (padrão: as disponíveis) que estiverem pendentes
+    (todas, com `forcar`), várias ao mesmo tempo, dividindo `jobs` núcleos entre
+    elas. As partições das demais edições não são tocadas. Devolve os anos processados.
+    """
+    anos = disponiveis() if anos is None else list(anos)
+    fila = anos if forcar else pendentes(anos, diretorio)
+    if not fila:
+        return []
+    simultaneas, jobs_edicao = dividir_nucleos(len(fila), jobs)
+    # Com mais de uma edição ao mesmo tempo, cada uma fica em um processo próprio,
+    # pois `configurar_leitura` vale para o processo inteiro
+    Parallel(n_jobs=simultaneas)(
+        delayed(ingerir)(ano, chunksize, jobs_edicao, usar_cache, diretorio) for ano in fila
+    )
+    return fila
+
+
+def particoes(diretorio=DIR_EDICOES):
+    """Anos que têm partição salva."""
+    if not os.path.isdir(diretorio):
+        return []
+    anos = [int(nome.split('=', 1)[1]) for nome in os.listdir(diretorio) if nome.startswith('ano=')]
+    return sorted(ano for ano in anos if os.path.exists(caminho_particao(ano, diretorio)))
+
+
+def carregar_edicoes(grupos=ingestao.CODIGOS_GRUPOS_INCLUIDOS, anos=None, diretorio=DIR_EDICOES):
+    """
+    Tabela agregada por curso (formato de `main.agregar`) dos `grupos`, com todas
+    as edições salvas (ou só `anos`) empilhadas e a coluna NU_ANO. Respostas que
+    não aparecem em um ano ficam com proporção 0 nele.
+    """
+    tabelas = []
+    for ano in particoes(diretorio) if anos is None else anos:
+        df_parciais, meta = parciais.carregar(caminho_particao(ano, diretorio))
+        tabela = parciais.selecionar(df_parciais, meta, grupos)
+        tabela.index = pd.MultiIndex.from_arrays([[ano] * len(tabela), tabela.index], names=['NU_ANO', 'CO_CURSO'])
+        tabelas.append(tabela)
+    if not tabelas:
+        raise FileNotFoundError(f"Nenhuma edição salva em '{diretorio}' (rode `python edicoes.py`).")
+    df = pd.concat(tabelas)
+    return df.fillna({coluna: 0 for coluna in df.columns if coluna.startswith('QE_')})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Agrega várias edições do ENADE, uma partição por ano.")
+    parser.add_argument('--anos', type=int, nargs='+', default=None,
+                        help=f"Edições a processar (padrão: as disponíveis). Registradas: {', '.join(map(str, EDICOES))}")
+    parser.add_argument('--chunksize', type=int, default=None, help="Lê os microdados em blocos com este número de linhas.")
+    parser.add_argument('--jobs', type=int, default=None, help="Núcleos no total (divididos entre as edições).")
+    parser.add_argument('--sem-cache', action='store_true', help="Não usa nem cria o cache Parquet dos microdados.")
+    parser.add_argument('--forcar', action='store_true', help="Processa as edições mesmo com a partição atualizada.")
+    parser.add_argument('--grupos', type=int, nargs='+', default=ingestao.CODIGOS_GRUPOS_INCLUIDOS,
+                        help="Códigos CO_GRUPO dos cursos incluídos na tabela de --saida.")
+    parser.add_argument('--saida', default=None, help="CSV com a tabela por curso de todas as edições salvas.")
+    args = parser.parse_args()
+
+    desconhecidos = [ano for ano in args.anos or [] if ano not in EDICOES]
+    if desconhecidos:
+        parser.error(f"edições não registradas: {', '.join(map(str, desconhecidos))}")
+    ausentes = [ano for ano in args.anos or [] if ano not in disponiveis()]
+    if ausentes:
+        parser.error(f"microdados ausentes para: {', '.join(map(str, ausentes))}")
+
+    processadas = ingerir_edicoes(args.anos, args.chunksize, args.jobs, not args.sem_cache, args.forcar)
+    atualizadas = [ano for ano in particoes() if ano not in processadas]
+    print(f"Edições processadas: {', '.join(map(str, processadas)) or 'nenhuma'}; "
+          f"já atualizadas: {', '.join(map(str, atualizadas)) or 'nenhuma'}.")
+
+    if args.saida:
+        df = carregar_edicoes(args.grupos)
+        df.to_csv(args.saida, encoding='utf-8-sig')
+        print(f"Tabela com {len(df)} cursos-edição salva em '{args.saida}'.")
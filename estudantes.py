@@ -0,0 +1,219 @@
+"""
+Base de microdados por estudante em memory-map, para re-agregar por curso sem
+reler os arquivos de texto.
+
+Cada coluna fica em um `.npy` próprio em `dados/estudantes/`, com as linhas
+ordenadas por CO_CURSO. `offsets.npy` marca onde começa cada curso: os
+estudantes do i-ésimo curso de `cursos.npy` são as linhas offsets[i]:offsets[i+1]
+de qualquer coluna, uma fatia contígua lida do disco sem cópia. As respostas
+`QE_*` são guardadas como códigos inteiros (-1 = ausente), com os rótulos no
+`meta.json`, e NT_CE em float64 (NaN = ausente). A caracterização dos cursos
+(CO_GRUPO, UF, ...) fica em `cursos/`, uma linha por curso de `cursos.npy`.
+
+    python estudantes.py            # monta a base (ou refaz, se os microdados mudaram)
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import main as ingestao
+import parciais
+from agregacao import codificar_respostas, matriz_contagens, tabela_contagens
+
+DIR_BASE = os.path.join('dados', 'estudantes')
+COLUNAS_CURSO = ['CO_GRUPO'] + ingestao.COLUNAS_INFO_CURSO
+
+
+def _tipo_codigos(n_rotulos):
+    return np.int8 if n_rotulos < 128 else np.int16
+
+
+def _ler_alinhado(filename, colunas, co_curso, usar_cache):
+    """Lê `colunas` de um arquivo conferindo que as linhas são os mesmos estudantes do arquivo 1."""
+    df = ingestao.ler_microdados(filename, ['CO_CURSO'] + colunas, usar_cache)
+    if not np.array_equal(df['CO_CURSO'].to_numpy(), co_curso):
+        raise ValueError(f"As linhas de '{filename}' não correspondem às do arquivo 1 (CO_CURSO diferente).")
+    return df
+
+
+def atualizada(destino=DIR_BASE, arquivos=ingestao.arquivos_categoricos):
+    """Indica se a base salva foi montada a partir dos arquivos de microdados atuais."""
+    caminho_meta = os.path.join(destino, 'meta.json')
+    if not os.path.exists(caminho_meta):
+        return False
+    with open(caminho_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    return meta['fontes'] == parciais.assinatura_fontes(ingestao.arquivos_fonte(arquivos))
+
+
+def construir(destino=DIR_BASE, arquivos=ingestao.arquivos_categoricos, usar_cache=True):
+    """
+    Monta a base a partir dos microdados (um arquivo por vez na memória). A base
+    é escrita em um diretório temporário e só substitui a anterior no fim.
+    """
+    fontes = parciais.assinatura_fontes(ingestao.arquivos_fonte(arquivos))
+    temporario = destino + '.tmp'
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(os.path.join(temporario, 'cursos'))
+
+    def salvar(nome, valores):
+        np.save(os.path.join(temporario, f'{nome}.npy'), valores)
+
+    print("Ordenando os estudantes por curso (arquivo 1)...")
+    df_cursos = ingestao.ler_microdados(ingestao.ARQUIVO_CURSOS, ['CO_CURSO'] + COLUNAS_CURSO, usar_cache)
+    co_curso = df_cursos['CO_CURSO'].to_numpy()
+    ordem = np.argsort(co_curso, kind='stable')
+    cursos, inicios = np.unique(co_curso[ordem], return_index=True)
+    salvar('CO_CURSO', co_curso[ordem].astype(np.int32))
+    salvar('cursos', cursos.astype(np.int32))
+    salvar('offsets', np.append(inicios, len(co_curso)).astype(np.int64))
+
+    info = df_cursos.drop_duplicates(subset='CO_CURSO').set_index('CO_CURSO').loc[cursos]
+    for coluna in COLUNAS_CURSO:
+        salvar(os.path.join('cursos', coluna), info[coluna].to_numpy())
+    del df_cursos, info
+
+    print("Gravando as notas (NT_CE)...")
+    notas = _ler_alinhado(ingestao.ARQUIVO_NOTAS, ['NT_CE'], co_curso, usar_cache)
+    salvar('NT_CE', pd.to_numeric(notas['NT_CE'], errors='coerce').to_numpy(dtype=np.float64)[ordem])
+    del notas
+
+    rotulos = {}
+    for filename, variaveis in ingestao.mapa_variaveis(arquivos).items():
+        print(f"Gravando {', '.join(variaveis)} ({filename})...")
+        df = _ler_alinhado(filename, variaveis, co_curso, usar_cache)
+        for variavel in variaveis:
+            codigos, valores = codificar_respostas(df[variavel])
+            rotulos[variavel] = pd.Index(valores).tolist()
+            salvar(variavel, codigos.astype(_tipo_codigos(len(valores)))[ordem])
+
+    meta = {
+        'n_estudantes': len(co_curso),
+        'variaveis': rotulos,
+        'colunas_curso': COLUNAS_CURSO,
+        'fontes': fontes,
+    }
+    with open(os.path.join(temporario, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+    print(f"Base de {len(co_curso)} estudantes e {len(cursos)} cursos salva em '{destino}'.")
+
+
+class BaseEstudantes:
+    """Colunas da base por estudante (em memory-map) e agregações por curso."""
+
+    def __init__(self, diretorio=DIR_BASE):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.rotulos = self.meta['variaveis']
+        self.cursos = self._abrir('cursos')
+        self.offsets = self._abrir('offsets')
+
+    def _abrir(self, nome):
+        return np.load(os.path.join(self.diretorio, f'{nome}.npy'), mmap_mode='r')
+
+    def coluna(self, nome):
+        """Coluna por estudante, ordenada por curso: CO_CURSO, NT_CE ou os códigos de uma `QE_*`."""
+        return self._abrir(nome)
+
+    def respostas(self, variavel):
+        """Respostas de uma variável `QE_*` com os rótulos originais."""
+        return pd.Categorical.from_codes(self.coluna(variavel), self.rotulos[variavel])
+
+    def info_cursos(self):
+        """Caracterização de cada curso (CO_GRUPO, UF, ...), indexada por CO_CURSO."""
+        return pd.DataFrame(
+            {coluna: self._abrir(os.path.join('cursos', coluna)) for coluna in self.meta['colunas_curso']},
+            index=pd.Index(self.cursos, name='CO_CURSO'),
+        )
+
+    def cursos_dos_grupos(self, grupos):
+        return self.cursos[np.isin(self._abrir(os.path.join('cursos', 'CO_GRUPO')), grupos)]
+
+    def faixa(self, co_curso):
+        """Fatia das linhas dos estudantes de um curso."""
+        i = np.searchsorted(self.cursos, co_curso)
+        if i == len(self.cursos) or self.cursos[i] != co_curso:
+            raise KeyError(f"Curso {co_curso} não encontrado na base.")
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def estudantes(self, co_curso, colunas=('NT_CE',)):
+        """DataFrame com `colunas` dos estudantes de um curso (respostas com rótulos)."""
+        faixa = self.faixa(co_curso)
+        dados = {}
+        for coluna in colunas:
+            valores = self.coluna(coluna)[faixa]
+            if coluna in self.rotulos:
+                valores = pd.Categorical.from_codes(valores, self.rotulos[coluna])
+            dados[coluna] = valores
+        return pd.DataFrame(dados)
+
+    def posicao_curso(self):
+        """Posição em `cursos` do curso de cada estudante."""
+        return np.repeat(np.arange(len(self.cursos)), np.diff(self.offsets))
+
+    def por_curso(self, nome, funcao, cursos_ids=None):
+        """
+        Aplica `funcao` (ex: np.nanmedian) à fatia de cada curso de uma coluna.
+        Devolve uma Series indexada por CO_CURSO.
+        """
+        valores = self.coluna(nome)
+        cursos = self.cursos if cursos_ids is None else np.sort(np.intersect1d(self.cursos, cursos_ids))
+        posicoes = np.searchsorted(self.cursos, cursos)
+        resultado = [funcao(valores[self.offsets[i]:self.offsets[i + 1]]) for i in posicoes]
+        return pd.Series(resultado, index=pd.Index(cursos, name='CO_CURSO'), name=nome)
+
+    def contagens(self, variavel, cursos_ids=None):
+        """Contagem de cada resposta de `variavel` por curso (cursos × respostas)."""
+        codigos = np.asarray(self.coluna(variavel))
+        validos = codigos >= 0
+        if cursos_ids is not None:
+            validos &= np.isin(self.coluna('CO_CURSO'), cursos_ids)
+        rotulos = self.rotulos[variavel]
+        contagens = matriz_contagens(
+            self.posicao_curso()[validos], codigos[validos].astype(np.int64), len(self.cursos), len(rotulos)
+        )
+        return tabela_contagens(contagens, pd.Index(self.cursos), rotulos, variavel)
+
+    def tabela_cruzada(self, variavel_a, variavel_b, cursos_ids=None):
+        """Contagem conjunta das respostas de duas variáveis, entre os estudantes de `cursos_ids`."""
+        a = np.asarray(self.coluna(variavel_a)).astype(np.int64)
+        b = np.asarray(self.coluna(variavel_b)).astype(np.int64)
+        validos = (a >= 0) & (b >= 0)
+        if cursos_ids is not None:
+            validos &= np.isin(self.coluna('CO_CURSO'), cursos_ids)
+        rotulos_a, rotulos_b = self.rotulos[variavel_a], self.rotulos[variavel_b]
+        contagens = matriz_contagens(a[validos], b[validos], len(rotulos_a), len(rotulos_b))
+        return pd.DataFrame(
+            contagens,
+            index=pd.Index(rotulos_a, name=variavel_a),
+            columns=pd.Index(rotulos_b, name=variavel_b),
+        )
+
+
+def abrir(diretorio=DIR_BASE, arquivos=ingestao.arquivos_categoricos):
+    """Abre a base, montando-a antes se não existir ou se os microdados mudaram."""
+    fontes_disponiveis = all(os.path.exists(caminho) for caminho in ingestao.arquivos_fonte(arquivos))
+    if fontes_disponiveis and not atualizada(diretorio, arquivos):
+        construir(diretorio, arquivos)
+    return BaseEstudantes(diretorio)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Monta a base de microdados por estudante (memory-map).")
+    parser.add_argument('--sem-cache', action='store_true', help="Lê os microdados do texto, sem o cache Parquet.")
+    parser.add_argument('--forcar', action='store_true', help="Refaz a base mesmo se estiver atualizada.")
+    args = parser.parse_args()
+
+    if args.forcar or not atualizada():
+        construir(usar_cache=not args.sem_cache)
+    else:
+        print(f"Base em '{DIR_BASE}' já está atualizada.")
@@ -0,0 +1,189 @@
+"""
+Explicação dos modelos salvos em `modelos/`: importância por permutação e
+contribuições TreeSHAP.
+
+A importância de `feature_importances_` (impureza/ganho) favorece variáveis com
+muitos pontos de corte. A importância por permutação mede quanto o MSE piora
+quando os valores de uma variável são embaralhados entre os cursos. As cópias
+permutadas de várias variáveis são empilhadas em uma única matriz e pontuadas
+em um só `predict` por lote (em vez de uma chamada por variável), e os lotes
+rodam em paralelo. Cada (variável, repetição) tem sua própria semente, então o
+resultado não depende do tamanho dos lotes nem de `jobs`.
+
+Para o XGBoost, as contribuições SHAP de cada variável em cada curso vêm do
+TreeSHAP nativo (`pred_contribs`), exato e multithread.
+
+Os resultados ficam em `modelos/<nome>/<versao>/explicacao/`, chaveados pelos
+dados avaliados e pelos parâmetros; explicar de novo o mesmo artefato só lê o cache.
+
+    python explicacao_modelos.py --modelo random_forest
+    python explicacao_modelos.py --modelo xgboost --repeticoes 10 --jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from validacao_cruzada import dividir_nucleos
+
+# Elementos (linhas × features) de cada matriz pontuada de uma vez
+MAX_ELEMENTOS_LOTE = 1 << 24
+TAMANHO_LOTE_SHAP = 100_000
+
+
+def _id_explicacao(X, y, **parametros):
+    """Identifica a explicação (dados avaliados + parâmetros) dentro do diretório do artefato."""
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    if y is not None:
+        sha.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    sha.update(json.dumps(parametros, sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+
+def _lote_permutacao(modelo, X, y, colunas, tarefas, seed):
+    """MSE do modelo com a coluna `j` permutada, para cada (j, repeticao) de `tarefas`."""
+    n = len(X)
+    pilha = np.tile(X, (len(tarefas), 1))
+    for k, (j, repeticao) in enumerate(tarefas):
+        rng = np.random.default_rng([seed, j, repeticao])
+        pilha[k * n:(k + 1) * n, j] = X[rng.permutation(n), j]
+    y_pred = modelo.predict(pd.DataFrame(pilha, columns=colunas, copy=False)).reshape(len(tarefas), n)
+    return ((y_pred - y) ** 2).mean(axis=1)
+
+
+def importancia_permutacao(modelo, X, y, n_repeticoes=5, seed=42, jobs=None,
+                           max_elementos=MAX_ELEMENTOS_LOTE):
+    """
+    Aumento do MSE de `modelo` em (X, y) quando cada coluna de X é permutada,
+    em `n_repeticoes` permutações independentes. Devolve um DataFrame indexado
+    pelas variáveis com a média e o desvio-padrão do aumento e a queda média do
+    R², ordenado da mais para a menos importante.
+    """
+    colunas = list(X.columns)
+    matriz = X.to_numpy(dtype=np.float32)
+    alvo = y.to_numpy(dtype=np.float64)
+    mse_base = float(((modelo.predict(X) - alvo) ** 2).mean())
+
+    tarefas = [(j, r) for j in range(len(colunas)) for r in range(n_repeticoes)]
+    por_lote = max(1, max_elementos // matriz.size)
+    lotes = [tarefas[inicio:inicio + por_lote] for inicio in range(0, len(tarefas), por_lote)]
+    simultaneas, n_jobs_modelo = dividir_nucleos(len(lotes), jobs)
+    if 'n_jobs' in modelo.get_params():
+        modelo.set_params(n_jobs=n_jobs_modelo)
+
+    resultados = Parallel(n_jobs=simultaneas)(
+        delayed(_lote_permutacao)(modelo, matriz, alvo, colunas, lote, seed) for lote in lotes
+    )
+    aumentos = (np.concatenate(resultados) - mse_base).reshape(len(colunas), n_repeticoes)
+    return pd.DataFrame({
+        'aumento_mse': aumentos.mean(axis=1),
+        'dp_aumento_mse': aumentos.std(axis=1, ddof=1) if n_repeticoes > 1 else np.nan,
+        'queda_r2': aumentos.mean(axis=1) / alvo.var(),
+    }, index=pd.Index(colunas, name='variavel')).sort_values('aumento_mse', ascending=False)
+
+
+def contribuicoes_shap(modelo, X, jobs=None, tamanho_lote=TAMANHO_LOTE_SHAP):
+    """
+    Contribuições TreeSHAP de cada variável para a previsão de cada linha de X
+    (só XGBoost). Devolve um DataFrame com uma coluna por variável e a coluna
+    'BIAS'; a soma de cada linha é a previsão do modelo.
+    """
+    from xgboost import DMatrix, XGBRegressor
+
+    if not isinstance(modelo, XGBRegressor):
+        raise TypeError(f"Contribuições SHAP disponíveis só para XGBRegressor, não para {type(modelo).__name__}.")
+    booster = modelo.get_booster()
+    booster.set_param({'nthread': jobs or os.cpu_count()})
+    contribuicoes = np.concatenate([
+        booster.predict(DMatrix(X.iloc[inicio:inicio + tamanho_lote]), pred_contribs=True)
+        for inicio in range(0, len(X), tamanho_lote)
+    ])
+    return pd.DataFrame(contribuicoes, index=X.index, columns=[*X.columns, 'BIAS'])
+
+
+def resumo_shap(contribuicoes):
+    """Média do |SHAP| e do SHAP de cada variável, da mais para a menos importante."""
+    variaveis = contribuicoes.drop(columns='BIAS')
+    return pd.DataFrame({
+        'media_abs_shap': variaveis.abs().mean(),
+        'media_shap': variaveis.mean(),
+    }).rename_axis('variavel').sort_values('media_abs_shap', ascending=False)
+
+
+def explicar(modelo, diretorio, X, y, n_repeticoes=5, seed=42, jobs=None, usar_cache=True):
+    """
+    Importância por permutação e, para o XGBoost, contribuições SHAP do modelo
+    salvo em `diretorio`, lidas do cache quando já calculadas para os mesmos
+    dados e parâmetros. Devolve (importancia, contribuicoes ou None).
+    """
+    cache = os.path.join(diretorio, 'explicacao')
+    os.makedirs(cache, exist_ok=True)
+
+    id_permutacao = _id_explicacao(X, y, metodo='permutacao', repeticoes=n_repeticoes, seed=seed)
+    caminho = os.path.join(cache, f'permutacao_{id_permutacao}.csv')
+    if usar_cache and os.path.exists(caminho):
+        importancia = pd.read_csv(caminho, index_col='variavel')
+    else:
+        importancia = importancia_permutacao(modelo, X, y, n_repeticoes, seed, jobs)
+        importancia.to_csv(caminho)
+
+    contribuicoes = None
+    if type(modelo).__name__ == 'XGBRegressor':
+        caminho = os.path.join(cache, f"shap_{_id_explicacao(X, None, metodo='shap')}.npy")
+        if usar_cache and os.path.exists(caminho):
+            contribuicoes = pd.DataFrame(np.load(caminho), index=X.index, columns=[*X.columns, 'BIAS'])
+        else:
+            contribuicoes = contribuicoes_shap(modelo, X, jobs)
+            np.save(caminho, contribuicoes.to_numpy())
+    return importancia, contribuicoes
+
+
+if __name__ == '__main__':
+    from sklearn.model_selection import train_test_split
+
+    from artefatos import DIR_MODELOS, carregar_modelo, tabela_features
+    from dados import carregar_xy
+
+    parser = argparse.ArgumentParser(description="Importância por permutação e SHAP de um modelo salvo.")
+    parser.add_argument('--modelo', required=True, help="Nome do modelo salvo (ex: random_forest, xgboost).")
+    parser.add_argument('--versao', default=None, help="Versão do artefato (padrão: a mais recente).")
+    parser.add_argument('--conjunto', choices=['teste', 'todos'], default='teste',
+                        help="Cursos avaliados: o teste do treino (20%%, random_state=42) ou todos.")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Permutações por variável.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente das permutações.")
+    parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados (padrão: todos).")
+    parser.add_argument('--sem-cache', action='store_true', help="Recalcula mesmo se já houver resultado salvo.")
+    args = parser.parse_args()
+
+    modelo, meta = carregar_modelo(args.modelo, args.versao)
+    X, y = carregar_xy(meta['arquivo_dados'])
+    X = tabela_features(X, meta['colunas'])
+    if args.conjunto == 'teste':
+        # Mesma divisão dos scripts de treino: o modelo não viu esses cursos
+        _, X, _, y = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    print(f"Explicando '{meta['nome']}' versão {meta['versao']} em {len(X)} cursos ({args.conjunto})...")
+    importancia, contribuicoes = explicar(
+        modelo, os.path.join(DIR_MODELOS, meta['nome'], meta['versao']), X, y,
+        args.repeticoes, args.seed, args.jobs, not args.sem_cache,
+    )
+
+    print("\nTop 20 variáveis por importância de permutação:")
+    print(importancia.head(20))
+    saida = os.path.join('tabelas', f"importancia_permutacao_{meta['nome']}.csv")
+    importancia.to_csv(saida, encoding='utf-8-sig')
+    print(f"Importâncias salvas em '{saida}'.")
+
+    if contribuicoes is not None:
+        resumo = resumo_shap(contribuicoes)
+        print("\nTop 20 variáveis por média do |SHAP|:")
+        print(resumo.head(20))
+        saida = os.path.join('tabelas', f"shap_{meta['nome']}.csv")
+        resumo.to_csv(saida, encoding='utf-8-sig')
+        print(f"Resumo SHAP salvo em '{saida}'.")
@@ -0,0 +1,282 @@
+"""
+Figuras do projeto separadas em duas partes: os dados de cada figura (uma tabela
+pequena calculada a partir da tabela agregada, do cubo ou de um modelo salvo) e o desenho
+(que só recebe essa tabela e devolve a figura, sem `plt.show()`).
+
+`FIGURAS` descreve cada figura: arquivo de saída, entradas ('tabela', 'cubo' ou
+'modelo:<nome>'), função dos dados, função do desenho e estilo. Os scripts de
+`graficos/` usam as mesmas funções; `relatorio.py` gera todas as figuras de uma
+vez, em paralelo, guardando os dados de cada uma em cache.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from dados import VARIAVEL_ALVO
+
+MAPA_UF = {
+    11: 'RO', 12: 'AC', 13: 'AM', 14: 'RR', 15: 'PA', 16: 'AP', 17: 'TO',
+    21: 'MA', 22: 'PI', 23: 'CE', 24: 'RN', 25: 'PB', 26: 'PE', 27: 'AL', 28: 'SE', 29: 'BA',
+    31: 'MG', 32: 'ES', 33: 'RJ', 35: 'SP',
+    41: 'PR', 42: 'SC', 43: 'RS',
+    50: 'MS', 51: 'MT', 52: 'GO', 53: 'DF'
+}
+MAPA_MODALIDADE = {1: 'Presencial', 0: 'EAD'}
+MAPA_RACA = {
+    'QE_I02_A': 'Branca',
+    'QE_I02_B': 'Preta',
+    'QE_I02_C': 'Amarela',
+    'QE_I02_D': 'Parda',
+    'QE_I02_E': 'Indígena',
+    'QE_I02_F': 'Não declarado'
+}
+# Coluna da maior faixa de renda (verifique no dicionário de dados; ex: "Mais de 20 salários mínimos")
+COLUNA_MAIOR_RENDA = 'QE_I08_G'
+
+
+# --- Dados das figuras ---
+
+def dados_modalidade(df):
+    """Nota de cada curso com o nome da modalidade."""
+    return pd.DataFrame({
+        'MODALIDADE': df['CO_MODALIDADE'].map(MAPA_MODALIDADE),
+        VARIAVEL_ALVO: df[VARIAVEL_ALVO],
+    })
+
+
+def dados_media_uf(cubo):
+    """Média da nota dos cursos por UF (do cubo, ver `cubo.py`), da maior para a menor."""
+    media = cubo.consultar(['CO_UF_CURSO'])['MEDIA_CURSOS'].rename(VARIAVEL_ALVO)
+    media.index = media.index.map(MAPA_UF).rename('SG_UF')
+    return media[media.index.notna()].sort_values(ascending=False).to_frame()
+
+
+def correlacoes_com_nota(df, colunas):
+    """Correlação de Pearson de cada coluna com a nota (com p-valores), da maior para a menor."""
+    from correlacao import tabela_correlacoes
+
+    return tabela_correlacoes(df, colunas)
+
+
+def dados_raca(df):
+    colunas = [c for c in df.columns if c.startswith('QE_I02_')]
+    if not colunas:
+        raise ValueError("Nenhuma coluna de raça/cor ('QE_I02_*') na tabela.")
+    return correlacoes_com_nota(df, colunas).rename(index=MAPA_RACA)
+
+
+def dados_renda(df):
+    if COLUNA_MAIOR_RENDA not in df.columns:
+        raise ValueError(f"A coluna '{COLUNA_MAIOR_RENDA}' não foi encontrada na tabela.")
+    return pd.DataFrame({'PERCENTUAL': df[COLUNA_MAIOR_RENDA] * 100, VARIAVEL_ALVO: df[VARIAVEL_ALVO]})
+
+
+def dados_socio(df):
+    return correlacoes_com_nota(df, [c for c in df.columns if c.startswith('QE_')])
+
+
+def dados_tukey(df, variavel):
+    """
+    Média e meia-largura do intervalo simultâneo do Tukey (Hochberg e Tamhane,
+    como em `plot_simultaneous`) de cada categoria predominante de `variavel`.
+    """
+    from statsmodels.sandbox.stats.multicomp import simultaneous_ci
+
+    from comparacao_grupos import categorias_predominantes, testar
+
+    _, tukeys = testar(df, [variavel], jobs=1)
+    if variavel not in tukeys:
+        raise ValueError(f"Todos os cursos têm a mesma categoria predominante de {variavel}.")
+    tukey = tukeys[variavel]
+    grupos = df[VARIAVEL_ALVO].groupby(categorias_predominantes(df, [variavel])[variavel]).agg(['mean', 'size'])
+    grupos = grupos.reindex(tukey.groupsunique)
+    return pd.DataFrame({
+        'media': grupos['mean'].to_numpy(),
+        'meia_largura': simultaneous_ci(tukey.q_crit, tukey.variance, grupos['size'].to_numpy()),
+    }, index=pd.Index(tukey.groupsunique, name='grupo'))
+
+
+def dados_importancia(artefato):
+    """Importância de cada variável do modelo salvo, da maior para a menor."""
+    modelo, meta = artefato
+    importancia = pd.Series(modelo.feature_importances_, index=meta['colunas'], name='importancia')
+    return importancia.sort_values(ascending=False).to_frame()
+
+
+def dados_coeficientes(ridge, lasso):
+    """Coeficientes dos modelos Ridge e Lasso salvos, lado a lado."""
+    return pd.DataFrame({
+        'Ridge': pd.Series(ridge[0].coef_, index=ridge[1]['colunas']),
+        'Lasso': pd.Series(lasso[0].coef_, index=lasso[1]['colunas']),
+    })
+
+
+# --- Desenho ---
+
+def _plt():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def desenhar_modalidade(dados):
+    import seaborn as sns
+
+    fig, ax = _plt().subplots(figsize=(8, 6))
+    sns.boxplot(x='MODALIDADE', y=VARIAVEL_ALVO, data=dados, palette='pastel', ax=ax)
+    ax.set_title('Distribuição das Notas por Modalidade de Ensino', fontsize=16)
+    ax.set_xlabel('Modalidade', fontsize=12)
+    ax.set_ylabel('Média da Nota do Curso (NT_CE)', fontsize=12)
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_media_uf(dados):
+    import seaborn as sns
+
+    fig, ax = _plt().subplots(figsize=(14, 8))
+    sns.barplot(x=dados.index, y=dados[VARIAVEL_ALVO].to_numpy(), palette='viridis', ax=ax)
+    ax.set_title('Média da Nota do Componente Específico (NT_CE) por Estado', fontsize=16)
+    ax.set_xlabel('Estado (UF)', fontsize=12)
+    ax.set_ylabel('Média da Nota', fontsize=12)
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_raca(dados):
+    import seaborn as sns
+
+    corr = dados[VARIAVEL_ALVO]
+    fig, ax = _plt().subplots(figsize=(12, 7))
+    sns.barplot(x=corr.index, y=corr.to_numpy(), palette='coolwarm_r', hue=corr.index, dodge=False, ax=ax)
+    ax.axhline(0, color='black', linewidth=0.8)
+    for p in ax.patches:
+        ax.annotate(format(p.get_height(), '.2f'),
+                    (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='center',
+                    xytext=(0, 9 if p.get_height() > 0 else -9),
+                    textcoords='offset points')
+    ax.set_title('Correlação entre a Nota Média do Curso e o Percentual de Alunos por Raça/Cor',
+                 fontsize=16, fontweight='bold')
+    ax.set_xlabel('Raça/Cor Autodeclarada', fontsize=12)
+    ax.set_ylabel('Coeficiente de Correlação de Pearson', fontsize=12)
+    ax.tick_params(axis='x', rotation=15)
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_renda(dados):
+    import seaborn as sns
+
+    fig, ax = _plt().subplots(figsize=(10, 7))
+    sns.regplot(x=dados['PERCENTUAL'], y=dados[VARIAVEL_ALVO], scatter_kws={'alpha': 0.5},
+                line_kws={'color': 'red'}, ax=ax)
+    ax.set_title(f'Desempenho vs. Percentual de Alunos de Alta Renda ({COLUNA_MAIOR_RENDA})', fontsize=16)
+    ax.set_xlabel(f'Percentual de Alunos na Faixa de Renda "{COLUNA_MAIOR_RENDA}" (%)', fontsize=12)
+    ax.set_ylabel('Média da Nota do Curso (NT_CE)', fontsize=12)
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_socio(dados):
+    import seaborn as sns
+
+    fig, ax = _plt().subplots(figsize=(12, 18))
+    sns.barplot(x=dados[VARIAVEL_ALVO], y=dados.index, orient='h', ax=ax)
+    ax.set_title('Correlação entre Desempenho e Variáveis Socioeconômicas', fontsize=16)
+    ax.set_xlabel('Correlação com a Média da Nota', fontsize=12)
+    ax.set_ylabel('Variáveis Socioeconômicas', fontsize=12)
+    ax.grid(axis='x', linestyle='--', alpha=0.6)
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_tukey(dados, variavel):
+    """Intervalos simultâneos do Tukey (como `plot_simultaneous` do statsmodels)."""
+    fig, ax = _plt().subplots(figsize=(8, 6))
+    posicoes = np.arange(len(dados))
+    ax.errorbar(dados['media'], posicoes, xerr=dados['meia_largura'], marker='o', linestyle='None',
+                color='k', ecolor='k')
+    ax.set_yticks(posicoes)
+    ax.set_yticklabels(dados.index)
+    ax.set_ylim(-1, len(dados))
+    ax.set_title(f"Intervalos de Confiança - Teste de Tukey ({variavel})")
+    ax.set_xlabel("Diferença de Média")
+    ax.grid(True)
+    return fig
+
+
+def desenhar_importancia(dados, titulo):
+    fig, ax = _plt().subplots(figsize=(10, 6))
+    dados['importancia'].head(20).plot(kind='bar', ax=ax)
+    ax.set_title(titulo)
+    ax.set_ylabel("Importância")
+    fig.tight_layout()
+    return fig
+
+
+def desenhar_coeficientes(dados):
+    fig, ax = _plt().subplots(figsize=(12, 6))
+    dados['Ridge'].sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, label="Ridge", ax=ax)
+    dados['Lasso'].sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, color="orange",
+                                                             label="Lasso", ax=ax)
+    ax.legend()
+    ax.set_title("Comparação dos coeficientes - Ridge vs Lasso")
+    ax.set_ylabel("Peso")
+    fig.tight_layout()
+    return fig
+
+
+def _figura(saida, entradas, dados, desenho, estilo=None, tabela=None):
+    return {
+        'saida': saida,
+        'entradas': list(entradas),
+        'dados': dados,
+        'desenhar': desenho,
+        'estilo': {'tema': 'default', 'rc': {}, 'dpi': 300, **(estilo or {})},
+        'tabela': tabela,
+    }
+
+
+FIGURAS = {
+    'modalidade': _figura('imagens/grafico_boxplot_modalidade.png', ['tabela'], dados_modalidade, desenhar_modalidade),
+    'media_uf': _figura(
+        'imagens/grafico_media_nota_por_estado.png', ['cubo'], dados_media_uf, desenhar_media_uf,
+        {'tema': 'seaborn-v0_8-whitegrid'},
+    ),
+    'raca': _figura(
+        'imagens/grafico_correlacao_composicao_racial.png', ['tabela'], dados_raca, desenhar_raca,
+        {'tema': 'seaborn-v0_8-whitegrid', 'rc': {'font.family': 'sans-serif', 'font.sans-serif': ['Arial', 'DejaVu Sans']}},
+    ),
+    'renda': _figura('imagens/grafico_dispersao_renda_desempenho.png', ['tabela'], dados_renda, desenhar_renda),
+    'socio': _figura(
+        'imagens/grafico_barras_correlacao.png', ['tabela'], dados_socio, desenhar_socio,
+        tabela='tabelas/tabela_correlacao.csv',
+    ),
+    **{
+        f'tukey_{variavel}': _figura(
+            f'imagens/tukey_{variavel}.png', ['tabela'],
+            functools.partial(dados_tukey, variavel=variavel), functools.partial(desenhar_tukey, variavel=variavel),
+        )
+        for variavel in ['QE_I02', 'QE_I08', 'QE_I13', 'QE_I17']
+    },
+    'importancia_random_forest': _figura(
+        'imagens/importancia_random_forest.png', ['modelo:random_forest'], dados_importancia,
+        functools.partial(desenhar_importancia, titulo="Importância das Variáveis - Random Forest"),
+    ),
+    'coeficientes_ridge_lasso': _figura(
+        'imagens/coeficientes_ridge_lasso.png', ['modelo:ridge', 'modelo:lasso'], dados_coeficientes,
+        desenhar_coeficientes,
+    ),
+}
+
+
+def desenhar(nome, dados):
+    """Desenha a figura `nome` a partir dos seus dados, com o estilo dela. Devolve a figura."""
+    plt = _plt()
+    figura = FIGURAS[nome]
+    with plt.style.context(figura['estilo']['tema']), plt.rc_context(figura['estilo']['rc']):
+        return figura['desenhar'](dados)
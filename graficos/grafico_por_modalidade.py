@@ -1,30 +1,30 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cubo import carregar as carregar_cubo
+from dados import carregar_tabela
+from figuras import FIGURAS, MAPA_MODALIDADE, dados_modalidade, desenhar
 
 # Carregar os dados agregados
 try:
-    df = pd.read_csv('tabelas/enade_2023_computacao_agregado.csv')
+    df = carregar_tabela()
 except FileNotFoundError:
     print("O arquivo 'enade_2023_computacao_agregado.csv' não foi encontrado.")
 else:
-    # Mapear códigos de modalidade para nomes
-    df['MODALIDADE'] = df['CO_MODALIDADE'].map({1: 'Presencial', 0: 'EAD'})
-
-    # Gerar o gráfico
-    plt.figure(figsize=(8, 6))
-    sns.boxplot(x='MODALIDADE', y='MEDIA_NT_CE', data=df, palette='pastel')
-
-    plt.title('Distribuição das Notas por Modalidade de Ensino', fontsize=16)
-    plt.xlabel('Modalidade', fontsize=12)
-    plt.ylabel('Média da Nota do Curso (NT_CE)', fontsize=12)
-    plt.tight_layout()
+    # Nota de cada curso por modalidade (ver figuras.py; relatorio.py gera todas as figuras)
+    dados = dados_modalidade(df)
 
-    # Salvar o gráfico
-    plt.savefig('imagens/grafico_boxplot_modalidade.png', dpi=300)
+    # Gerar e salvar o gráfico
+    fig = desenhar('modalidade', dados)
+    fig.savefig(FIGURAS['modalidade']['saida'], dpi=300)
+    plt.close(fig)
     print("Gráfico 'grafico_boxplot_modalidade.png' salvo com sucesso.")
 
-    # Tabela de estatísticas descritivas
-    tabela_descritiva = df.groupby('MODALIDADE')['MEDIA_NT_CE'].describe()
-    print("\nTabela: Estatísticas Descritivas por Modalidade")
-    print(tabela_descritiva)
\ No newline at end of file
+    # Tabela de estatísticas por modalidade, lida do cubo (ver cubo.py); o boxplot
+    # acima precisa da nota de cada curso, por isso usa a tabela
+    tabela_descritiva = carregar_cubo().consultar(['CO_MODALIDADE'])
+    tabela_descritiva.index = tabela_descritiva.index.map(MAPA_MODALIDADE).rename('MODALIDADE')
+    print("\nTabela: Estatísticas por Modalidade (MEDIA_NT_CE pesada pelos estudantes; *_CURSOS por curso)")
+    print(tabela_descritiva)
@@ -1,43 +1,31 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from correlacao import tabela_correlacoes
+from dados import carregar_tabela
+from figuras import COLUNA_MAIOR_RENDA, FIGURAS, dados_renda, desenhar
 
 # Carregar os dados agregados
 try:
-    df = pd.read_csv('tabelas/enade_2023_computacao_agregado.csv')
+    df = carregar_tabela()
 except FileNotFoundError:
     print("O arquivo 'enade_2023_computacao_agregado.csv' não foi encontrado.")
 else:
-    # ATENÇÃO: Verifique no dicionário de dados qual coluna corresponde à maior renda.
-    # Vamos assumir 'QE_I08_G' como exemplo (ex: "Mais de 20 salários mínimos").
-    # Se a coluna não existir, o código dará erro. Ajuste o nome da coluna abaixo.
-    coluna_maior_renda = 'QE_I08_G'
-
-    if coluna_maior_renda in df.columns:
-        # Criar o gráfico de dispersão
-        # 'regplot' adiciona uma linha de regressão para visualizar a tendência
-        plt.figure(figsize=(10, 7))
-        sns.regplot(
-            x=df[coluna_maior_renda] * 100, # Multiplicar por 100 para ver como porcentagem
-            y=df['MEDIA_NT_CE'],
-            scatter_kws={'alpha': 0.5},
-            line_kws={'color': 'red'}
-        )
-
-        plt.title(f'Desempenho vs. Percentual de Alunos de Alta Renda ({coluna_maior_renda})', fontsize=16)
-        plt.xlabel(f'Percentual de Alunos na Faixa de Renda "{coluna_maior_renda}" (%)', fontsize=12)
-        plt.ylabel('Média da Nota do Curso (NT_CE)', fontsize=12)
-        plt.grid(True)
-        plt.tight_layout()
-
-        # Salvar o gráfico
-        plt.savefig('imagens/grafico_dispersao_renda_desempenho.png', dpi=300)
+    # ATENÇÃO: Verifique no dicionário de dados qual coluna corresponde à maior renda
+    # (figuras.COLUNA_MAIOR_RENDA; 'QE_I08_G' como exemplo).
+    if COLUNA_MAIOR_RENDA in df.columns:
+        # Dispersão com linha de regressão, em percentual (ver figuras.py)
+        fig = desenhar('renda', dados_renda(df))
+        fig.savefig(FIGURAS['renda']['saida'], dpi=300)
+        plt.close(fig)
         print("Gráfico 'grafico_dispersao_renda_desempenho.png' salvo com sucesso.")
 
-        # Calcular a correlação de Pearson
-        correlacao = df[[coluna_maior_renda, 'MEDIA_NT_CE']].corr()
-        print(f"\nCorrelação entre {coluna_maior_renda} e MEDIA_NT_CE:")
-        print(correlacao)
+        # Correlação de Pearson, com p-valor (ver correlacao.py)
+        correlacao = tabela_correlacoes(df, [COLUNA_MAIOR_RENDA]).iloc[0]
+        print(f"\nCorrelação entre {COLUNA_MAIOR_RENDA} e MEDIA_NT_CE: "
+              f"{correlacao['MEDIA_NT_CE']:.4f} (p-valor: {correlacao['p_valor']:.3g})")
     else:
-        print(f"A coluna '{coluna_maior_renda}' não foi encontrada no DataFrame.")
-        print("Verifique o nome da coluna no arquivo CSV e no dicionário de dados do ENADE.")
\ No newline at end of file
+        print(f"A coluna '{COLUNA_MAIOR_RENDA}' não foi encontrada no DataFrame.")
+        print("Verifique o nome da coluna no arquivo CSV e no dicionário de dados do ENADE.")
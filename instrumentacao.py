@@ -0,0 +1,299 @@
+"""
+Medição das etapas de um script: tempo de relógio, tempo de CPU, pico de
+memória (RSS) e linhas lidas/geradas, salvos em um relatório JSON por execução.
+
+Um script chama `iniciar` uma vez; as etapas são marcadas com `etapa`, em
+qualquer módulo, e as linhas com `contar`. Sem relatório iniciado (ex: em um
+notebook ou nos processos filhos), `etapa` e `contar` não fazem nada. O relatório
+é gravado ao fim do script em `dados/cache/execucoes/<script>/<data-hora>.json`.
+
+- CPU: a do próprio processo e a dos processos filhos já encerrados dentro da
+  etapa (ex: os de `ProcessPoolExecutor`). Processos reaproveitados pelo
+  joblib ainda estão vivos no fim da etapa, então a CPU deles não é contada.
+- Memória: no Linux, o pico de RSS de cada etapa vem de `VmHWM`, que é zerado no
+  início da etapa. Nos outros sistemas, é o pico do processo até o fim da etapa.
+- Perfil (`--profile`): cada etapa de primeiro nível é perfilada à parte com
+  cProfile (`.prof`, leia com `python -m pstats`) ou pyinstrument (`.html`, se
+  instalado), em uma pasta ao lado do relatório.
+
+    python instrumentacao.py main              # compara as últimas execuções de main.py
+    python instrumentacao.py random_forest --execucoes 5
+"""
+
+import argparse
+import atexit
+import cProfile
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DIR_EXECUCOES = os.environ.get('ENADE_EXECUCOES', os.path.join('dados', 'cache', 'execucoes'))
+# Perfilador usado quando o script não recebe --profile (ex: etapas do pipeline.py)
+PERFIL_PADRAO = os.environ.get('ENADE_PERFIL') or None
+PERFILADORES = ['cprofile', 'pyinstrument']
+
+_ativo = None
+
+
+def _pyinstrument_disponivel():
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _status_memoria(campo):
+    """Valor (em MB) de um campo de /proc/self/status (None fora do Linux)."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linha in f:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _zerar_pico():
+    """Zera o VmHWM do processo (Linux); devolve False se não for possível."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def _pico_processo():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _cpu_filhos():
+    if resource is None:
+        return 0.0
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return uso.ru_utime + uso.ru_stime
+
+
+class Relatorio:
+    """Etapas medidas em uma execução de um script."""
+
+    def __init__(self, script, perfil=None, diretorio=DIR_EXECUCOES):
+        if perfil not in (None, *PERFILADORES):
+            raise ValueError(f"Perfilador desconhecido: '{perfil}' (use {' ou '.join(PERFILADORES)}).")
+        if perfil == 'pyinstrument' and not _pyinstrument_disponivel():
+            raise ValueError("O pyinstrument não está instalado (pip install pyinstrument); use --profile cprofile.")
+        self.script = script
+        self.perfil = perfil
+        self.inicio = datetime.datetime.now()
+        self.caminho = os.path.join(diretorio, script, self.inicio.strftime('%Y%m%d-%H%M%S-%f') + '.json')
+        self.etapas = []
+        self._abertas = []
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._cpu_filhos0 = _cpu_filhos()
+        self._hwm = _zerar_pico()
+
+    @property
+    def dir_perfil(self):
+        return os.path.splitext(self.caminho)[0] + '_perfil'
+
+    def _atualizar_picos(self):
+        """Leva o VmHWM atual para todas as etapas abertas (antes de zerá-lo ou ao fechar uma etapa)."""
+        pico = _status_memoria('VmHWM') if self._hwm else _pico_processo()
+        for aberta in self._abertas:
+            if pico is not None:
+                aberta['pico_rss_mb'] = max(aberta['pico_rss_mb'] or 0.0, pico)
+
+    @contextmanager
+    def etapa(self, nome, linhas_entrada=None):
+        registro = {
+            'etapa': '/'.join([aberta['etapa'] for aberta in self._abertas[-1:]] + [nome]),
+            'nivel': len(self._abertas),
+            'inicio_s': time.perf_counter() - self._t0,
+            'duracao_s': None, 'cpu_s': None, 'cpu_filhos_s': None, 'pico_rss_mb': None,
+            'rss_final_mb': None, 'linhas_entrada': linhas_entrada, 'linhas_saida': None, 'erro': None,
+        }
+        self._atualizar_picos()
+        if self._hwm:
+            _zerar_pico()
+        self._abertas.append(registro)
+        perfilador = self._iniciar_perfil() if self.perfil and registro['nivel'] == 0 else None
+        inicio, cpu, cpu_filhos = time.perf_counter(), time.process_time(), _cpu_filhos()
+        try:
+            yield registro
+        except BaseException as erro:
+            registro['erro'] = f'{type(erro).__name__}: {erro}'
+            raise
+        finally:
+            registro['duracao_s'] = time.perf_counter() - inicio
+            registro['cpu_s'] = time.process_time() - cpu
+            registro['cpu_filhos_s'] = _cpu_filhos() - cpu_filhos
+            if perfilador is not None:
+                self._salvar_perfil(perfilador, registro['etapa'])
+            self._atualizar_picos()
+            registro['rss_final_mb'] = _status_memoria('VmRSS')
+            self._abertas.pop()
+            self.etapas.append(registro)
+
+    def _iniciar_perfil(self):
+        if self.perfil == 'pyinstrument':
+            from pyinstrument import Profiler
+            perfilador = Profiler()
+            perfilador.start()
+            return perfilador
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        return perfilador
+
+    def _salvar_perfil(self, perfilador, nome):
+        os.makedirs(self.dir_perfil, exist_ok=True)
+        base = os.path.join(self.dir_perfil, nome.replace('/', '__').replace(':', '_'))
+        if self.perfil == 'pyinstrument':
+            perfilador.stop()
+            with open(base + '.html', 'w', encoding='utf-8') as f:
+                f.write(perfilador.output_html())
+        else:
+            perfilador.disable()
+            perfilador.dump_stats(base + '.prof')
+
+    def contar(self, entrada=0, saida=0):
+        """Soma linhas lidas (em todas as etapas abertas) e geradas (na etapa mais interna)."""
+        for registro in self._abertas if entrada else []:
+            registro['linhas_entrada'] = (registro['linhas_entrada'] or 0) + int(entrada)
+        if saida and self._abertas:
+            registro = self._abertas[-1]
+            registro['linhas_saida'] = (registro['linhas_saida'] or 0) + int(saida)
+
+    def resumo(self):
+        return {
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'duracao_s': time.perf_counter() - self._t0,
+            'cpu_s': time.process_time() - self._cpu0,
+            'cpu_filhos_s': _cpu_filhos() - self._cpu_filhos0,
+            'pico_rss_mb': _pico_processo(),
+            'medicao_rss': 'VmHWM por etapa' if self._hwm else 'pico do processo',
+            'perfil': self.dir_perfil if self.perfil else None,
+            'python': platform.python_version(),
+            'maquina': platform.node(),
+            'nucleos': os.cpu_count(),
+            'etapas': sorted(self.etapas, key=lambda registro: registro['inicio_s']),
+        }
+
+    def salvar(self):
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.resumo(), f, indent=2)
+        return self.caminho
+
+
+def adicionar_argumentos(parser):
+    """Acrescenta --profile e --relatorio-execucao ao parser de um script."""
+    parser.add_argument('--profile', nargs='?', const='cprofile', default=PERFIL_PADRAO, choices=PERFILADORES,
+                        help="Perfila cada etapa (cProfile, padrão, ou pyinstrument) ao lado do relatório da execução.")
+    parser.add_argument('--relatorio-execucao', default=None, metavar='ARQUIVO',
+                        help=f"JSON com as medições das etapas (padrão: {DIR_EXECUCOES}/<script>/<data-hora>.json).")
+
+
+def iniciar(script, args=None, perfil=PERFIL_PADRAO):
+    """
+    Inicia o relatório da execução de `script` (com `args`, lê --profile e
+    --relatorio-execucao) e o grava quando o processo termina. Devolve o relatório.
+    """
+    global _ativo
+    if args is not None:
+        perfil = args.profile
+    relatorio = Relatorio(script, perfil)
+    if args is not None and args.relatorio_execucao:
+        relatorio.caminho = args.relatorio_execucao
+    _ativo = relatorio
+    atexit.register(_finalizar, relatorio)
+    return relatorio
+
+
+def _finalizar(relatorio):
+    caminho = relatorio.salvar()
+    print(f"\nRelatório da execução salvo em '{caminho}'.")
+
+
+@contextmanager
+def etapa(nome, linhas_entrada=None):
+    """Mede o bloco como uma etapa do relatório ativo (sem relatório, não faz nada)."""
+    if _ativo is None:
+        yield {}
+        return
+    with _ativo.etapa(nome, linhas_entrada) as registro:
+        yield registro
+
+
+def contar(entrada=0, saida=0):
+    """Soma linhas lidas/geradas nas etapas abertas do relatório ativo (ver `Relatorio.contar`)."""
+    if _ativo is not None:
+        _ativo.contar(entrada, saida)
+
+
+def historico(script, execucoes=5, diretorio=DIR_EXECUCOES):
+    """Relatórios das últimas `execucoes` de `script`, do mais antigo ao mais recente."""
+    caminhos = sorted(glob.glob(os.path.join(diretorio, script, '*.json')))[-execucoes:]
+    relatorios = []
+    for caminho in caminhos:
+        try:
+            with open(caminho, encoding='utf-8') as f:
+                relatorios.append(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return relatorios
+
+
+def comparar_execucoes(relatorios, medida='duracao_s'):
+    """Tabela etapa × execução com a `medida` de cada etapa (colunas: início de cada execução)."""
+    import pandas as pd
+
+    colunas = {}
+    for relatorio in relatorios:
+        valores = {'(total)': relatorio.get(medida)}
+        valores.update({registro['etapa']: registro.get(medida) for registro in relatorio['etapas']})
+        colunas[relatorio['inicio']] = pd.Series(valores, dtype='float64')
+    return pd.DataFrame(colunas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compara as medições das últimas execuções de um script.")
+    parser.add_argument('script', help="Nome do script (ex: main, random_forest, modelo_xgboost).")
+    parser.add_argument('--execucoes', type=int, default=5, help="Número de execuções comparadas.")
+    parser.add_argument('--medida', default='duracao_s',
+                        choices=['duracao_s', 'cpu_s', 'cpu_filhos_s', 'pico_rss_mb', 'linhas_entrada', 'linhas_saida'])
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Aumento relativo, da penúltima para a última execução, apontado como regressão (sai com código 1).")
+    args = parser.parse_args()
+
+    relatorios = historico(args.script, args.execucoes)
+    if not relatorios:
+        raise SystemExit(f"Nenhum relatório de '{args.script}' em '{os.path.join(DIR_EXECUCOES, args.script)}'.")
+    tabela = comparar_execucoes(relatorios, args.medida)
+    print(f"{args.medida} das últimas {len(relatorios)} execuções de {args.script}:\n")
+    print(tabela.round(3).to_string())
+    if tabela.shape[1] >= 2:
+        anterior, ultima = tabela.iloc[:, -2], tabela.iloc[:, -1]
+        regressoes = ultima[(ultima > anterior * (1 + args.tolerancia)) & (anterior > 0)]
+        for nome, valor in regressoes.items():
+            print(f"[regressão] {nome}: {anterior[nome]:.3f} -> {valor:.3f} (+{valor / anterior[nome] - 1:.0%})")
+        if not regressoes.empty:
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.tolerancia:.0%} em relação à execução anterior.")
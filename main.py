@@ -1,41 +1,30 @@
-import pandas as pd
+import argparse
+import itertools
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 
-print("--- Iniciando o pré-processamento e agregação dos dados ---")
+import cache_microdados
+import instrumentacao
+import parciais
+from agregacao import ContagemRespostas, distribuicao_percentual, normalizar_linhas
+from notas import EstatisticasNotas
 
 DATA_DIR = 'dados'
+# Arquivo de caracterização dos cursos e arquivo das notas (ver `configurar_leitura` para outras edições)
+ARQUIVO_CURSOS = 'microdados2023_arq1.txt'
+ARQUIVO_NOTAS = 'microdados2023_arq3.txt'
+ARQUIVO_SAIDA = os.path.join('tabelas', 'enade_2023_engenharias_agregado.csv')
 
 CODIGOS_GRUPOS_INCLUIDOS = [6411, 5710, 5806, 5814, 5902, 6002, 6008, 6208, 6307, 6405]
 
-path_arq1 = os.path.join(DATA_DIR, 'microdados2023_arq1.txt')
-df_cursos = pd.read_csv(
-    path_arq1, sep=';', decimal='.', na_values='.', encoding='latin1'
-)
-
-cursos_ids_selecionados = df_cursos[df_cursos['CO_GRUPO'].isin(CODIGOS_GRUPOS_INCLUIDOS)]['CO_CURSO'].unique()
-
-print(f"Foram encontrados {len(cursos_ids_selecionados)} cursos dos grupos {CODIGOS_GRUPOS_INCLUIDOS}.")
-print(f"IDs dos cursos: {cursos_ids_selecionados}\n")
+# Parâmetros comuns de leitura dos microdados do INEP
+OPCOES_LEITURA = dict(sep=';', decimal='.', na_values='.', encoding='latin1')
 
-df_final_agregado = pd.DataFrame({'CO_CURSO': cursos_ids_selecionados}).set_index('CO_CURSO')
-
-print("Processando notas do componente específico (NT_CE)...")
-path_arq3 = os.path.join(DATA_DIR, 'microdados2023_arq3.txt')
-df_notas = pd.read_csv(
-    path_arq3, sep=';', decimal='.', na_values='.', encoding='latin1'
-)
-
-# Filtrar cursos selecionados
-df_notas = df_notas[df_notas['CO_CURSO'].isin(cursos_ids_selecionados)]
-
-# Converter NT_CE para numérico
-df_notas['NT_CE'] = pd.to_numeric(df_notas['NT_CE'], errors='coerce')
-
-# Média por curso
-media_notas_por_curso = df_notas.groupby('CO_CURSO')['NT_CE'].mean()
-df_final_agregado = df_final_agregado.join(media_notas_por_curso.rename('MEDIA_NT_CE'))
-print("Média de notas por curso calculada.\n")
+# Colunas de caracterização do curso (arquivo 1) anexadas à tabela final
+COLUNAS_INFO_CURSO = ['CO_IES', 'CO_MODALIDADE', 'CO_UF_CURSO', 'CO_MUNIC_CURSO', 'CO_CATEGAD', 'CO_REGIAO_CURSO']
 
 # 4. Processar SOCIOECONÔMICAS
 arquivos_categoricos = {
@@ -57,51 +46,494 @@ arquivos_categoricos = {
     'microdados2023_arq29.txt': 'QE_I23',   # Quantas horas por semana você dedicou aos estudos?
     'microdados2023_arq31.txt': 'QE_I25',   # Qual o principal motivo para você ter escolhido este curso?
 }
-for filename, variavel in arquivos_categoricos.items():
-    print(f"Processando variável '{variavel}' do arquivo '{filename}'...")
-    path_arquivo = os.path.join(DATA_DIR, filename)
-    df_temp = pd.read_csv(
-        path_arquivo, sep=';', decimal='.', na_values='.', encoding='latin1'
-    )
 
-    # Filtrar cursos selecionados e remover ausentes
-    df_temp = df_temp[df_temp['CO_CURSO'].isin(cursos_ids_selecionados)]
-    df_temp = df_temp[df_temp[variavel].notna()]
+# Linhas por bloco ao montar o arquivo largo do questionário
+BLOCO_ARQUIVO_LARGO = 500_000
+
+
+def configurar_leitura(diretorio, arquivo_cursos, arquivo_notas, opcoes_leitura):
+    """
+    Aponta as leituras deste processo para outra edição dos microdados (ver
+    `edicoes.py`): diretório, arquivos de cursos e de notas e opções do `read_csv`.
+    Os processos de `calcular_distribuicoes` recebem a mesma configuração.
+    """
+    global DATA_DIR, ARQUIVO_CURSOS, ARQUIVO_NOTAS, OPCOES_LEITURA
+    DATA_DIR, ARQUIVO_CURSOS, ARQUIVO_NOTAS = diretorio, arquivo_cursos, arquivo_notas
+    OPCOES_LEITURA = dict(opcoes_leitura)
+
+
+def configuracao_leitura():
+    """Argumentos de `configurar_leitura` que reproduzem a configuração atual."""
+    return DATA_DIR, ARQUIVO_CURSOS, ARQUIVO_NOTAS, dict(OPCOES_LEITURA)
+
+
+# --- Leitura integral (comportamento original) ---
+
+def ler_microdados(filename, colunas=None, usar_cache=True):
+    """
+    Lê um arquivo de microdados inteiro para a memória (apenas `colunas`, se
+    informadas), passando pelo cache Parquet quando `usar_cache` é verdadeiro.
+    """
+    caminho = os.path.join(DATA_DIR, filename)
+    if usar_cache:
+        df = cache_microdados.carregar(caminho, OPCOES_LEITURA, colunas=colunas)
+    else:
+        df = pd.read_csv(caminho, usecols=colunas, **OPCOES_LEITURA)
+    instrumentacao.contar(entrada=len(df))
+    return df
+
+
+def selecionar_cursos(df_cursos, grupos):
+    """Retorna os IDs dos cursos pertencentes aos grupos informados."""
+    return df_cursos[df_cursos['CO_GRUPO'].isin(grupos)]['CO_CURSO'].unique()
+
+
+def calcular_media_notas(df_notas, cursos_ids):
+    # Filtrar cursos selecionados
+    df_notas = df_notas[df_notas['CO_CURSO'].isin(cursos_ids)].copy()
+
+    # Converter NT_CE para numérico
+    df_notas['NT_CE'] = pd.to_numeric(df_notas['NT_CE'], errors='coerce')
+
+    # Média por curso
+    return df_notas.groupby('CO_CURSO')['NT_CE'].mean().rename('MEDIA_NT_CE')
+
+
+def calcular_notas(df_notas, cursos_ids):
+    """MEDIA_NT_CE e as demais estatísticas das notas por curso (ver `notas`)."""
+    estatisticas = EstatisticasNotas(cursos_ids)
+    estatisticas.adicionar(df_notas['CO_CURSO'], pd.to_numeric(df_notas['NT_CE'], errors='coerce'))
+    return pd.concat([calcular_media_notas(df_notas, cursos_ids), estatisticas.tabela()], axis=1)
+
+
+def calcular_distribuicao(df_temp, variavel, cursos_ids):
+    # Distribuição percentual por curso (só cursos selecionados, sem ausentes),
+    # contada de uma vez com np.bincount sobre códigos inteiros de curso e resposta
+    tabela = distribuicao_percentual(df_temp['CO_CURSO'], df_temp[variavel], cursos_ids, variavel)
+    return tabela.add_prefix(f'{variavel}_')
+
+
+# --- Leitura em blocos (modo streaming) ---
+
+def ler_microdados_em_blocos(filename, colunas, chunksize, usar_cache=True, **kwargs):
+    """
+    Itera sobre um arquivo de microdados em blocos de `chunksize` linhas, lendo só
+    `colunas`. Se já houver cache Parquet válido, os blocos vêm dele. Sem
+    `chunksize`, o arquivo inteiro é devolvido como um único bloco.
+    """
+    caminho = os.path.join(DATA_DIR, filename)
+    if not chunksize:
+        if usar_cache:
+            blocos = [cache_microdados.carregar(caminho, OPCOES_LEITURA, colunas=colunas)]
+        else:
+            blocos = [pd.read_csv(caminho, **OPCOES_LEITURA, usecols=colunas, **kwargs)]
+    else:
+        blocos = cache_microdados.ler_em_blocos(caminho, colunas, chunksize) if usar_cache else None
+        if blocos is None:
+            blocos = pd.read_csv(caminho, **OPCOES_LEITURA, usecols=colunas, chunksize=chunksize, **kwargs)
+    return _contando_linhas(blocos)
+
+
+def _contando_linhas(blocos):
+    """Repassa os blocos somando as linhas lidas na etapa em medição (ver `instrumentacao`)."""
+    for bloco in blocos:
+        instrumentacao.contar(entrada=len(bloco))
+        yield bloco
+
+
+def _inferir_rotulos(valores, viu_nulo):
+    """
+    Converte as respostas lidas como texto para o tipo que o pandas inferiria
+    lendo o arquivo inteiro (int sem ausentes, float com ausentes, texto caso contrário).
+    """
+    valores = list(valores)
+    try:
+        numericos = [float(v) for v in valores]
+    except ValueError:
+        return {v: v for v in valores}
+    try:
+        inteiros = [int(v) for v in valores]
+    except ValueError:
+        inteiros = None
+    if inteiros is not None and not viu_nulo:
+        return dict(zip(valores, inteiros))
+    return dict(zip(valores, numericos))
+
+
+def _como_texto(serie):
+    """Respostas como texto (blocos do cache podem vir como categoria ou número)."""
+    if pd.api.types.is_string_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype(object).map(str, na_action='ignore')
+
+
+def selecionar_cursos_stream(grupos, chunksize, usar_cache=True):
+    """
+    Lê o arquivo 1 em blocos e devolve os IDs dos cursos dos grupos informados
+    (todos, se `grupos` for None) e a caracterização de cada curso, incluindo
+    CO_GRUPO (uma linha por CO_CURSO, na ordem em que aparecem no arquivo).
+    """
+    colunas = ['CO_CURSO', 'CO_GRUPO'] + COLUNAS_INFO_CURSO
+    blocos = []
+    colunas_com_nulo = set()
+    for bloco in ler_microdados_em_blocos(ARQUIVO_CURSOS, colunas, chunksize, usar_cache):
+        colunas_com_nulo.update(bloco.columns[bloco.isna().any()])
+        if grupos is not None:
+            bloco = bloco[bloco['CO_GRUPO'].isin(grupos)]
+        blocos.append(bloco.drop_duplicates(subset='CO_CURSO'))
+
+    df_info = pd.concat(blocos).drop_duplicates(subset='CO_CURSO')
+
+    # No arquivo inteiro, uma coluna inteira com algum ausente é lida como float
+    for coluna in colunas_com_nulo:
+        if pd.api.types.is_integer_dtype(df_info[coluna]):
+            df_info[coluna] = df_info[coluna].astype('float64')
 
-    # Distribuição percentual
-    distribuicao_percentual = (
-        df_temp.groupby('CO_CURSO')[variavel]
-        .value_counts(normalize=True)
-        .unstack(fill_value=0)
+    return df_info['CO_CURSO'].unique(), df_info
+
+
+def _somar_kahan(soma, compensacao, codigos, valores):
+    """
+    Soma compensada (Kahan) por curso, na mesma ordem de linhas usada pelo
+    `groupby().mean()` do pandas, para que o resultado em blocos seja idêntico.
+    Cada passo processa no máximo uma linha por curso, vetorizado entre cursos.
+    """
+    if len(codigos) == 0:
+        return
+    posicao = pd.Series(codigos).groupby(codigos).cumcount().to_numpy()
+    ordem = np.argsort(posicao, kind='stable')
+    limites = np.concatenate([[0], np.cumsum(np.bincount(posicao))])
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        linhas = ordem[inicio:fim]
+        lab, val = codigos[linhas], valores[linhas]
+        y = val - compensacao[lab]
+        t = soma[lab] + y
+        comp = (t - soma[lab]) - y
+        compensacao[lab] = np.where(np.isnan(comp), 0.0, comp)
+        soma[lab] = t
+
+
+def acumular_notas_stream(cursos_ids, chunksize, usar_cache=True):
+    """
+    Soma e quantidade de notas NT_CE válidas por curso e as demais estatísticas
+    (`EstatisticasNotas`), acumuladas bloco a bloco em uma única leitura do arquivo 3.
+    """
+    indice_cursos = pd.Index(cursos_ids)
+    soma = np.zeros(len(indice_cursos))
+    compensacao = np.zeros(len(indice_cursos))
+    contagem = np.zeros(len(indice_cursos), dtype=np.int64)
+    estatisticas = EstatisticasNotas(indice_cursos)
+    blocos = ler_microdados_em_blocos(ARQUIVO_NOTAS, ['CO_CURSO', 'NT_CE'], chunksize, usar_cache)
+    for bloco in blocos:
+        codigos = indice_cursos.get_indexer(bloco['CO_CURSO'])
+        notas = pd.to_numeric(bloco['NT_CE'], errors='coerce').to_numpy(dtype='float64')
+        estatisticas.adicionar(bloco['CO_CURSO'], notas)
+        validos = (codigos >= 0) & ~np.isnan(notas)
+        codigos, notas = codigos[validos], notas[validos]
+
+        _somar_kahan(soma, compensacao, codigos, notas)
+        contagem += np.bincount(codigos, minlength=len(indice_cursos))
+
+    indice_cursos = indice_cursos.rename('CO_CURSO')
+    return pd.Series(soma, index=indice_cursos), pd.Series(contagem, index=indice_cursos), estatisticas
+
+
+def calcular_notas_stream(cursos_ids, chunksize, usar_cache=True):
+    """MEDIA_NT_CE (soma / contagem) e as demais estatísticas das notas por curso, bloco a bloco."""
+    soma, contagem, estatisticas = acumular_notas_stream(cursos_ids, chunksize, usar_cache)
+    media = (soma / contagem.where(contagem > 0)).rename('MEDIA_NT_CE')
+    return pd.concat([media, estatisticas.tabela()], axis=1)
+
+
+def contar_respostas_stream(filename, variaveis, cursos_ids, chunksize, usar_cache=True):
+    """
+    Contagem de cada resposta de cada uma das `variaveis` por curso (cursos ×
+    respostas), acumulada bloco a bloco em uma única passada pelo arquivo.
+    Devolve {variável: tabela de contagens}.
+    """
+    contagens = {variavel: ContagemRespostas(cursos_ids) for variavel in variaveis}
+    valores_vistos = {variavel: set() for variavel in variaveis}
+    viu_nulo = dict.fromkeys(variaveis, False)
+    blocos = ler_microdados_em_blocos(
+        filename, ['CO_CURSO'] + variaveis, chunksize, usar_cache, dtype=dict.fromkeys(variaveis, str)
     )
-    distribuicao_percentual = distribuicao_percentual.add_prefix(f'{variavel}_')
+    for bloco in blocos:
+        for variavel in variaveis:
+            respostas = _como_texto(bloco[variavel])
+            ausentes = respostas.isna()
+            viu_nulo[variavel] = viu_nulo[variavel] or bool(ausentes.any())
+            valores_vistos[variavel].update(respostas[~ausentes].unique())
+            contagens[variavel].adicionar(bloco['CO_CURSO'], respostas)
+
+    return {
+        variavel: contagem.tabela(variavel, _inferir_rotulos(valores_vistos[variavel], viu_nulo[variavel]))
+        for variavel, contagem in contagens.items()
+    }
+
+
+# --- Pipeline ---
+
+def mapa_variaveis(arquivos):
+    """Normaliza um mapa arquivo -> variável(is) para arquivo -> lista de variáveis."""
+    return {
+        filename: [variaveis] if isinstance(variaveis, str) else list(variaveis)
+        for filename, variaveis in arquivos.items()
+    }
+
+
+def processar_arquivo(filename, variaveis, cursos_ids, chunksize=None, usar_cache=True, normalizar=True):
+    """
+    Lê um arquivo do questionário uma única vez e devolve [(variável, distribuição
+    percentual por curso)] para cada uma das `variaveis` (ou as contagens de cada
+    resposta, com `normalizar` falso).
+    """
+    if chunksize or not normalizar:
+        with instrumentacao.etapa(f'contagem:{filename}'):
+            contagens = contar_respostas_stream(filename, variaveis, cursos_ids, chunksize, usar_cache)
+        return [
+            (variavel, (normalizar_linhas(tabela) if normalizar else tabela).add_prefix(f'{variavel}_'))
+            for variavel, tabela in contagens.items()
+        ]
+    with instrumentacao.etapa(f'leitura:{filename}'):
+        df_temp = ler_microdados(filename, ['CO_CURSO'] + variaveis, usar_cache)
+    with instrumentacao.etapa(f'distribuicao:{filename}', linhas_entrada=len(df_temp)) as medicao:
+        tabelas = [(variavel, calcular_distribuicao(df_temp, variavel, cursos_ids)) for variavel in variaveis]
+        medicao['linhas_saida'] = sum(len(tabela) for _, tabela in tabelas)
+    return tabelas
+
+
+def calcular_distribuicoes(cursos_ids, chunksize=None, jobs=1, usar_cache=True, normalizar=True,
+                           arquivos=arquivos_categoricos):
+    """
+    Gera (arquivo, variável, distribuição) para cada variável de `arquivos`
+    (arquivo -> variável ou lista de variáveis), sempre na ordem do mapa. Cada
+    arquivo é lido uma vez só. Com `jobs` > 1, cada arquivo é lido e agregado em
+    um processo separado e só as tabelas por curso voltam ao pai.
+    """
+    tarefas = list(mapa_variaveis(arquivos).items())
+    if jobs <= 1:
+        for filename, variaveis in tarefas:
+            nomes = ', '.join(f"'{variavel}'" for variavel in variaveis)
+            print(f"Processando {'variável' if len(variaveis) == 1 else 'variáveis'} {nomes} do arquivo '{filename}'...")
+            for variavel, tabela in processar_arquivo(filename, variaveis, cursos_ids, chunksize, usar_cache, normalizar):
+                yield filename, variavel, tabela
+        return
+
+    print(f"Processando {len(tarefas)} arquivos do questionário em {jobs} processos...")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=configurar_leitura,
+                             initargs=configuracao_leitura()) as executor:
+        futuros = [
+            executor.submit(processar_arquivo, filename, variaveis, cursos_ids, chunksize, usar_cache, normalizar)
+            for filename, variaveis in tarefas
+        ]
+        for (filename, _), futuro in zip(tarefas, futuros):
+            for variavel, tabela in futuro.result():
+                yield filename, variavel, tabela
+
+
+def montar_arquivo_largo(destino, arquivos=arquivos_categoricos, chunksize=BLOCO_ARQUIVO_LARGO):
+    """
+    Junta as respostas dos arquivos do questionário em um único arquivo largo em
+    `DATA_DIR` (CO_CURSO + uma coluna por variável), no mesmo formato do INEP.
+    Os arquivos trazem os mesmos estudantes na mesma ordem, então a junção é por
+    posição; CO_CURSO é conferido bloco a bloco. Os valores são copiados como texto.
+    """
+    tarefas = mapa_variaveis(arquivos)
+    leitores = [
+        pd.read_csv(
+            os.path.join(DATA_DIR, filename), sep=OPCOES_LEITURA['sep'], encoding=OPCOES_LEITURA['encoding'],
+            usecols=['CO_CURSO'] + variaveis, dtype=str, keep_default_na=False, chunksize=chunksize,
+        )
+        for filename, variaveis in tarefas.items()
+    ]
+    caminho = os.path.join(DATA_DIR, destino)
+    temporario = caminho + '.tmp'
+    for i, blocos in enumerate(itertools.zip_longest(*leitores)):
+        if any(bloco is None for bloco in blocos):
+            raise ValueError("Os arquivos do questionário não têm o mesmo número de linhas.")
+        cursos = blocos[0]['CO_CURSO']
+        for filename, bloco in zip(tarefas, blocos):
+            if not bloco['CO_CURSO'].equals(cursos):
+                raise ValueError(f"CO_CURSO de '{filename}' não corresponde, linha a linha, aos demais arquivos.")
+        largo = pd.concat([cursos] + [bloco.drop(columns='CO_CURSO') for bloco in blocos], axis=1)
+        largo.to_csv(
+            temporario, sep=OPCOES_LEITURA['sep'], encoding=OPCOES_LEITURA['encoding'],
+            index=False, header=(i == 0), mode='w' if i == 0 else 'a',
+        )
+    os.replace(temporario, caminho)
+    return {destino: [variavel for variaveis in tarefas.values() for variavel in variaveis]}
+
+
+def agregar(grupos=CODIGOS_GRUPOS_INCLUIDOS, chunksize=None, jobs=1, usar_cache=True,
+            arquivos=arquivos_categoricos):
+    """
+    Monta a tabela agregada por curso. Com `chunksize`, cada arquivo é lido em
+    blocos desse tamanho, apenas com as colunas necessárias. Com `jobs` > 1, os
+    arquivos do questionário são processados em paralelo. Com `usar_cache`, os
+    microdados são lidos do cache Parquet (ver `cache_microdados`). `arquivos`
+    mapeia cada arquivo do questionário para a(s) variável(is) lida(s) dele.
+    """
+    with instrumentacao.etapa('cursos') as medicao:
+        if chunksize:
+            cursos_ids_selecionados, df_cursos_info = selecionar_cursos_stream(grupos, chunksize, usar_cache)
+        else:
+            df_cursos = ler_microdados(
+                ARQUIVO_CURSOS, ['CO_CURSO', 'CO_GRUPO'] + COLUNAS_INFO_CURSO, usar_cache
+            )
+            cursos_ids_selecionados = selecionar_cursos(df_cursos, grupos)
+        medicao['linhas_saida'] = len(cursos_ids_selecionados)
+
+    print(f"Foram encontrados {len(cursos_ids_selecionados)} cursos dos grupos {grupos}.")
+    print(f"IDs dos cursos: {cursos_ids_selecionados}\n")
+
+    print("Processando notas do componente específico (NT_CE)...")
+    with instrumentacao.etapa('notas') as medicao:
+        if chunksize:
+            notas_por_curso = calcular_notas_stream(cursos_ids_selecionados, chunksize, usar_cache)
+        else:
+            df_notas = ler_microdados(ARQUIVO_NOTAS, ['CO_CURSO', 'NT_CE'], usar_cache)
+            notas_por_curso = calcular_notas(df_notas, cursos_ids_selecionados)
+        medicao['linhas_saida'] = len(notas_por_curso)
+    print("Média e estatísticas das notas por curso calculadas.\n")
+
+    blocos = [notas_por_curso]
+    # Com `jobs` > 1, as linhas lidas nos processos filhos não entram na contagem
+    with instrumentacao.etapa('questionario'):
+        for filename, variavel, distribuicao_percentual in calcular_distribuicoes(
+            cursos_ids_selecionados, chunksize, jobs, usar_cache, arquivos=arquivos
+        ):
+            blocos.append(distribuicao_percentual)
+            instrumentacao.contar(saida=len(distribuicao_percentual))
+            print(f"Distribuição percentual da variável '{variavel}' agregada.\n")
+
+    # Uma única concatenação no fim, em vez de um join (e uma cópia da tabela) por variável
+    print("--- Tabela final agregada por curso ---")
+    with instrumentacao.etapa('montagem', linhas_entrada=sum(len(bloco) for bloco in blocos)) as medicao:
+        indice = pd.Index(cursos_ids_selecionados, name='CO_CURSO')
+        df_final_agregado = pd.concat([bloco.reindex(indice) for bloco in blocos], axis=1).fillna(0)
+
+        if not chunksize:
+            # Carregar caracterização dos cursos (arquivo 1)
+            df_cursos_info = df_cursos[df_cursos['CO_CURSO'].isin(cursos_ids_selecionados)]
+            df_cursos_info = df_cursos_info.drop_duplicates(subset='CO_CURSO')
+
+        # Juntar informações (ex: IES e UF) e o grupo do curso
+        df_final_agregado = df_final_agregado.reset_index().merge(
+            df_cursos_info[['CO_CURSO'] + COLUNAS_INFO_CURSO + ['CO_GRUPO']],
+            on='CO_CURSO',
+            how='left'
+        ).set_index('CO_CURSO')
+        medicao['linhas_saida'] = len(df_final_agregado)
+
+    return df_final_agregado
+
+
+def arquivos_fonte(arquivos=arquivos_categoricos):
+    """Caminhos de todos os arquivos de microdados lidos pelo pipeline."""
+    nomes = [ARQUIVO_CURSOS, ARQUIVO_NOTAS] + list(arquivos)
+    return [os.path.join(DATA_DIR, nome) for nome in dict.fromkeys(nomes)]
+
+
+def construir_parciais(chunksize=None, jobs=1, usar_cache=True, arquivos=arquivos_categoricos):
+    """
+    Agrega os microdados de todos os cursos do país em contagens e somas (ver
+    `parciais`). Devolve a tabela de parciais e o mapa variável -> colunas.
+    """
+    print("Construindo agregados parciais de todos os cursos...")
+    with instrumentacao.etapa('cursos') as medicao:
+        cursos_ids, df_info = selecionar_cursos_stream(None, chunksize, usar_cache)
+        df_parciais = df_info.set_index('CO_CURSO')
+        medicao['linhas_saida'] = len(df_parciais)
+
+    with instrumentacao.etapa('notas') as medicao:
+        soma, _, estatisticas = acumular_notas_stream(cursos_ids, chunksize, usar_cache)
+        df_parciais['SOMA_NT_CE'] = soma
+        df_parciais = df_parciais.join(estatisticas.tabela())
+        medicao['linhas_saida'] = len(df_parciais)
+
+    variaveis = {}
+    blocos = [df_parciais]
+    with instrumentacao.etapa('questionario'):
+        for filename, variavel, contagens in calcular_distribuicoes(
+            cursos_ids, chunksize, jobs, usar_cache, normalizar=False, arquivos=arquivos
+        ):
+            variaveis[variavel] = list(contagens.columns)
+            blocos.append(contagens.reindex(df_parciais.index, fill_value=0).astype('int64'))
+            instrumentacao.contar(saida=len(contagens))
+            print(f"Contagens da variável '{variavel}' acumuladas.\n")
+
+    return pd.concat(blocos, axis=1), variaveis
+
+
+def agregar_de_parciais(grupos=CODIGOS_GRUPOS_INCLUIDOS, chunksize=None, jobs=1, usar_cache=True,
+                        arquivos=arquivos_categoricos):
+    """
+    Monta a tabela agregada a partir dos parciais nacionais salvos, reconstruindo-os
+    só quando algum arquivo de microdados mudou. O resultado é o mesmo de `agregar`.
+    """
+    fontes = arquivos_fonte(arquivos)
+    if all(os.path.exists(caminho) for caminho in fontes):
+        assinaturas = parciais.assinatura_fontes(fontes)
+        if not parciais.atualizados(assinaturas):
+            with instrumentacao.etapa('parciais') as medicao:
+                df_parciais, variaveis = construir_parciais(chunksize, jobs, usar_cache, arquivos)
+                parciais.salvar(df_parciais, variaveis, COLUNAS_INFO_CURSO, assinaturas)
+                medicao['linhas_saida'] = len(df_parciais)
+            print(f"Parciais salvos em '{parciais.ARQUIVO_PARCIAIS}'.\n")
+    else:
+        print("Microdados não encontrados; usando os parciais já salvos.")
 
-    df_final_agregado = df_final_agregado.join(distribuicao_percentual)
-    print(f"Distribuição percentual da variável '{variavel}' agregada.\n")
+    with instrumentacao.etapa('selecao_parciais') as medicao:
+        df_parciais, meta = parciais.carregar()
+        medicao['linhas_entrada'] = len(df_parciais)
+        df_final_agregado = parciais.selecionar(df_parciais, meta, grupos)
+        medicao['linhas_saida'] = len(df_final_agregado)
+    print(f"Foram encontrados {len(df_final_agregado)} cursos dos grupos {grupos}.\n")
+    return df_final_agregado
 
-print("--- Tabela final agregada por curso ---")
-df_final_agregado = df_final_agregado.fillna(0)
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-processamento e agregação dos microdados do ENADE 2023.")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Lê os microdados em blocos com este número de linhas (limita o uso de memória).")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Número de processos para agregar os arquivos do questionário em paralelo.")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Não usa nem cria o cache Parquet dos microdados (lê sempre o texto).")
+    parser.add_argument('--grupos', type=int, nargs='+', default=CODIGOS_GRUPOS_INCLUIDOS,
+                        help="Códigos CO_GRUPO dos cursos incluídos na tabela.")
+    parser.add_argument('--parciais', action='store_true',
+                        help="Monta a tabela a partir dos agregados parciais nacionais (criados na primeira vez).")
+    parser.add_argument('--arquivo-largo', default=None, metavar='ARQUIVO',
+                        help="Lê todas as variáveis do questionário deste arquivo único em dados/ "
+                             "(CO_CURSO + uma coluna por variável), montado a partir dos arquivos separados se não existir.")
+    parser.add_argument('--saida', default=ARQUIVO_SAIDA, help="Caminho do CSV agregado.")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+    instrumentacao.iniciar('main', args)
 
-# Carregar caracterização dos cursos (arquivo 1)
-df_cursos_info = pd.read_csv(
-    path_arq1, sep=';', decimal='.', na_values='.', encoding='latin1'
-)
+    print("--- Iniciando o pré-processamento e agregação dos dados ---")
+    arquivos = arquivos_categoricos
+    if args.arquivo_largo:
+        variaveis = [variavel for lista in mapa_variaveis(arquivos_categoricos).values() for variavel in lista]
+        arquivos = {args.arquivo_largo: variaveis}
+        if not os.path.exists(os.path.join(DATA_DIR, args.arquivo_largo)):
+            print(f"Montando o arquivo largo '{args.arquivo_largo}' a partir dos arquivos do questionário...")
+            with instrumentacao.etapa('arquivo_largo'):
+                arquivos = montar_arquivo_largo(args.arquivo_largo)
 
-# Filtrar apenas cursos selecionados
-df_cursos_info = df_cursos_info[df_cursos_info['CO_CURSO'].isin(cursos_ids_selecionados)]
+    if args.parciais:
+        df_final_agregado = agregar_de_parciais(args.grupos, args.chunksize, args.jobs, not args.sem_cache, arquivos)
+    else:
+        df_final_agregado = agregar(args.grupos, args.chunksize, args.jobs, not args.sem_cache, arquivos)
 
-df_cursos_info = df_cursos_info.drop_duplicates(subset='CO_CURSO')
+    # Salvar
+    with instrumentacao.etapa('salvar', linhas_entrada=len(df_final_agregado)):
+        df_final_agregado.to_csv(args.saida, encoding='utf-8-sig')
+    print(f"Arquivo '{args.saida}' salvo com sucesso.")
+    print("\nVisualização do DataFrame final:")
+    print(df_final_agregado.head())
 
-# Juntar informações (ex: IES e UF)
-df_final_agregado = df_final_agregado.reset_index().merge(
-    df_cursos_info[['CO_CURSO', 'CO_IES', 'CO_MODALIDADE', 'CO_UF_CURSO', 'CO_MUNIC_CURSO', 'CO_CATEGAD', 'CO_REGIAO_CURSO']],
-    on='CO_CURSO',
-    how='left'
-).set_index('CO_CURSO')
 
-# Salvar
-df_final_agregado.to_csv('tabelas/enade_2023_engenharias_agregado.csv', encoding='utf-8-sig')
-print("Arquivo 'enade_2023_engenharias_agregado_nt_ce.csv' salvo com sucesso.")
-print("\nVisualização do DataFrame final:")
-print(df_final_agregado.head())
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
+import argparse
 import pandas as pd
-import numpy as np
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
@@ -7,49 +7,69 @@ from xgboost import XGBRegressor
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import instrumentacao
+from artefatos import salvar_modelo
+from dados import ARQUIVO_TABELA, carregar_xy
+
+parser = argparse.ArgumentParser(description="Treinamento e avaliação do modelo XGBoost.")
+parser.add_argument('--ajustar', action='store_true',
+                    help="Ajusta os hiperparâmetros por successive halving antes do treino final.")
+parser.add_argument('--configuracoes', type=int, default=27, help="Configurações sorteadas no ajuste.")
+parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados no ajuste (padrão: todos).")
+instrumentacao.adicionar_argumentos(parser)
+args = parser.parse_args()
+instrumentacao.iniciar('modelo_xgboost', args)
+
 # --- 1. Carregar os dados ---
-csv_file = 'tabelas/enade_2023_computacao_agregado.csv'
+csv_file = ARQUIVO_TABELA
 
 if not os.path.exists(csv_file):
     print(f"Erro: Arquivo '{csv_file}' não encontrado.")
 else:
-    df = pd.read_csv(csv_file)
-
-    # Variável alvo
-    y = df['MEDIA_NT_CE']
-    # Features (remover identificadores e a própria target)
-    X = df.select_dtypes(include=np.number).drop(columns=[
-    "MEDIA_NT_CE",  
-    "CO_IES", "CO_MODALIDADE", "CO_UF_CURSO", "CO_MUNIC_CURSO",
-    "CO_CATEGAD", "CO_REGIAO_CURSO", "CO_CURSO"
-])
+    # Features (sem identificadores e a própria target) e variável alvo
+    with instrumentacao.etapa('dados'):
+        X, y = carregar_xy(csv_file)
 
     # --- 2. Divisão treino/teste ---
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
     # --- 3. Treinamento do modelo ---
-    xgb_model = XGBRegressor(
+    parametros = dict(
         n_estimators=300,
         learning_rate=0.1,
         max_depth=6,
         subsample=0.8,
         colsample_bytree=0.8,
-        random_state=42
     )
+    if args.ajustar:
+        # Busca só no conjunto de treino; o teste continua intocado para a avaliação
+        from ajuste_xgboost import successive_halving
+
+        print("Ajustando hiperparâmetros (successive halving)...")
+        with instrumentacao.etapa('ajuste', linhas_entrada=len(X_train)):
+            parametros, historico = successive_halving(
+                X_train, y_train, n_configuracoes=args.configuracoes, jobs=args.jobs
+            )
+
+    xgb_model = XGBRegressor(**parametros, random_state=42)
 
     print("Treinando o modelo XGBoost...")
-    xgb_model.fit(X_train, y_train)
+    with instrumentacao.etapa('treino', linhas_entrada=len(X_train)):
+        xgb_model.fit(X_train, y_train)
     print("Modelo treinado com sucesso!")
 
     # --- 4. Avaliação ---
-    y_pred = xgb_model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    with instrumentacao.etapa('avaliacao', linhas_entrada=len(X_test)):
+        y_pred = xgb_model.predict(X_test)
+        mse = mean_squared_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
 
     print("\n--- Performance do XGBoost ---")
     print(f"MSE: {mse:.2f}")
     print(f"R²: {r2:.2f}")
 
+    salvar_modelo(xgb_model, 'xgboost', X.columns, csv_file, metricas={'mse': mse, 'r2': r2})
+
     # --- 5. Importância das variáveis ---
     importance = xgb_model.feature_importances_
     importance_df = pd.DataFrame({
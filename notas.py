@@ -0,0 +1,114 @@
+"""
+Estatísticas das notas NT_CE por curso, acumuladas em uma única passada.
+
+`EstatisticasNotas` recebe blocos de (CO_CURSO, NT_CE) na ordem do arquivo e
+mantém, para cada curso, a quantidade de notas válidas e ausentes, a média e a
+soma dos quadrados dos desvios pelo algoritmo de Welford (o mesmo do
+`groupby().std()` do pandas; o desvio-padrão é numericamente equivalente, com
+diferença só de arredondamento, ~1e-15) e um histograma de faixas fixas de 0,5
+ponto, do qual saem a mediana e os quantis. Os quantis seguem a definição do
+`quantile` do pandas, mas não são exatos: ficam a no máximo meia faixa (0,25
+ponto) do valor calculado com as notas individuais.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agregacao import matriz_contagens
+
+NOTA_MIN, NOTA_MAX = 0.0, 100.0
+N_FAIXAS = 200
+LARGURA_FAIXA = (NOTA_MAX - NOTA_MIN) / N_FAIXAS
+
+# Coluna da tabela final -> quantil
+QUANTIS = {
+    'P10_NT_CE': 0.10,
+    'Q1_NT_CE': 0.25,
+    'MEDIANA_NT_CE': 0.50,
+    'Q3_NT_CE': 0.75,
+    'P90_NT_CE': 0.90,
+}
+COLUNAS_ESTATISTICAS = ['N_NT_CE', 'PROP_AUSENTES_NT_CE', 'DP_NT_CE'] + list(QUANTIS)
+
+
+class EstatisticasNotas:
+    """Acumuladores das notas NT_CE de cada curso de `cursos_ids`."""
+
+    def __init__(self, cursos_ids):
+        self.indice = pd.Index(cursos_ids)
+        n_cursos = len(self.indice)
+        self.n = np.zeros(n_cursos, dtype=np.int64)
+        self.ausentes = np.zeros(n_cursos, dtype=np.int64)
+        self.media = np.zeros(n_cursos)
+        self.m2 = np.zeros(n_cursos)
+        self.histograma = np.zeros((n_cursos, N_FAIXAS), dtype=np.int64)
+
+    def adicionar(self, cursos, notas):
+        """Acumula um bloco de notas (NaN = ausente); cursos fora de `cursos_ids` são ignorados."""
+        codigos = self.indice.get_indexer(cursos)
+        notas = np.asarray(notas, dtype=np.float64)
+        selecionados = codigos >= 0
+        codigos, notas = codigos[selecionados], notas[selecionados]
+
+        validas = ~np.isnan(notas)
+        self.ausentes += np.bincount(codigos[~validas], minlength=len(self.indice))
+        codigos, notas = codigos[validas], notas[validas]
+
+        self._welford(codigos, notas)
+        faixas = np.clip(((notas - NOTA_MIN) / LARGURA_FAIXA).astype(np.int64), 0, N_FAIXAS - 1)
+        self.histograma += matriz_contagens(codigos, faixas, len(self.indice), N_FAIXAS)
+
+    def _welford(self, codigos, notas):
+        """
+        Atualização de Welford linha a linha, na ordem do arquivo dentro de cada
+        curso. Cada passo processa no máximo uma linha por curso, vetorizado entre cursos.
+        """
+        if len(codigos) == 0:
+            return
+        posicao = pd.Series(codigos).groupby(codigos).cumcount().to_numpy()
+        ordem = np.argsort(posicao, kind='stable')
+        limites = np.concatenate([[0], np.cumsum(np.bincount(posicao))])
+        for inicio, fim in zip(limites[:-1], limites[1:]):
+            linhas = ordem[inicio:fim]
+            lab, x = codigos[linhas], notas[linhas]
+            self.n[lab] += 1
+            anterior = self.media[lab]
+            self.media[lab] = anterior + (x - anterior) / self.n[lab]
+            self.m2[lab] += (x - self.media[lab]) * (x - anterior)
+
+    def _estatistica_ordem(self, acumulado, k):
+        """
+        Valor aproximado da k-ésima menor nota (a partir de 0) de cada curso: o
+        centro da faixa em que ela está (erro de no máximo meia faixa).
+        """
+        faixa = np.minimum((acumulado <= k[:, None]).sum(axis=1), N_FAIXAS - 1)
+        return NOTA_MIN + (faixa + 0.5) * LARGURA_FAIXA
+
+    def quantil(self, q):
+        """
+        Quantil `q` das notas de cada curso com a definição padrão do pandas/numpy
+        (interpolação linear entre as estatísticas de ordem vizinhas de (n-1)·q),
+        com erro de no máximo meia faixa.
+        """
+        acumulado = np.cumsum(self.histograma, axis=1)
+        posicao = np.maximum(self.n - 1, 0) * q
+        abaixo = np.floor(posicao)
+        fracao = posicao - abaixo
+        inferior = self._estatistica_ordem(acumulado, abaixo)
+        superior = self._estatistica_ordem(acumulado, np.minimum(abaixo + 1, np.maximum(self.n - 1, 0)))
+        return np.where(self.n > 0, inferior + (superior - inferior) * fracao, np.nan)
+
+    def tabela(self):
+        """DataFrame com as colunas de `COLUNAS_ESTATISTICAS`, uma linha por curso."""
+        total = self.n + self.ausentes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variancia = np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+            prop_ausentes = np.where(total > 0, self.ausentes / total, np.nan)
+        colunas = {
+            'N_NT_CE': self.n,
+            'PROP_AUSENTES_NT_CE': prop_ausentes,
+            'DP_NT_CE': np.sqrt(variancia),
+        }
+        for coluna, q in QUANTIS.items():
+            colunas[coluna] = self.quantil(q)
+        return pd.DataFrame(colunas, index=self.indice.rename('CO_CURSO'))
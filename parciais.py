@@ -0,0 +1,80 @@
+"""
+Agregados parciais por curso, para todos os cursos do país.
+
+Em vez de proporções, guardam a contagem de cada resposta do questionário, a
+soma e a quantidade de notas NT_CE válidas e as estatísticas das notas de cada
+curso, junto com a caracterização do curso (CO_GRUPO, UF, ...). Qualquer recorte
+de grupos é obtido selecionando as linhas e normalizando, sem reler os microdados.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from notas import COLUNAS_ESTATISTICAS
+
+ARQUIVO_PARCIAIS = os.path.join('dados', 'parciais', 'parciais_cursos_2023.parquet')
+# Incrementada quando as colunas (ou o cálculo delas) mudam; parciais de outra versão são refeitos
+VERSAO_FORMATO = 4
+
+
+def _caminho_meta(caminho):
+    return os.path.splitext(caminho)[0] + '.json'
+
+
+def assinatura_fontes(caminhos):
+    """Tamanho e data de modificação de cada arquivo de origem."""
+    assinaturas = {}
+    for caminho in caminhos:
+        info = os.stat(caminho)
+        assinaturas[os.path.basename(caminho)] = {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    return assinaturas
+
+
+def salvar(parciais, variaveis, colunas_info, fontes, caminho=ARQUIVO_PARCIAIS):
+    """
+    Salva os parciais em Parquet. `variaveis` mapeia cada variável do
+    questionário às suas colunas de contagem, na ordem da tabela final.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    parciais.to_parquet(caminho)
+    with open(_caminho_meta(caminho), 'w', encoding='utf-8') as f:
+        json.dump({
+            'versao': VERSAO_FORMATO, 'variaveis': variaveis, 'colunas_info': colunas_info, 'fontes': fontes,
+        }, f, indent=2)
+
+
+def atualizados(fontes, caminho=ARQUIVO_PARCIAIS):
+    """Indica se os parciais salvos foram gerados a partir dos mesmos arquivos de origem."""
+    if not (os.path.exists(caminho) and os.path.exists(_caminho_meta(caminho))):
+        return False
+    with open(_caminho_meta(caminho), encoding='utf-8') as f:
+        meta = json.load(f)
+    return meta.get('versao') == VERSAO_FORMATO and meta['fontes'] == fontes
+
+
+def carregar(caminho=ARQUIVO_PARCIAIS):
+    """Devolve (parciais, metadados)."""
+    with open(_caminho_meta(caminho), encoding='utf-8') as f:
+        meta = json.load(f)
+    return pd.read_parquet(caminho), meta
+
+
+def selecionar(parciais, meta, grupos):
+    """
+    Monta a tabela agregada (mesmo formato de `main.agregar`) para os cursos dos
+    `grupos` informados. Só entram as respostas observadas nesses cursos.
+    """
+    sel = parciais[parciais['CO_GRUPO'].isin(grupos)]
+
+    n_notas = sel['N_NT_CE']
+    blocos = [(sel['SOMA_NT_CE'] / n_notas.where(n_notas > 0)).rename('MEDIA_NT_CE'), sel[COLUNAS_ESTATISTICAS]]
+    for colunas in meta['variaveis'].values():
+        contagens = sel[colunas]
+        contagens = contagens.loc[:, contagens.sum() > 0]
+        total = contagens.sum(axis=1)
+        blocos.append(contagens.div(total.where(total > 0), axis=0))
+
+    tabela = pd.concat(blocos, axis=1).fillna(0)
+    return tabela.join(sel[meta['colunas_info'] + ['CO_GRUPO']])
@@ -0,0 +1,272 @@
+"""
+Executor do pipeline completo: microdados -> tabela agregada -> modelos,
+gráficos e testes -> imagens e tabelas.
+
+Cada etapa declara seus arquivos de entrada (incluindo o próprio script) e de
+saída. Uma etapa só é executada quando o hash de alguma entrada mudou desde a
+última execução bem-sucedida ou quando falta alguma saída. Etapas cujas
+dependências já terminaram rodam em paralelo. A saída de cada script fica em
+`dados/cache/pipeline/logs/<etapa>.log`.
+
+    python pipeline.py                # tudo o que estiver desatualizado
+    python pipeline.py --jobs 4       # até 4 etapas ao mesmo tempo
+    python pipeline.py relatorio      # só essa etapa (e as de que ela depende)
+    python pipeline.py --simular      # mostra o que seria executado
+    python pipeline.py --profile      # perfila as etapas dos scripts instrumentados
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import main as ingestao
+import instrumentacao
+from cache_microdados import hash_arquivo
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIR_PIPELINE = os.path.join('dados', 'cache', 'pipeline')
+ARQUIVO_ESTADO = os.path.join(DIR_PIPELINE, 'estado.json')
+DIR_LOGS = os.path.join(DIR_PIPELINE, 'logs')
+
+# Tabela produzida pela agregação e lida por todas as etapas seguintes
+TABELA = ingestao.ARQUIVO_SAIDA
+# Módulos usados pelos scripts de análise para carregar a tabela
+MODULOS_TABELA = ['dados.py', 'cache_microdados.py', 'notas.py', 'agregacao.py']
+
+
+def _etapa(script, saidas=(), modulos=()):
+    """
+    Etapa de análise: lê a tabela agregada e depende apenas da agregação.
+    `modulos` são os módulos do projeto que o script usa além dos de leitura da tabela.
+    """
+    return {
+        'script': script,
+        'entradas': [script, *modulos, *MODULOS_TABELA, TABELA],
+        'saidas': list(saidas),
+        'depende': ['agregacao'],
+    }
+
+
+def _etapa_relatorio():
+    """Etapa do relatorio.py, com entradas e saídas tiradas de `figuras.FIGURAS`."""
+    from figuras import FIGURAS
+    from relatorio import MODULOS_DADOS
+
+    entradas = ['relatorio.py', 'figuras.py', *MODULOS_DADOS, 'validacao_cruzada.py']
+    saidas = []
+    for figura in FIGURAS.values():
+        for entrada in figura['entradas']:
+            if entrada in ('tabela', 'cubo'):
+                entradas.extend([*MODULOS_TABELA, TABELA])
+            else:
+                entradas.append('artefatos.py')
+        saidas.extend([figura['saida']] + ([figura['tabela']] if figura['tabela'] else []))
+    return {
+        'script': 'relatorio.py',
+        'entradas': list(dict.fromkeys(entradas)),
+        'saidas': list(dict.fromkeys(saidas)),
+        'depende': ['agregacao', 'random_forest', 'regressao_lasso'],
+    }
+
+
+ETAPAS = {
+    'agregacao': {
+        'script': 'main.py',
+        'entradas': [
+            'main.py', 'cache_microdados.py', 'parciais.py', 'agregacao.py', 'notas.py', *ingestao.arquivos_fonte(),
+        ],
+        'saidas': [TABELA],
+        'depende': [],
+    },
+    'modelo_xgboost': _etapa(
+        'modelo_xgboost.py', ['imagens/12_importancia_xgboost.png'],
+        ['artefatos.py', 'ajuste_xgboost.py', 'validacao_cruzada.py'],
+    ),
+    'random_forest': _etapa('random_forest.py', ['imagens/importancia_rf_treino_teste.png'], ['artefatos.py']),
+    'rf_validacao_cruzada': _etapa(
+        'rf_validacao_cruzada.py', ['imagens/importancia_rf_validacao_cruzada.png'], ['validacao_cruzada.py'],
+    ),
+    'regressao_lasso': _etapa(
+        'regressao_linear_lasso.py',
+        ['tabelas/curva_cv_regularizacao.csv', 'imagens/caminho_regularizacao.png', 'imagens/comparacao_ridge_lasso.png'],
+        ['artefatos.py', 'caminho_regularizacao.py', 'validacao_cruzada.py'],
+    ),
+    'regressao_simples': _etapa('regressao_linear_simples.py', ['imagens/regressao_linear_real_vs_predita.png']),
+    # Todas as figuras (as dos scripts de graficos/, Tukey e modelos salvos), desenhadas
+    # em paralelo; só as figuras cujos dados, estilo ou código mudaram são refeitas
+    'relatorio': _etapa_relatorio(),
+    # ANOVA e Tukey de todas as variáveis do questionário (os scripts teste_*.py
+    # fazem o mesmo para uma variável cada)
+    'testes_anova_tukey': _etapa(
+        'testes/anova_tukey.py', ['tabelas/testes_anova_tukey.csv'],
+        ['comparacao_grupos.py', 'validacao_cruzada.py'],
+    ),
+}
+
+
+def carregar_estado():
+    if not os.path.exists(ARQUIVO_ESTADO):
+        return {'hashes': {}, 'etapas': {}}
+    with open(ARQUIVO_ESTADO, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salvar_estado(estado):
+    os.makedirs(DIR_PIPELINE, exist_ok=True)
+    with open(ARQUIVO_ESTADO, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2)
+
+
+def hash_conteudo(caminho, estado):
+    """
+    Hash SHA-256 de um arquivo. O hash é recalculado só quando o tamanho ou a
+    data de modificação mudam, para não reler os microdados a cada execução.
+    """
+    if not os.path.exists(caminho):
+        return None
+    info = os.stat(caminho)
+    anterior = estado['hashes'].get(caminho)
+    if anterior and anterior['tamanho'] == info.st_size and anterior['mtime_ns'] == info.st_mtime_ns:
+        return anterior['sha256']
+    sha256 = hash_arquivo(caminho)
+    estado['hashes'][caminho] = {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns, 'sha256': sha256}
+    return sha256
+
+
+def impressao_etapa(nome, estado):
+    """Impressão digital das entradas de uma etapa (hash combinado dos hashes)."""
+    sha = hashlib.sha256()
+    for caminho in sorted(ETAPAS[nome]['entradas']):
+        sha.update(f"{caminho}={hash_conteudo(caminho, estado)}\n".encode('utf-8'))
+    return sha.hexdigest()
+
+
+def etapa_atualizada(nome, estado):
+    registro = estado['etapas'].get(nome)
+    if registro is None or registro['impressao'] != impressao_etapa(nome, estado):
+        return False
+    return all(os.path.exists(saida) for saida in ETAPAS[nome]['saidas'])
+
+
+def selecionar_etapas(alvos):
+    """Etapas pedidas e, recursivamente, as etapas de que elas dependem."""
+    if not alvos:
+        return list(ETAPAS)
+    selecionadas = set()
+    pendentes = list(alvos)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in ETAPAS:
+            raise SystemExit(f"Etapa desconhecida: '{nome}'. Etapas disponíveis: {', '.join(ETAPAS)}")
+        if nome not in selecionadas:
+            selecionadas.add(nome)
+            pendentes.extend(ETAPAS[nome]['depende'])
+    return [nome for nome in ETAPAS if nome in selecionadas]
+
+
+def executar_script(nome, perfil=None):
+    """
+    Roda o script da etapa em um processo separado, sem janelas de gráfico. Com
+    `perfil`, os scripts instrumentados (ver instrumentacao.py) perfilam as suas etapas.
+    """
+    os.makedirs(DIR_LOGS, exist_ok=True)
+    env = dict(os.environ, MPLBACKEND='Agg', ENADE_TABELA=TABELA)
+    if perfil:
+        env['ENADE_PERFIL'] = perfil
+    inicio = time.perf_counter()
+    with open(os.path.join(DIR_LOGS, f'{nome}.log'), 'w', encoding='utf-8') as log:
+        processo = subprocess.run(
+            [sys.executable, ETAPAS[nome]['script']],
+            cwd=RAIZ, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    return processo.returncode, time.perf_counter() - inicio
+
+
+def executar(alvos=(), jobs=1, forcar=False, simular=False, perfil=None):
+    """Executa as etapas desatualizadas respeitando as dependências. Retorna as etapas com falha."""
+    jobs = max(1, jobs)
+    estado = carregar_estado()
+    etapas = selecionar_etapas(alvos)
+    concluidas, falhas = set(), set()
+    pendentes = list(etapas)
+    em_execucao = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pendentes or em_execucao:
+            for nome in list(pendentes):
+                dependencias = [d for d in ETAPAS[nome]['depende'] if d in etapas]
+                if any(d in falhas for d in dependencias):
+                    print(f"[pulada]     {nome} (dependência falhou)")
+                    falhas.add(nome)
+                    pendentes.remove(nome)
+                    continue
+                if not all(d in concluidas for d in dependencias) or len(em_execucao) >= jobs:
+                    continue
+                pendentes.remove(nome)
+
+                if nome == 'agregacao' and not all(os.path.exists(c) for c in ingestao.arquivos_fonte()):
+                    if os.path.exists(TABELA):
+                        print(f"[mantida]    {nome} (microdados ausentes; usando '{TABELA}')")
+                        concluidas.add(nome)
+                        continue
+                    print(f"[falhou]     {nome} (microdados ausentes em '{ingestao.DATA_DIR}/')")
+                    falhas.add(nome)
+                    continue
+
+                if not forcar and etapa_atualizada(nome, estado):
+                    print(f"[atualizada] {nome}")
+                    concluidas.add(nome)
+                    continue
+                if simular:
+                    print(f"[executaria] {nome}")
+                    concluidas.add(nome)
+                    continue
+
+                print(f"[executando] {nome}")
+                em_execucao[executor.submit(executar_script, nome, perfil)] = nome
+
+            if not em_execucao:
+                continue
+            prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                nome = em_execucao.pop(futuro)
+                codigo, duracao = futuro.result()
+                if codigo != 0:
+                    print(f"[falhou]     {nome} em {duracao:.1f}s (ver {DIR_LOGS}/{nome}.log)")
+                    falhas.add(nome)
+                    continue
+                print(f"[concluída]  {nome} em {duracao:.1f}s")
+                estado['etapas'][nome] = {'impressao': impressao_etapa(nome, estado), 'duracao_s': duracao}
+                concluidas.add(nome)
+                salvar_estado(estado)
+
+    salvar_estado(estado)
+    return falhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa o pipeline de análise do ENADE, pulando etapas já atualizadas.")
+    parser.add_argument('alvos', nargs='*', help=f"Etapas a executar (padrão: todas). Opções: {', '.join(ETAPAS)}")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Número máximo de etapas executadas ao mesmo tempo.")
+    parser.add_argument('--forcar', action='store_true', help="Executa as etapas mesmo se já estiverem atualizadas.")
+    parser.add_argument('--simular', action='store_true', help="Apenas lista o que seria executado.")
+    parser.add_argument('--profile', nargs='?', const='cprofile', default=None, choices=instrumentacao.PERFILADORES,
+                        help="Perfila as etapas dos scripts (relatórios em dados/cache/execucoes/<script>/).")
+    args = parser.parse_args(argv)
+
+    os.chdir(RAIZ)
+    falhas = executar(args.alvos, args.jobs, args.forcar, args.simular, args.profile)
+    if falhas:
+        print(f"\nEtapas com falha: {', '.join(sorted(falhas))}")
+        sys.exit(1)
+    print("\nPipeline concluído.")
+
+
+if __name__ == '__main__':
+    main()
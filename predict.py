@@ -0,0 +1,35 @@
+"""
+Previsão da nota média (MEDIA_NT_CE) para uma tabela agregada de cursos, usando
+um modelo já treinado e salvo em `modelos/` (sem retreinar).
+
+    python predict.py --modelo random_forest --tabela tabelas/enade_2023_engenharias_agregado.csv
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from artefatos import carregar_modelo, pontuar
+from dados import ARQUIVO_TABELA, carregar_tabela
+
+parser = argparse.ArgumentParser(description="Pontua uma tabela agregada de cursos com um modelo salvo.")
+parser.add_argument('--modelo', required=True, help="Nome do modelo (ex: xgboost, random_forest, ridge, lasso).")
+parser.add_argument('--versao', default=None, help="Versão do artefato (padrão: a mais recente).")
+parser.add_argument('--tabela', default=ARQUIVO_TABELA, help="Tabela agregada a pontuar.")
+parser.add_argument('--saida', default='tabelas/predicoes.csv', help="CSV de saída com as previsões.")
+args = parser.parse_args()
+
+modelo, meta = carregar_modelo(args.modelo, args.versao)
+print(f"Modelo '{meta['nome']}' versão {meta['versao']} ({meta['classe']}, {len(meta['colunas'])} features).")
+
+df = carregar_tabela(args.tabela)
+
+inicio = time.perf_counter()
+predicoes = pontuar(modelo, meta, df)
+duracao = time.perf_counter() - inicio
+print(f"{len(predicoes)} cursos pontuados em {duracao * 1000:.1f} ms.")
+
+resultado = pd.DataFrame({'CO_CURSO': df['CO_CURSO'], 'PREDICAO_NT_CE': predicoes})
+resultado.to_csv(args.saida, index=False, encoding='utf-8-sig')
+print(f"Previsões salvas em '{args.saida}'.")
@@ -1,17 +1,23 @@
+import argparse
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("tabelas/enade_2023_computacao_agregado.csv", encoding="utf-8-sig")
+import instrumentacao
+from artefatos import salvar_modelo
+from dados import carregar_xy
+
+parser = argparse.ArgumentParser(description="Treinamento e avaliação do Random Forest.")
+instrumentacao.adicionar_argumentos(parser)
+args = parser.parse_args()
+instrumentacao.iniciar('random_forest', args)
 
-y = df["MEDIA_NT_CE"]
-X = df.drop(columns=[
-    "MEDIA_NT_CE",
-    "CO_IES", "CO_MODALIDADE", "CO_UF_CURSO", "CO_MUNIC_CURSO",
-    "CO_CATEGAD", "CO_REGIAO_CURSO"
-])
+# Features (sem identificadores do curso) e variável alvo
+with instrumentacao.etapa('dados'):
+    X, y = carregar_xy()
 
 # Dividir treino e teste
 X_train, X_test, y_train, y_test = train_test_split(
@@ -24,12 +30,17 @@ rf = RandomForestRegressor(
     random_state=42,
     n_jobs=-1
 )
-rf.fit(X_train, y_train)
+with instrumentacao.etapa('treino', linhas_entrada=len(X_train)):
+    rf.fit(X_train, y_train)
 
 # Avaliar modelo
-y_pred = rf.predict(X_test)
-print("MSE:", mean_squared_error(y_test, y_pred))
-print("R²:", r2_score(y_test, y_pred))
+with instrumentacao.etapa('avaliacao', linhas_entrada=len(X_test)):
+    y_pred = rf.predict(X_test)
+    mse, r2 = mean_squared_error(y_test, y_pred), r2_score(y_test, y_pred)
+print("MSE:", mse)
+print("R²:", r2)
+
+salvar_modelo(rf, 'random_forest', X.columns, metricas={'mse': mse, 'r2': r2})
 
 # Importância das variáveis
 importances = pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False)
@@ -38,12 +49,14 @@ print("\nVariáveis mais importantes para prever a nota CE:")
 print(importances.head(20))
 
 # Plotar gráfico
-plt.figure(figsize=(10,6))
+fig = plt.figure(figsize=(10,6))
 importances.head(20).plot(kind='bar')
 plt.title("Importância das Variáveis - Random Forest")
 plt.ylabel("Importância")
 plt.tight_layout()
-plt.show()
+fig.savefig("imagens/importancia_rf_treino_teste.png", dpi=300)
+plt.close(fig)
+print("\nGráfico salvo em 'imagens/importancia_rf_treino_teste.png'")
 
 """
 MSE: 54.81250404020756
@@ -6,60 +6,124 @@ O Ridge Regression (penalização L2) introduz uma penalização que reduz a mag
 Já o Lasso Regression (penalização L1), além de reduzir a magnitude dos coeficientes, é capaz de atribuir valor zero a variáveis menos relevantes, funcionando como um mecanismo de seleção automática de variáveis.
 """
 
+import argparse
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import Ridge, Lasso
+from sklearn.linear_model import ElasticNet, Ridge, Lasso
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("tabelas/enade_2023_computacao_agregado.csv", encoding="utf-8-sig")
-
-y = df["MEDIA_NT_CE"]
-X = df.drop(columns=[
-    "MEDIA_NT_CE", 
-    "CO_IES", "CO_MODALIDADE", "CO_UF_CURSO",
-    "CO_MUNIC_CURSO", "CO_CATEGAD", "CO_REGIAO_CURSO"
-])
+import instrumentacao
+from artefatos import salvar_modelo
+from caminho_regularizacao import ALPHAS_RIDGE, caminhos, grade_alphas, melhores_alphas, validar_caminhos
+from dados import carregar_xy
+
+parser = argparse.ArgumentParser(description="Ridge e Lasso com alpha escolhido pelo caminho de regularização.")
+parser.add_argument('--l1-ratio', type=float, default=None,
+                    help="Também ajusta um ElasticNet com essa proporção L1 (entre 0 e 1).")
+parser.add_argument('--folds', type=int, default=5, help="Folds da validação cruzada.")
+parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados na validação cruzada (padrão: todos).")
+instrumentacao.adicionar_argumentos(parser)
+args = parser.parse_args()
+if args.l1_ratio is not None and not 0 < args.l1_ratio <= 1:
+    parser.error("--l1-ratio deve estar entre 0 (exclusive) e 1.")
+instrumentacao.iniciar('regressao_linear_lasso', args)
+
+# Features (sem identificadores do curso) e variável alvo
+with instrumentacao.etapa('dados'):
+    X, y = carregar_xy()
 
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42
 )
 
-ridge = Ridge(alpha=10)  # alpha = intensidade da regularização
-ridge.fit(X_train, y_train)
-y_pred_ridge = ridge.predict(X_test)
-
-print("=== Ridge Regression ===")
-print("MSE:", mean_squared_error(y_test, y_pred_ridge))
-print("R²:", r2_score(y_test, y_pred_ridge))
-
-coef_ridge = pd.Series(ridge.coef_, index=X.columns).sort_values(ascending=False)
-print("\nCoeficientes Ridge (Top 15):")
-print(coef_ridge.head(15))
-
-lasso = Lasso(alpha=0.1)  # alpha controla o quanto zera coeficientes
-lasso.fit(X_train, y_train)
-y_pred_lasso = lasso.predict(X_test)
-
-print("\n=== Lasso Regression ===")
-print("MSE:", mean_squared_error(y_test, y_pred_lasso))
-print("R²:", r2_score(y_test, y_pred_lasso))
-
-coef_lasso = pd.Series(lasso.coef_, index=X.columns).sort_values(ascending=False)
-print("\nCoeficientes Lasso (Top 15):")
-print(coef_lasso.head(15))
+# Grade de alphas de cada modelo: (l1_ratio, alphas); o Ridge não tem parte L1
+grades = {
+    'ridge': (None, ALPHAS_RIDGE),
+    'lasso': (1.0, grade_alphas(X_train, y_train)),
+}
+if args.l1_ratio is not None:
+    grades['elasticnet'] = (args.l1_ratio, grade_alphas(X_train, y_train, args.l1_ratio))
+
+# Alpha de cada modelo escolhido por validação cruzada no treino (folds em paralelo)
+with instrumentacao.etapa('validacao_cruzada', linhas_entrada=len(X_train)):
+    curva = validar_caminhos(X_train, y_train, grades, n_splits=args.folds, jobs=args.jobs)
+alphas = melhores_alphas(curva)
+curva.to_csv('tabelas/curva_cv_regularizacao.csv', index=False, encoding='utf-8-sig')
+
+# Caminhos completos dos coeficientes no treino
+trajetorias = {}
+with instrumentacao.etapa('caminhos', linhas_entrada=len(X_train)):
+    resultados_caminhos = caminhos(X_train, y_train, grades)
+for nome, (coeficientes, _) in resultados_caminhos.items():
+    trajetorias[nome] = pd.DataFrame(coeficientes.T, index=pd.Index(grades[nome][1], name='alpha'), columns=X.columns)
+    trajetorias[nome].to_csv(f'tabelas/caminho_coeficientes_{nome}.csv', encoding='utf-8-sig')
+
+modelos = {
+    'ridge': Ridge(alpha=alphas['ridge']),
+    'lasso': Lasso(alpha=alphas['lasso']),
+}
+if args.l1_ratio is not None:
+    modelos['elasticnet'] = ElasticNet(alpha=alphas['elasticnet'], l1_ratio=args.l1_ratio)
+
+coeficientes = {}
+for nome, modelo in modelos.items():
+    with instrumentacao.etapa(f'treino:{nome}', linhas_entrada=len(X_train)):
+        modelo.fit(X_train, y_train)
+    with instrumentacao.etapa(f'avaliacao:{nome}', linhas_entrada=len(X_test)):
+        y_pred = modelo.predict(X_test)
+
+    print(f"\n=== {type(modelo).__name__} Regression (alpha={alphas[nome]:.4g}, escolhido por CV) ===")
+    mse, r2 = mean_squared_error(y_test, y_pred), r2_score(y_test, y_pred)
+    print("MSE:", mse)
+    print("R²:", r2)
+    salvar_modelo(modelo, nome, X.columns, metricas={'mse': mse, 'r2': r2, 'alpha': float(alphas[nome])})
+
+    coeficientes[nome] = pd.Series(modelo.coef_, index=X.columns).sort_values(ascending=False)
+    print(f"\nCoeficientes {type(modelo).__name__} (Top 15):")
+    print(coeficientes[nome].head(15))
+    if nome != 'ridge':
+        print(f"Coeficientes não nulos: {(modelo.coef_ != 0).sum()} de {len(modelo.coef_)}")
+
+# Curvas de validação cruzada e caminho dos coeficientes do Lasso
+fig, (ax_cv, ax_caminho) = plt.subplots(1, 2, figsize=(14, 5))
+for nome, curva_modelo in curva.groupby('modelo', sort=False):
+    ax_cv.errorbar(curva_modelo['alpha'], curva_modelo['mse'], yerr=curva_modelo['dp_mse'],
+                   label=nome, alpha=0.7, capsize=2)
+    ax_cv.axvline(alphas[nome], linestyle='--', linewidth=0.8)
+ax_cv.set_xscale('log')
+ax_cv.set_xlabel("alpha")
+ax_cv.set_ylabel(f"MSE ({args.folds}-fold)")
+ax_cv.set_title("Validação cruzada do alpha")
+ax_cv.legend()
+
+ax_caminho.plot(trajetorias['lasso'].index, trajetorias['lasso'].to_numpy(), linewidth=0.8)
+ax_caminho.axvline(alphas['lasso'], color='black', linestyle='--', linewidth=0.8)
+ax_caminho.set_xscale('log')
+ax_caminho.set_xlabel("alpha")
+ax_caminho.set_ylabel("Coeficiente")
+ax_caminho.set_title("Caminho dos coeficientes - Lasso")
+plt.tight_layout()
+fig.savefig("imagens/caminho_regularizacao.png", dpi=300)
+plt.close(fig)
+print("\nGráfico salvo em 'imagens/caminho_regularizacao.png'")
 
 # 6. Gráfico comparando coeficientes Ridge vs Lasso
-plt.figure(figsize=(12,6))
-coef_ridge.sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, label="Ridge")
-coef_lasso.sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, color="orange", label="Lasso")
+fig = plt.figure(figsize=(12,6))
+coeficientes['ridge'].sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, label="Ridge")
+coeficientes['lasso'].sort_values(ascending=False).head(20).plot(kind="bar", alpha=0.6, color="orange", label="Lasso")
 plt.legend()
 plt.title("Comparação dos coeficientes - Ridge vs Lasso")
 plt.ylabel("Peso")
 plt.tight_layout()
-plt.show()
+fig.savefig("imagens/comparacao_ridge_lasso.png", dpi=300)
+plt.close(fig)
+print("Gráfico salvo em 'imagens/comparacao_ridge_lasso.png'")
 
 """
+Resultados anteriores, com alphas fixos (Ridge alpha=10, Lasso alpha=0.1):
+
 === Ridge Regression ===
 MSE: 54.40197973836258
 R²: 0.6277221281282107
@@ -4,14 +4,10 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("tabelas/enade_2023_computacao_agregado.csv", encoding="utf-8-sig")
+from dados import carregar_xy
 
-y = df["MEDIA_NT_CE"]
-X = df.drop(columns=[
-    "MEDIA_NT_CE", 
-    "CO_IES", "CO_MODALIDADE", "CO_UF_CURSO",
-    "CO_MUNIC_CURSO", "CO_CATEGAD", "CO_REGIAO_CURSO"
-])
+# Features (sem identificadores do curso) e variável alvo
+X, y = carregar_xy()
 
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42
@@ -32,12 +28,15 @@ coeficientes = pd.Series(lr.coef_, index=X.columns).sort_values(ascending=False)
 print("\nCoeficientes das variáveis:")
 print(coeficientes.head(15))
 
+fig = plt.figure()
 plt.scatter(y_test, y_pred, alpha=0.7)
 plt.xlabel("Nota real (MEDIA_NT_CE)")
 plt.ylabel("Nota predita")
 plt.title("Regressão Linear - Notas Reais vs Preditas")
 plt.plot([y.min(), y.max()], [y.min(), y.max()], 'r--')
-plt.show()
+fig.savefig("imagens/regressao_linear_real_vs_predita.png", dpi=300)
+plt.close(fig)
+print("\nGráfico salvo em 'imagens/regressao_linear_real_vs_predita.png'")
 
 
 """
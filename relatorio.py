@@ -0,0 +1,176 @@
+"""
+Geração de todas as figuras de `figuras.FIGURAS` sem interação: backend Agg
+(sem janelas), desenho em paralelo em um pool de processos e cache em duas camadas.
+
+- Dados: a tabela pequena de cada figura fica em `dados/cache/figuras/`,
+  chaveada pelo hash das entradas (tabela agregada ou seu cubo, versão dos modelos), do
+  código da função que a calcula e dos módulos de `MODULOS_DADOS`.
+- Desenho: uma figura só é desenhada de novo quando a chave dos seus dados, o
+  estilo ou o código do desenho mudam, ou quando o arquivo de saída não existe.
+
+    python relatorio.py                      # todas as figuras desatualizadas
+    python relatorio.py media_uf socio       # só essas
+    python relatorio.py --forcar --jobs 4    # redesenha tudo com 4 processos
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+
+import pandas as pd
+from joblib import Parallel, delayed
+
+from cache_microdados import hash_arquivo
+from dados import ARQUIVO_TABELA
+from figuras import FIGURAS
+
+DIR_CACHE = os.path.join('dados', 'cache', 'figuras')
+ARQUIVO_ESTADO = os.path.join(DIR_CACHE, 'renderizadas.json')
+# Módulos usados pelas funções de dados (inclusive os auxiliares de figuras.py e a leitura da
+# tabela em dados.py); quando mudam, os dados de todas as figuras são recalculados
+MODULOS_DADOS = ['figuras.py', 'dados.py', 'correlacao.py', 'comparacao_grupos.py', 'cubo.py']
+
+
+def _codigo(funcao):
+    """Código-fonte de uma função (ou de um `functools.partial` e seus argumentos)."""
+    argumentos = ''
+    if hasattr(funcao, 'func'):
+        argumentos = repr(sorted(funcao.keywords.items())) + repr(funcao.args)
+        funcao = funcao.func
+    return inspect.getsource(funcao) + argumentos
+
+
+def _hash(*partes):
+    sha = hashlib.sha256()
+    for parte in partes:
+        sha.update(str(parte).encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def chave_entrada(entrada, tabela):
+    """Identificação do conteúdo de uma entrada (None se ela não existir)."""
+    if entrada in ('tabela', 'cubo'):
+        return hash_arquivo(tabela) if os.path.exists(tabela) else None
+    from artefatos import listar_versoes
+
+    versoes = listar_versoes(entrada.split(':', 1)[1])
+    return versoes[-1] if versoes else None
+
+
+def carregar_entrada(entrada, tabela):
+    if entrada == 'tabela':
+        from dados import carregar_tabela
+        return carregar_tabela(tabela)
+    if entrada == 'cubo':
+        from cubo import carregar
+        return carregar(tabela)
+    from artefatos import carregar_modelo
+    return carregar_modelo(entrada.split(':', 1)[1])
+
+
+def dados_figura(nome, tabela=ARQUIVO_TABELA, carregadas=None):
+    """
+    Dados da figura `nome`, do cache quando as entradas e o código não mudaram.
+    Devolve (dados, chave dos dados), ou (None, None) se faltar alguma entrada.
+    `carregadas` guarda as entradas já lidas, para lê-las uma vez só entre figuras.
+    """
+    figura = FIGURAS[nome]
+    chaves = [chave_entrada(entrada, tabela) for entrada in figura['entradas']]
+    if None in chaves:
+        return None, None
+    modulos = [hash_arquivo(modulo) for modulo in MODULOS_DADOS if os.path.exists(modulo)]
+    chave = _hash(nome, *chaves, _codigo(figura['dados']), *modulos)
+    caminho = os.path.join(DIR_CACHE, f'{nome}_{chave[:16]}.pkl')
+    if os.path.exists(caminho):
+        return pd.read_pickle(caminho), chave
+
+    carregadas = {} if carregadas is None else carregadas
+    for entrada in figura['entradas']:
+        if entrada not in carregadas:
+            carregadas[entrada] = carregar_entrada(entrada, tabela)
+    dados = figura['dados'](*[carregadas[entrada] for entrada in figura['entradas']])
+    os.makedirs(DIR_CACHE, exist_ok=True)
+    dados.to_pickle(caminho)
+    return dados, chave
+
+
+def _renderizar(nome, dados):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from figuras import desenhar
+
+    figura = FIGURAS[nome]
+    os.makedirs(os.path.dirname(figura['saida']), exist_ok=True)
+    fig = desenhar(nome, dados)
+    fig.savefig(figura['saida'], dpi=figura['estilo']['dpi'])
+    plt.close(fig)
+    if figura['tabela']:
+        dados.to_csv(figura['tabela'])
+    return nome
+
+
+def gerar(nomes=None, tabela=ARQUIVO_TABELA, jobs=None, forcar=False, simular=False):
+    """
+    Gera as figuras `nomes` (padrão: todas) que estiverem desatualizadas,
+    desenhando até `jobs` ao mesmo tempo. Devolve os nomes das figuras desenhadas.
+    """
+    nomes = nomes or list(FIGURAS)
+    estado = {}
+    if os.path.exists(ARQUIVO_ESTADO):
+        with open(ARQUIVO_ESTADO, encoding='utf-8') as f:
+            estado = json.load(f)
+
+    carregadas = {}
+    pendentes = {}
+    for nome in nomes:
+        figura = FIGURAS[nome]
+        try:
+            dados, chave_dados = dados_figura(nome, tabela, carregadas)
+        except ValueError as erro:
+            print(f"[sem dados]  {nome} ({erro})")
+            continue
+        if dados is None:
+            print(f"[sem dados]  {nome} (entrada ausente: {', '.join(figura['entradas'])})")
+            continue
+        chave = _hash(chave_dados, json.dumps(figura['estilo'], sort_keys=True), _codigo(figura['desenhar']))
+        saidas = [figura['saida']] + ([figura['tabela']] if figura['tabela'] else [])
+        if not forcar and estado.get(nome) == chave and all(os.path.exists(s) for s in saidas):
+            print(f"[atualizada] {nome}")
+            continue
+        print(f"[{'desenharia' if simular else 'desenhando'}] {nome}")
+        pendentes[nome] = (dados, chave)
+
+    if simular or not pendentes:
+        return list(pendentes)
+    desenhadas = Parallel(n_jobs=jobs or -1)(
+        delayed(_renderizar)(nome, dados) for nome, (dados, _) in pendentes.items()
+    )
+    for nome in desenhadas:
+        estado[nome] = pendentes[nome][1]
+    os.makedirs(DIR_CACHE, exist_ok=True)
+    with open(ARQUIVO_ESTADO, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2)
+    return desenhadas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera as figuras do projeto sem interação, em paralelo.")
+    parser.add_argument('figuras', nargs='*', metavar='FIGURA',
+                        help=f"Figuras a gerar (padrão: todas). Disponíveis: {', '.join(FIGURAS)}")
+    parser.add_argument('--tabela', default=ARQUIVO_TABELA, help="Tabela agregada usada pelas figuras.")
+    parser.add_argument('--jobs', type=int, default=None, help="Figuras desenhadas ao mesmo tempo (padrão: núcleos).")
+    parser.add_argument('--forcar', action='store_true', help="Redesenha mesmo as figuras atualizadas.")
+    parser.add_argument('--simular', action='store_true', help="Só mostra o que seria desenhado.")
+    args = parser.parse_args()
+    desconhecidas = [nome for nome in args.figuras if nome not in FIGURAS]
+    if desconhecidas:
+        parser.error(f"figuras desconhecidas: {', '.join(desconhecidas)}")
+
+    desenhadas = gerar(args.figuras, args.tabela, args.jobs, args.forcar, args.simular)
+    if not args.simular:
+        print(f"{len(desenhadas)} figura(s) desenhada(s).")
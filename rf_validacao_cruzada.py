@@ -1,38 +1,32 @@
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import KFold
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("tabelas/enade_2023_computacao_agregado.csv", encoding="utf-8-sig")
+import instrumentacao
+from dados import carregar_xy
+from validacao_cruzada import validar
 
-y = df["MEDIA_NT_CE"]
-X = df.drop(columns=[
-    "MEDIA_NT_CE",  
-    "CO_IES", "CO_MODALIDADE", "CO_UF_CURSO", "CO_MUNIC_CURSO",
-    "CO_CATEGAD", "CO_REGIAO_CURSO", "CO_CURSO"
-])
+parser = argparse.ArgumentParser(description="Random Forest com validação cruzada (folds em paralelo).")
+parser.add_argument('--repeticoes', type=int, default=1, help="Número de repetições do 5-fold (K-fold repetido).")
+parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados no total (padrão: todos).")
+instrumentacao.adicionar_argumentos(parser)
+args = parser.parse_args()
+instrumentacao.iniciar('rf_validacao_cruzada', args)
 
-rf = RandomForestRegressor(n_estimators=500, random_state=42, n_jobs=-1)
-cv = KFold(n_splits=5, shuffle=True, random_state=42)
-
-r2_scores, mse_scores = [], []
-importances_list = []
-
-for train_idx, test_idx in cv.split(X):
-    X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+# Features (sem identificadores do curso) e variável alvo
+with instrumentacao.etapa('dados'):
+    X, y = carregar_xy()
 
-    rf.fit(X_train, y_train)
-    y_pred = rf.predict(X_test)
-
-    r2_scores.append(r2_score(y_test, y_pred))
-    mse_scores.append(mean_squared_error(y_test, y_pred))
+rf = RandomForestRegressor(n_estimators=500, random_state=42, n_jobs=-1)
 
-    importances_list.append(rf.feature_importances_)
+# Folds rodam em paralelo; os núcleos são divididos entre folds e árvores
+metricas, importances_list = validar(rf, X, y, n_splits=5, n_repeats=args.repeticoes, random_state=42, jobs=args.jobs)
+r2_scores = metricas['r2'].tolist()
+mse_scores = metricas['mse'].tolist()
 
-print("Resultados Validação Cruzada (5 folds):")
+print(f"Resultados Validação Cruzada ({len(metricas)} folds):")
 print("R² médio:", np.mean(r2_scores))
 print("R² por fold:", r2_scores)
 print("MSE médio:", np.mean(mse_scores))
@@ -50,7 +44,7 @@ importances_df = pd.DataFrame({
 print("\nTop 20 variáveis mais importantes (média nos folds):")
 print(importances_df.head(20))
 
-plt.figure(figsize=(10,6))
+fig = plt.figure(figsize=(10,6))
 plt.bar(importances_df["Variável"].head(20),
         importances_df["Importância Média"].head(20),
         yerr=importances_df["Desvio-Padrão"].head(20),
@@ -59,7 +53,9 @@ plt.title("Importância das Variáveis - Random Forest (Validação Cruzada)")
 plt.ylabel("Importância média (± desvio-padrão)")
 plt.xticks(rotation=90)
 plt.tight_layout()
-plt.show()
+fig.savefig("imagens/importancia_rf_validacao_cruzada.png", dpi=300)
+plt.close(fig)
+print("\nGráfico salvo em 'imagens/importancia_rf_validacao_cruzada.png'")
 
 """
 Resultados Validação Cruzada (5 folds):
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comparacao_grupos import grafico_tukey, testar
+from dados import carregar_tabela
+
+
+"""
+ANOVA e Tukey de MEDIA_NT_CE entre as categorias predominantes de várias
+variáveis do questionário de uma vez (padrão: todas as `QE_*` da tabela).
+
+H₀ (para cada variável): MEDIA_NT_CE não difere entre as categorias predominantes.
+H₁: pelo menos uma média difere.
+
+    python testes/anova_tukey.py
+    python testes/anova_tukey.py QE_I02 QE_I08 QE_I13 QE_I17 --jobs 4 --graficos imagens/tukey
+    python testes/anova_tukey.py --permutacoes 100000 --seed 7   # + testes de permutação
+
+Os testes de permutação não supõem normalidade nem variâncias iguais entre os
+grupos; os p-valores das comparações entre pares ('permutacao') já são ajustados
+para comparações múltiplas.
+"""
+
+parser = argparse.ArgumentParser(description="ANOVA e Tukey por variável do questionário, em uma única tabela.")
+parser.add_argument('variaveis', nargs='*', help="Prefixos das variáveis (ex: QE_I02). Padrão: todas.")
+parser.add_argument('--alpha', type=float, default=0.05, help="Nível de significância.")
+parser.add_argument('--jobs', type=int, default=None, help="Núcleos usados (padrão: todos).")
+parser.add_argument('--permutacoes', type=int, default=0,
+                    help="Número de permutações dos testes de permutação (0 = não executa).")
+parser.add_argument('--seed', type=int, default=42, help="Semente dos testes de permutação.")
+parser.add_argument('--saida', default='tabelas/testes_anova_tukey.csv', help="CSV com os resultados.")
+parser.add_argument('--graficos', default=None, metavar='DIR',
+                    help="Salva o gráfico do Tukey de cada variável neste diretório.")
+args = parser.parse_args()
+
+df_final = carregar_tabela()
+resultados, tukeys = testar(
+    df_final, args.variaveis or None, alpha=args.alpha, jobs=args.jobs,
+    permutacoes=args.permutacoes, seed=args.seed,
+)
+
+anovas = resultados[resultados['teste'] == 'anova'].set_index('variavel')
+print("ANOVA por variável:")
+print(anovas[['estatistica', 'p_valor', 'rejeita']].to_string())
+if args.permutacoes:
+    permutacoes = resultados[resultados['teste'] == 'anova_permutacao'].set_index('variavel')
+    print(f"\nF por permutação ({args.permutacoes} permutações):")
+    print(permutacoes[['estatistica', 'p_valor', 'rejeita']].to_string())
+
+resultados.to_csv(args.saida, index=False, encoding='utf-8-sig')
+print(f"\nResultados ({len(anovas)} variáveis) salvos em '{args.saida}'.")
+
+if args.graficos:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    os.makedirs(args.graficos, exist_ok=True)
+    for variavel, tukey in tukeys.items():
+        fig = grafico_tukey(tukey, f"Intervalos de Confiança - Teste de Tukey ({variavel})")
+        fig.savefig(os.path.join(args.graficos, f'tukey_{variavel}.png'), bbox_inches='tight')
+        plt.close(fig)
+    print(f"Gráficos salvos em '{args.graficos}/'.")
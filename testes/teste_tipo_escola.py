@@ -1,9 +1,11 @@
-import pandas as pd
-from scipy import stats
-import statsmodels.api as sm
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-from statsmodels.stats.multicomp import MultiComparison
 import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comparacao_grupos import testar
+from dados import carregar_tabela
+from figuras import FIGURAS, dados_tukey, desenhar
 
 
 """
@@ -12,37 +14,24 @@ H₀: MEDIA_NT_CE não difere entre tipos de escola predominantes (privada, publ
 H₁: pelo menos um tipo difere.
 """
 
-df_final = pd.read_csv('tabelas/enade_2023_computacao_agregado.csv')
-
-faixas_renda = ['QE_I17_A','QE_I17_B','QE_I17_C','QE_I17_D','QE_I17_E','QE_I17_F']
-
-df_final['faixa_tipo_escola_predom'] = df_final[faixas_renda].idxmax(axis=1)
+df_final = carregar_tabela()
 
-# --- ANOVA ---
-grupos = [df_final[df_final['faixa_tipo_escola_predom']==cat]['MEDIA_NT_CE']
-          for cat in df_final['faixa_tipo_escola_predom'].unique()]
+# ANOVA e Tukey entre as categorias predominantes de QE_I17 (ver comparacao_grupos)
+resultados, tukeys = testar(df_final, ['QE_I17'], jobs=1)
+if 'QE_I17' not in tukeys:
+    sys.exit("Todos os cursos têm a mesma categoria predominante; não há grupos para comparar.")
 
-f_stat, p_val = stats.f_oneway(*grupos)
-print("ANOVA:", f_stat, p_val)
-
-# --- Teste Tukey ---
-tukey = pairwise_tukeyhsd(endog=df_final['MEDIA_NT_CE'],
-                          groups=df_final['faixa_tipo_escola_predom'],
-                          alpha=0.05)
+anova = resultados[resultados['teste'] == 'anova'].iloc[0]
+print("ANOVA:", anova['estatistica'], anova['p_valor'])
 
 print("\nResultado do teste de Tukey:")
-print(tukey.summary())
-
-mc = MultiComparison(df_final['MEDIA_NT_CE'], df_final['faixa_tipo_escola_predom'])
-tukey_result = mc.tukeyhsd()
-
-fig, ax = plt.subplots(figsize=(8, 6))
-tukey_result.plot_simultaneous(ax=ax)
-plt.title("Intervalos de Confiança - Teste de Tukey")
-plt.xlabel("Diferença de Média")
-plt.grid(True)
-plt.show()
+print(tukeys['QE_I17'].summary())
 
+# Intervalos simultâneos do Tukey, no mesmo arquivo do relatorio.py (ver figuras.py)
+fig = desenhar('tukey_QE_I17', dados_tukey(df_final, 'QE_I17'))
+fig.savefig(FIGURAS['tukey_QE_I17']['saida'], dpi=300)
+plt.close(fig)
+print(f"\nGráfico salvo em '{FIGURAS['tukey_QE_I17']['saida']}'")
 
 """
 ANOVA: 18.106828068074797 3.757760054139824e-05
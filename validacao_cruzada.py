@@ -0,0 +1,79 @@
+"""
+Validação cruzada (K-fold, simples ou repetida) com folds em paralelo.
+
+Cada fold treina um clone independente do estimador, então os folds podem rodar
+ao mesmo tempo. Os núcleos são divididos entre os folds simultâneos e o
+paralelismo interno do modelo (`n_jobs`), para não usar mais threads do que
+núcleos. Com a mesma `random_state`, os resultados são os mesmos da execução
+sequencial.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, RepeatedKFold
+
+import instrumentacao
+
+
+def dividir_nucleos(n_tarefas, jobs=None):
+    """Devolve (tarefas simultâneas, n_jobs de cada modelo) para `jobs` núcleos no total."""
+    nucleos = jobs or os.cpu_count() or 1
+    simultaneas = max(1, min(n_tarefas, nucleos))
+    return simultaneas, max(1, nucleos // simultaneas)
+
+
+def divisoes_kfold(X, n_splits=5, n_repeats=1, random_state=42):
+    """Lista de (índices de treino, índices de teste) do K-fold (repetido)."""
+    if n_repeats > 1:
+        cv = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    else:
+        cv = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return list(cv.split(X))
+
+
+def _avaliar_fold(modelo, X, y, treino, teste):
+    modelo.fit(X.iloc[treino], y.iloc[treino])
+    y_pred = modelo.predict(X.iloc[teste])
+    return (
+        r2_score(y.iloc[teste], y_pred),
+        mean_squared_error(y.iloc[teste], y_pred),
+        getattr(modelo, 'feature_importances_', None),
+    )
+
+
+def validar(estimador, X, y, n_splits=5, n_repeats=1, random_state=42, jobs=None):
+    """
+    Avalia `estimador` por K-fold com `n_repeats` repetições, usando até `jobs`
+    núcleos (padrão: todos). Devolve um DataFrame com R² e MSE de cada fold
+    (colunas `repeticao`, `fold`, `r2`, `mse`) e a matriz folds × features de
+    `feature_importances_` (None se o modelo não tiver importâncias).
+    """
+    divisoes = divisoes_kfold(X, n_splits, n_repeats, random_state)
+    simultaneas, n_jobs_modelo = dividir_nucleos(len(divisoes), jobs)
+
+    modelo_base = clone(estimador)
+    if 'n_jobs' in modelo_base.get_params():
+        modelo_base.set_params(n_jobs=n_jobs_modelo)
+
+    with instrumentacao.etapa('validacao_cruzada', linhas_entrada=len(X)) as medicao:
+        resultados = Parallel(n_jobs=simultaneas)(
+            delayed(_avaliar_fold)(clone(modelo_base), X, y, treino, teste)
+            for treino, teste in divisoes
+        )
+        medicao['linhas_saida'] = len(divisoes)
+
+    indices = np.arange(len(divisoes))
+    metricas = pd.DataFrame({
+        'repeticao': indices // n_splits,
+        'fold': indices % n_splits,
+        'r2': [r[0] for r in resultados],
+        'mse': [r[1] for r in resultados],
+    })
+    if resultados[0][2] is None:
+        return metricas, None
+    return metricas, np.array([r[2] for r in resultados])